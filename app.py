@@ -1,15 +1,24 @@
+import os
 import time
+from functools import partial
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
 import plotly.express as px
 import plotly.graph_objects as go
 
 from utils.preprocess import clean_text
-from model.bert_model import get_bert_embedding, get_bert_embeddings_batch
-from model.predictor import predict_personality,predict_personality_batch
+from utils.streaming import LINKEDIN_COLUMNS, GITHUB_TEXT_COLUMNS, read_csv_columns, stream_scores
+from model.result_cache import cached_predict, cached_predict_batch, cache_stats as get_cache_stats
+from utils.dedup import dedup_stats
+from model.scoring_service import RemoteScorer
+from model.embedding_head import HEAD_PATH, head_available, predict_personality_fast
 from report.report_generator import generate_report
+from utils.tracing import PROFILERS, RunProfiler, finish_trace, span, start_trace
+
+# One client (and HTTP connection pool) per service URL, shared across reruns
+@st.cache_resource
+def get_remote_scorer(url):
+    return RemoteScorer(url)
 
 # ---------------------------
 # Enhanced AI Typing Effect
@@ -398,6 +407,51 @@ with st.sidebar:
     
     st.markdown("---")
     
+    # Worker processes used by the "All Users" and comparison flows
+    score_workers = st.number_input(
+        "⚙️ Scoring workers",
+        min_value=1,
+        max_value=os.cpu_count() or 1,
+        value=1,
+        help="Score large uploads across several CPU processes"
+    )
+
+    # Fast mode scores MiniLM embeddings with the head trained by train_model.py
+    scoring_model = st.radio(
+        "🧠 Scoring model",
+        ["🎯 BERT classifier", "⚡ Fast (embedding head)"],
+        help="Fast mode is much quicker but only approximates the BERT classifier"
+    )
+    fast_mode = scoring_model.startswith("⚡")
+    if fast_mode and not head_available():
+        st.warning(f"No trained head at {HEAD_PATH}; run train_model.py first. Using the BERT classifier.")
+        fast_mode = False
+
+    # Shared scoring service that batches requests from every session
+    service_url = st.text_input(
+        "🛰️ Scoring service URL",
+        value=os.environ.get("PERSONALITY_SERVICE_URL", ""),
+        placeholder="http://127.0.0.1:8700",
+        help="Leave empty to score in this process"
+    ).strip()
+    if fast_mode:
+        score_one, score_batch = (lambda text: predict_personality_fast([text])[0]), predict_personality_fast
+    elif service_url:
+        scorer = get_remote_scorer(service_url)
+        score_one, score_batch = scorer.predict, scorer.predict_batch
+    else:
+        score_one = cached_predict
+        score_batch = partial(cached_predict_batch, workers=int(score_workers))
+
+    # Optional profiler for the next run; stage timings are always recorded
+    profiler_kind = st.selectbox(
+        "🐞 Profiler",
+        PROFILERS,
+        help="Profile the next run. Results appear under the stage timings below."
+    )
+    
+    st.markdown("---")
+    
     # Tooltips for traits - fixed duplicate key issue
     st.markdown("### 🎯 Personality Traits Guide")
     traits = {
@@ -417,6 +471,10 @@ with st.sidebar:
             </div>
         """, unsafe_allow_html=True)
     
+    st.markdown("---")
+    cache_panel = st.empty()
+    trace_panel = st.empty()
+
     st.markdown("---")
     st.caption("💡 Upload or paste data to predict personality using NLP and AI.")
     st.caption("🚀 Built with ❤️ using Streamlit")
@@ -424,72 +482,276 @@ with st.sidebar:
 # ---------------------------
 # Main Content
 # ---------------------------
-if st.button("🤖 Start AI Analysis"):
-    st.session_state.started = True
-    with st.spinner("AI is analyzing your content..."):
-        ai_typing_effect("Hello! I'm analyzing your writing and generating insights just for you...")
-
-# ----------------------------
-# LINKEDIN SECTION
-# ----------------------------
-if section == "📘 LinkedIn Analysis":
-    st.header("📘 LinkedIn Personality Analyzer")
-    st.markdown("Analyze personality traits from LinkedIn profiles, posts, and experiences.")
-
-    # Mode selection
-    mode = st.radio(
-        "Choose Input Mode",
-        ["📄 Upload CSV", "✍️ Manual Input"],
-        horizontal=True,
-        label_visibility="collapsed"
-    )
+start_trace(section)
+profiler = RunProfiler(profiler_kind) if profiler_kind != "Off" else None
+if profiler:
+    profiler.start()
 
-    if mode == "📄 Upload CSV":
-        st.markdown("""
-        <div class="upload-box">
-            Upload your LinkedIn CSV file
-        </div>
-        """, unsafe_allow_html=True)
+# Closed in the finally below, even when Streamlit reruns or stops the script mid-page
+try:
+    if st.button("🤖 Start AI Analysis"):
+        st.session_state.started = True
+        with st.spinner("AI is analyzing your content..."):
+            ai_typing_effect("Hello! I'm analyzing your writing and generating insights just for you...")
 
-        file = st.file_uploader(
-            "Upload your LinkedIn CSV file",
-            type=["csv"],
+    # ----------------------------
+    # LINKEDIN SECTION
+    # ----------------------------
+    if section == "📘 LinkedIn Analysis":
+        st.header("📘 LinkedIn Personality Analyzer")
+        st.markdown("Analyze personality traits from LinkedIn profiles, posts, and experiences.")
+
+        # Mode selection
+        mode = st.radio(
+            "Choose Input Mode",
+            ["📄 Upload CSV", "✍️ Manual Input"],
+            horizontal=True,
             label_visibility="collapsed"
         )
 
-        required_columns = {'name', 'about', 'posts', 'experience', 'education'}
+        if mode == "📄 Upload CSV":
+            st.markdown("""
+            <div class="upload-box">
+                Upload your LinkedIn CSV file
+            </div>
+            """, unsafe_allow_html=True)
+
+            file = st.file_uploader(
+                "Upload your LinkedIn CSV file",
+                type=["csv"],
+                label_visibility="collapsed"
+            )
 
-        if file:
-            try:
-                df = pd.read_csv(file)
+            required_columns = {'name', 'about', 'posts', 'experience', 'education'}
+
+            if file:
+                try:
+                    columns = read_csv_columns(file)
 
-                if not required_columns.issubset(df.columns):
-                    st.error("❌ Required columns missing. Please ensure your CSV contains: name, about, posts, experience, education")
+                    if not required_columns.issubset(columns):
+                        st.error("❌ Required columns missing. Please ensure your CSV contains: name, about, posts, experience, education")
+                    else:
+                        st.success("✅ File validated successfully!")
+
+                        # Sub-mode for analysis
+                        sub_mode = st.radio(
+                            "Choose Analysis Mode",
+                            ["👤 Individual", "👥 All Users"],
+                            horizontal=True,
+                            label_visibility="collapsed"
+                        )
+
+                        if sub_mode == "👤 Individual":
+                            with span("read_csv"):
+                                df = pd.read_csv(file)
+                            selected = st.selectbox("Select User", df['name'].unique())
+                            person = df[df['name'] == selected].iloc[0]
+                            raw_text = " ".join(str(person[col]) for col in required_columns if pd.notna(person[col]))
+
+                            if raw_text.strip():
+                                with st.spinner("🔍 Analyzing personality traits..."):
+                                    with span("clean"):
+                                        cleaned = clean_text(raw_text)
+                                    with span("score"):
+                                        result = score_one(cleaned)
+
+                                st.success("✅ Analysis complete!")
+
+                                # Visualization
+                                col1, col2 = st.columns([2, 1])
+                                with col1:
+                                    fig = px.bar(
+                                        x=list(result.keys()),
+                                        y=list(result.values()),
+                                        labels={'x': 'Trait', 'y': 'Score'},
+                                        color=list(result.keys()),
+                                        color_discrete_sequence=px.colors.qualitative.Pastel,
+                                        title=f"Personality Traits for {selected}"
+                                    )
+                                    fig.update_layout(
+                                        plot_bgcolor='rgba(0,0,0,0)',
+                                        paper_bgcolor='rgba(0,0,0,0)',
+                                        xaxis_title=None,
+                                        yaxis_title="Score",
+                                        hovermode="x"
+                                    )
+                                    st.plotly_chart(fig, use_container_width=True)
+
+                                with col2:
+                                    st.markdown("### 📊 Trait Breakdown")
+                                    for trait, score in result.items():
+                                        st.markdown(f"""
+                                            <div style="background-color: #f8fafc; border-radius: 8px; padding: 1rem; 
+                                                margin-bottom: 1rem; border-left: 4px solid #4f46e5;">
+                                                <h4 style="margin: 0 0 0.25rem 0;">{trait}</h4>
+                                                <div style="display: flex; align-items: center; gap: 0.5rem;">
+                                                    <div style="flex-grow: 1; height: 8px; background: #e2e8f0; border-radius: 4px;">
+                                                        <div style="width: {score*100}%; height: 100%; background: linear-gradient(90deg, #4f46e5, #8b5cf6); border-radius: 4px;"></div>
+                                                    </div>
+                                                    <div style="font-weight: 600; color: #4f46e5;">{score:.2f}</div>
+                                                </div>
+                                            </div>
+                                        """, unsafe_allow_html=True)
+
+                                st.markdown("""
+                                    <div style="background-color: #f8fafc; border-radius: 12px; padding: 1.5rem; margin-top: 2rem;">
+                                        <h3>📄 Generate Report</h3>
+                                    </div>
+                                """, unsafe_allow_html=True)
+
+                                if st.button("✨ Generate PDF Report"):
+                                    with st.spinner("Generating beautiful PDF report..."):
+                                        with span("report"):
+                                            fname = generate_report(selected, result)
+                                        with open(fname, "rb") as f:
+                                            st.download_button(
+                                                "📥 Download Report",
+                                                f,
+                                                file_name=fname,
+                                                help="Download a detailed PDF report of the analysis"
+                                            )
+
+                                with st.expander("🔍 Show Raw Analysis Data"):
+                                    st.json(result)
+
+                        else:  # 👥 All Users
+                            st.info("Scoring personality traits...")
+                            progress = st.progress(0)
+                            table = st.empty()
+                            parts = []
+                            # Chunks are cleaned and scored as they are read, so results show up early
+                            for part, done in stream_scores(file, ['name'], LINKEDIN_COLUMNS, score_batch):
+                                parts.append(part)
+                                with span("render", rows=len(part)):
+                                    table.dataframe(pd.concat(parts, ignore_index=True))
+                                progress.progress(int(done * 100))
+                            progress.empty()
+
+                except Exception as e:
+                    st.error(f"Error: {e}")
+
+        else:  # ✍️ Manual Input mode
+            text = st.text_area(
+                "Paste LinkedIn profile content (about, posts, experience, education)",
+                placeholder="Paste LinkedIn content here...",
+                label_visibility="collapsed"
+            )
+
+            if st.button("🔍 Analyze", type="primary"):
+                if text.strip():
+                    with st.spinner("🔍 Analyzing personality traits..."):
+                        with span("clean"):
+                            cleaned = clean_text(text)
+                        with span("score"):
+                            result = score_one(cleaned)
+
+                    st.success("✅ Analysis complete!")
+
+                    # Visualization
+                    col1, col2 = st.columns([2, 1])
+                    with col1:
+                        fig = px.bar(
+                            x=list(result.keys()),
+                            y=list(result.values()),
+                            labels={'x': 'Trait', 'y': 'Score'},
+                            color=list(result.keys()),
+                            color_discrete_sequence=px.colors.qualitative.Pastel,
+                            title="Personality Traits (Manual Input)"
+                        )
+                        fig.update_layout(
+                            plot_bgcolor='rgba(0,0,0,0)',
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            xaxis_title=None,
+                            yaxis_title="Score",
+                            hovermode="x"
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
+
+                    with col2:
+                        st.markdown("### 📊 Trait Breakdown")
+                        for trait, score in result.items():
+                            st.markdown(f"""
+                                <div style="background-color: #f8fafc; border-radius: 8px; padding: 1rem; 
+                                    margin-bottom: 1rem; border-left: 4px solid #4f46e5;">
+                                    <h4 style="margin: 0 0 0.25rem 0;">{trait}</h4>
+                                    <div style="display: flex; align-items: center; gap: 0.5rem;">
+                                        <div style="flex-grow: 1; height: 8px; background: #e2e8f0; border-radius: 4px;">
+                                            <div style="width: {score*100}%; height: 100%; background: linear-gradient(90deg, #4f46e5, #8b5cf6); border-radius: 4px;"></div>
+                                        </div>
+                                        <div style="font-weight: 600; color: #4f46e5;">{score:.2f}</div>
+                                    </div>
+                                </div>
+                            """, unsafe_allow_html=True)
+
+
+                    with st.expander("🔎 Show JSON Result"):
+                        st.json(result)
                 else:
-                    st.success("✅ File validated successfully!")
+                    st.warning("⚠️ Please enter some content to analyze!")
+
 
-                    # Sub-mode for analysis
+    # ----------------------------
+    # GITHUB SECTION
+    # ----------------------------
+    elif section == "🐙 GitHub Analysis":
+        st.header("🐙 GitHub Personality Analyzer")
+        st.markdown("Analyze personality traits from GitHub profiles, READMEs, and commit messages.")
+    
+        mode = st.radio(
+            "Choose Input Mode",
+            ["📄 Upload CSV", "✍ Manual Input"],
+            horizontal=True,
+            label_visibility="collapsed"
+        )
+    
+        if mode == "📄 Upload CSV":
+            st.markdown("""
+            <div class="upload-box">
+                Upload GitHub CSV
+            </div>
+            """, unsafe_allow_html=True)
+            file = st.file_uploader(
+                "Upload GitHub CSV",
+                type=["csv"],
+                label_visibility="collapsed"
+            )
+        
+            required_columns = {'Username', 'Name', 'Description', 'Languages', 'Latest Commit', 'README'}
+        
+            if file:
+                columns = read_csv_columns(file)
+                if not required_columns.issubset(columns):
+                    st.error("❌ Missing required columns. Please ensure your CSV contains: Username, Name, Description, Languages, Latest Commit, README")
+                else:
+                    st.success("✅ File validated successfully!")
+                
                     sub_mode = st.radio(
                         "Choose Analysis Mode",
                         ["👤 Individual", "👥 All Users"],
                         horizontal=True,
                         label_visibility="collapsed"
                     )
-
+                
                     if sub_mode == "👤 Individual":
-                        selected = st.selectbox("Select User", df['name'].unique())
-                        person = df[df['name'] == selected].iloc[0]
-                        raw_text = " ".join(str(person[col]) for col in required_columns if pd.notna(person[col]))
-
+                        with span("read_csv"):
+                            df = pd.read_csv(file)
+                        selected = st.selectbox("Select a User", df['Username'].unique())
+                        user = df[df['Username'] == selected].iloc[0]
+                        name = user['Name'] or selected
+                        raw_text = " ".join(str(user[col]) for col in ['Description', 'Languages', 'Latest Commit', 'README'] if pd.notna(user[col]))
+                    
                         if raw_text.strip():
-                            with st.spinner("🔍 Analyzing personality traits..."):
-                                emb = get_bert_embedding(clean_text(raw_text))
-                                result = predict_personality(np.array(emb).reshape(1, -1))
-
+                            with st.spinner("🔍 Analyzing GitHub personality..."):
+                                with span("clean"):
+                                    cleaned = clean_text(raw_text)
+                                with span("score"):
+                                    result = score_one(cleaned)
+                        
                             st.success("✅ Analysis complete!")
-
-                            # Visualization
+                        
+                            # Enhanced visualization
                             col1, col2 = st.columns([2, 1])
+                        
                             with col1:
                                 fig = px.bar(
                                     x=list(result.keys()),
@@ -497,7 +759,7 @@ if section == "📘 LinkedIn Analysis":
                                     labels={'x': 'Trait', 'y': 'Score'},
                                     color=list(result.keys()),
                                     color_discrete_sequence=px.colors.qualitative.Pastel,
-                                    title=f"Personality Traits for {selected}"
+                                    title=f"GitHub Personality Traits for {name}"
                                 )
                                 fig.update_layout(
                                     plot_bgcolor='rgba(0,0,0,0)',
@@ -507,32 +769,33 @@ if section == "📘 LinkedIn Analysis":
                                     hovermode="x"
                                 )
                                 st.plotly_chart(fig, use_container_width=True)
-
+                        
                             with col2:
                                 st.markdown("### 📊 Trait Breakdown")
                                 for trait, score in result.items():
                                     st.markdown(f"""
                                         <div style="background-color: #f8fafc; border-radius: 8px; padding: 1rem; 
-                                            margin-bottom: 1rem; border-left: 4px solid #4f46e5;">
+                                            margin-bottom: 1rem; border-left: 4px solid #10b981;">
                                             <h4 style="margin: 0 0 0.25rem 0;">{trait}</h4>
                                             <div style="display: flex; align-items: center; gap: 0.5rem;">
                                                 <div style="flex-grow: 1; height: 8px; background: #e2e8f0; border-radius: 4px;">
-                                                    <div style="width: {score*100}%; height: 100%; background: linear-gradient(90deg, #4f46e5, #8b5cf6); border-radius: 4px;"></div>
+                                                    <div style="width: {score*100}%; height: 100%; background: linear-gradient(90deg, #10b981, #34d399); border-radius: 4px;"></div>
                                                 </div>
-                                                <div style="font-weight: 600; color: #4f46e5;">{score:.2f}</div>
+                                                <div style="font-weight: 600; color: #10b981;">{score:.2f}</div>
                                             </div>
                                         </div>
                                     """, unsafe_allow_html=True)
-
+                        
+                            # Report generation
                             st.markdown("""
                                 <div style="background-color: #f8fafc; border-radius: 12px; padding: 1.5rem; margin-top: 2rem;">
                                     <h3>📄 Generate Report</h3>
                                 </div>
                             """, unsafe_allow_html=True)
-
                             if st.button("✨ Generate PDF Report"):
                                 with st.spinner("Generating beautiful PDF report..."):
-                                    fname = generate_report(selected, result)
+                                    with span("report"):
+                                        fname = generate_report(name, result, source="GitHub")
                                     with open(fname, "rb") as f:
                                         st.download_button(
                                             "📥 Download Report",
@@ -540,385 +803,263 @@ if section == "📘 LinkedIn Analysis":
                                             file_name=fname,
                                             help="Download a detailed PDF report of the analysis"
                                         )
-
+                        
+                            # Raw JSON data
                             with st.expander("🔍 Show Raw Analysis Data"):
                                 st.json(result)
-
-                    else:  # 👥 All Users
-                        df['combined'] = df[list(required_columns)].astype(str).agg(' '.join, axis=1)
-                        df['clean'] = df['combined'].apply(clean_text)
-                        texts = df['clean'].tolist()
-
-                        st.info("Generating BERT embeddings...")
-                        embs = get_bert_embeddings_batch(texts)
-
-                        results = []
-                        progress = st.progress(0)
-                        for i, emb in enumerate(embs):
-                            traits = predict_personality(np.array(emb).reshape(1, -1))
-                            results.append(traits)
-                            progress.progress(int((i + 1) / len(embs) * 100))
-                        progress.empty()
-
-                        traits_df = pd.DataFrame(results)
-                        st.dataframe(pd.concat([df[['name']], traits_df], axis=1))
-
-            except Exception as e:
-                st.error(f"Error: {e}")
-
-    else:  # ✍️ Manual Input mode
-        text = st.text_area(
-            "Paste LinkedIn profile content (about, posts, experience, education)",
-            placeholder="Paste LinkedIn content here...",
-            label_visibility="collapsed"
-        )
-
-        if st.button("🔍 Analyze", type="primary"):
-            if text.strip():
-                with st.spinner("🔍 Analyzing personality traits..."):
-                    emb = get_bert_embedding(clean_text(text))
-                    result = predict_personality(np.array(emb).reshape(1, -1))
-
-                st.success("✅ Analysis complete!")
-
-                # Visualization
-                col1, col2 = st.columns([2, 1])
-                with col1:
-                    fig = px.bar(
-                        x=list(result.keys()),
-                        y=list(result.values()),
-                        labels={'x': 'Trait', 'y': 'Score'},
-                        color=list(result.keys()),
-                        color_discrete_sequence=px.colors.qualitative.Pastel,
-                        title="Personality Traits (Manual Input)"
-                    )
-                    fig.update_layout(
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        xaxis_title=None,
-                        yaxis_title="Score",
-                        hovermode="x"
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
-
-                with col2:
-                    st.markdown("### 📊 Trait Breakdown")
-                    for trait, score in result.items():
-                        st.markdown(f"""
-                            <div style="background-color: #f8fafc; border-radius: 8px; padding: 1rem; 
-                                margin-bottom: 1rem; border-left: 4px solid #4f46e5;">
-                                <h4 style="margin: 0 0 0.25rem 0;">{trait}</h4>
-                                <div style="display: flex; align-items: center; gap: 0.5rem;">
-                                    <div style="flex-grow: 1; height: 8px; background: #e2e8f0; border-radius: 4px;">
-                                        <div style="width: {score*100}%; height: 100%; background: linear-gradient(90deg, #4f46e5, #8b5cf6); border-radius: 4px;"></div>
-                                    </div>
-                                    <div style="font-weight: 600; color: #4f46e5;">{score:.2f}</div>
-                                </div>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-
-                with st.expander("🔎 Show JSON Result"):
-                    st.json(result)
-            else:
-                st.warning("⚠️ Please enter some content to analyze!")
-
-
-# ----------------------------
-# GITHUB SECTION
-# ----------------------------
-elif section == "🐙 GitHub Analysis":
-    st.header("🐙 GitHub Personality Analyzer")
-    st.markdown("Analyze personality traits from GitHub profiles, READMEs, and commit messages.")
-    
-    mode = st.radio(
-        "Choose Input Mode",
-        ["📄 Upload CSV", "✍ Manual Input"],
-        horizontal=True,
-        label_visibility="collapsed"
-    )
-    
-    if mode == "📄 Upload CSV":
-        st.markdown("""
-        <div class="upload-box">
-            Upload GitHub CSV
-        </div>
-        """, unsafe_allow_html=True)
-        file = st.file_uploader(
-            "Upload GitHub CSV",
-            type=["csv"],
-            label_visibility="collapsed"
-        )
-        
-        required_columns = {'Username', 'Name', 'Description', 'Languages', 'Latest Commit', 'README'}
-        
-        if file:
-            df = pd.read_csv(file)
-            if not required_columns.issubset(df.columns):
-                st.error("❌ Missing required columns. Please ensure your CSV contains: Username, Name, Description, Languages, Latest Commit, README")
-            else:
-                st.success("✅ File validated successfully!")
-                
-                sub_mode = st.radio(
-                    "Choose Analysis Mode",
-                    ["👤 Individual", "👥 All Users"],
-                    horizontal=True,
-                    label_visibility="collapsed"
-                )
                 
-                if sub_mode == "👤 Individual":
-                    selected = st.selectbox("Select a User", df['Username'].unique())
-                    user = df[df['Username'] == selected].iloc[0]
-                    name = user['Name'] or selected
-                    raw_text = " ".join(str(user[col]) for col in ['Description', 'Languages', 'Latest Commit', 'README'] if pd.notna(user[col]))
-                    
-                    if raw_text.strip():
-                        with st.spinner("🔍 Analyzing GitHub personality..."):
-                            emb = get_bert_embedding(clean_text(raw_text))
-                            result = predict_personality(np.array(emb).reshape(1, -1))
-                        
-                        st.success("✅ Analysis complete!")
-                        
-                        # Enhanced visualization
-                        col1, col2 = st.columns([2, 1])
-                        
-                        with col1:
-                            fig = px.bar(
-                                x=list(result.keys()),
-                                y=list(result.values()),
-                                labels={'x': 'Trait', 'y': 'Score'},
-                                color=list(result.keys()),
-                                color_discrete_sequence=px.colors.qualitative.Pastel,
-                                title=f"GitHub Personality Traits for {name}"
-                            )
-                            fig.update_layout(
-                                plot_bgcolor='rgba(0,0,0,0)',
-                                paper_bgcolor='rgba(0,0,0,0)',
-                                xaxis_title=None,
-                                yaxis_title="Score",
-                                hovermode="x"
-                            )
-                            st.plotly_chart(fig, use_container_width=True)
+                    else:  # All Users mode
+                        with st.spinner("Analyzing all users in the dataset..."):
+                            progress = st.progress(0)
+                            table = st.empty()
+                            parts = []
+                            for part, done in stream_scores(file, ['Username', 'Name'], GITHUB_TEXT_COLUMNS, score_batch):
+                                parts.append(part)
+                                with span("render", rows=len(part)):
+                                    table.dataframe(pd.concat(parts, ignore_index=True), use_container_width=True)
+                                progress.progress(int(done * 100))
+                            progress.empty()
                         
-                        with col2:
-                            st.markdown("### 📊 Trait Breakdown")
-                            for trait, score in result.items():
-                                st.markdown(f"""
-                                    <div style="background-color: #f8fafc; border-radius: 8px; padding: 1rem; 
-                                        margin-bottom: 1rem; border-left: 4px solid #10b981;">
-                                        <h4 style="margin: 0 0 0.25rem 0;">{trait}</h4>
-                                        <div style="display: flex; align-items: center; gap: 0.5rem;">
-                                            <div style="flex-grow: 1; height: 8px; background: #e2e8f0; border-radius: 4px;">
-                                                <div style="width: {score*100}%; height: 100%; background: linear-gradient(90deg, #10b981, #34d399); border-radius: 4px;"></div>
-                                            </div>
-                                            <div style="font-weight: 600; color: #10b981;">{score:.2f}</div>
-                                        </div>
-                                    </div>
-                                """, unsafe_allow_html=True)
-                        
-                        # Report generation
-                        st.markdown("""
-                            <div style="background-color: #f8fafc; border-radius: 12px; padding: 1.5rem; margin-top: 2rem;">
-                                <h3>📄 Generate Report</h3>
-                            </div>
-                        """, unsafe_allow_html=True)
-                        if st.button("✨ Generate PDF Report"):
-                            with st.spinner("Generating beautiful PDF report..."):
-                                fname = generate_report(name, result, source="GitHub")
-                                with open(fname, "rb") as f:
-                                    st.download_button(
-                                        "📥 Download Report",
-                                        f,
-                                        file_name=fname,
-                                        help="Download a detailed PDF report of the analysis"
+                            # Enhanced dataframe display
+                            if parts:
+                                result_df = pd.concat(parts, ignore_index=True)
+                                with span("render", rows=len(result_df), styled=True):
+                                    table.dataframe(
+                                        result_df.style
+                                        .background_gradient(cmap='Greens', subset=result_df.columns[2:])
+                                        .format("{:.2f}", subset=result_df.columns[2:]),
+                                        use_container_width=True
                                     )
-                        
-                        # Raw JSON data
-                        with st.expander("🔍 Show Raw Analysis Data"):
-                            st.json(result)
-                
-                else:  # All Users mode
-                    with st.spinner("Analyzing all users in the dataset..."):
-                        df['text'] = df[['Description', 'Languages', 'Latest Commit', 'README']].astype(str).agg(' '.join, axis=1)
-                        df['clean'] = df['text'].apply(clean_text)
-                        embs = get_bert_embeddings_batch(df['clean'].tolist())
-                        results = [predict_personality(np.array(e).reshape(1, -1)) for e in embs]
-                        
-                        # Enhanced dataframe display
-                        result_df = pd.concat([df[['Username', 'Name']], pd.DataFrame(results)], axis=1)
-                        st.dataframe(
-                            result_df.style
-                            .background_gradient(cmap='Greens', subset=result_df.columns[2:])
-                            .format("{:.2f}", subset=result_df.columns[2:]),
-                            use_container_width=True
-                        )
     
-    else:  # Manual Input mode
-        text = st.text_area(
-            "Paste GitHub README or Commit Messages",
-            placeholder="Paste GitHub content here...",
-            label_visibility="collapsed"
-        )
+        else:  # Manual Input mode
+            text = st.text_area(
+                "Paste GitHub README or Commit Messages",
+                placeholder="Paste GitHub content here...",
+                label_visibility="collapsed"
+            )
         
-        if st.button("🔍 Analyze", type="primary"):
-            if text.strip():
-                with st.spinner("Analyzing personality traits..."):
-                    emb = get_bert_embedding(clean_text(text))
-                    result = predict_personality(np.array(emb).reshape(1, -1))
+            if st.button("🔍 Analyze", type="primary"):
+                if text.strip():
+                    with st.spinner("Analyzing personality traits..."):
+                        with span("clean"):
+                            cleaned = clean_text(text)
+                        with span("score"):
+                            result = score_one(cleaned)
                 
-                st.success("✅ Analysis complete!")
+                    st.success("✅ Analysis complete!")
                 
-                # Visualization
-                fig = px.line_polar(
-                    r=list(result.values()),
-                    theta=list(result.keys()),
-                    line_close=True,
-                    color_discrete_sequence=['#10b981'],
-                    template="plotly_white",
-                    title="GitHub Personality Trait Radar Chart"
-                )
-                fig.update_traces(fill='toself')
-                st.plotly_chart(fig, use_container_width=True)
+                    # Visualization
+                    fig = px.line_polar(
+                        r=list(result.values()),
+                        theta=list(result.keys()),
+                        line_close=True,
+                        color_discrete_sequence=['#10b981'],
+                        template="plotly_white",
+                        title="GitHub Personality Trait Radar Chart"
+                    )
+                    fig.update_traces(fill='toself')
+                    st.plotly_chart(fig, use_container_width=True)
                 
-                # Raw data
-                with st.expander("🔎 Show JSON Result"):
-                    st.json(result)
-            else:
-                st.warning("⚠️ Please enter some content to analyze!")
-
-# ----------------------------
-# COMPARISON SECTION
-# ----------------------------
-elif section == "📊 Compare Platforms":
-    st.header("📊 Compare LinkedIn vs GitHub")
-    st.markdown("Compare personality traits between LinkedIn and GitHub profiles.")
+                    # Raw data
+                    with st.expander("🔎 Show JSON Result"):
+                        st.json(result)
+                else:
+                    st.warning("⚠️ Please enter some content to analyze!")
+
+    # ----------------------------
+    # COMPARISON SECTION
+    # ----------------------------
+    elif section == "📊 Compare Platforms":
+        st.header("📊 Compare LinkedIn vs GitHub")
+        st.markdown("Compare personality traits between LinkedIn and GitHub profiles.")
     
-    # File uploaders in columns
-    lnk_file, git_file = st.columns(2)
+        # File uploaders in columns
+        lnk_file, git_file = st.columns(2)
     
-    with lnk_file:
-        st.markdown("""
-        <div class="upload-box">
-            <h3>📘 LinkedIn Data</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        lnk_csv = st.file_uploader(
-            "Upload LinkedIn CSV",
-            type=["csv"],
-            key="lnk_csv",
-            label_visibility="collapsed"
-        )
+        with lnk_file:
+            st.markdown("""
+            <div class="upload-box">
+                <h3>📘 LinkedIn Data</h3>
+            </div>
+            """, unsafe_allow_html=True)
+            lnk_csv = st.file_uploader(
+                "Upload LinkedIn CSV",
+                type=["csv"],
+                key="lnk_csv",
+                label_visibility="collapsed"
+            )
     
-    with git_file:
-        st.markdown("""
-        <div class="upload-box">
-            <h3>🐙 GitHub Data</h3>
-        </div>
-        """, unsafe_allow_html=True)
-        git_csv = st.file_uploader(
-            "Upload GitHub CSV",
-            type=["csv"],
-            key="git_csv",
-            label_visibility="collapsed"
-        )
+        with git_file:
+            st.markdown("""
+            <div class="upload-box">
+                <h3>🐙 GitHub Data</h3>
+            </div>
+            """, unsafe_allow_html=True)
+            git_csv = st.file_uploader(
+                "Upload GitHub CSV",
+                type=["csv"],
+                key="git_csv",
+                label_visibility="collapsed"
+            )
     
-    if lnk_csv and git_csv:
-        try:
-            with st.spinner("Analyzing and comparing data..."):
-                lnk_df = pd.read_csv(lnk_csv)
-                git_df = pd.read_csv(git_csv)
-
-                if not {'name', 'about', 'posts', 'experience', 'education'}.issubset(lnk_df.columns):
-                    st.error("❌ LinkedIn CSV missing required columns.")
-                else:
-                    lnk_df['combined'] = lnk_df[['name', 'about', 'posts', 'experience', 'education']].astype(str).agg(' '.join, axis=1)
-                    lnk_df['clean'] = lnk_df['combined'].apply(clean_text)
-                    lnk_traits = predict_personality_batch(lnk_df['clean'].tolist())
-                    lnk_avg = pd.DataFrame(lnk_traits).mean()
+        if lnk_csv and git_csv:
+            try:
+                with st.spinner("Analyzing and comparing data..."):
+                    with span("read_csv"):
+                        lnk_df = pd.read_csv(lnk_csv)
+                        git_df = pd.read_csv(git_csv)
+
+                    if not {'name', 'about', 'posts', 'experience', 'education'}.issubset(lnk_df.columns):
+                        st.error("❌ LinkedIn CSV missing required columns.")
+                    else:
+                        with span("clean", rows=len(lnk_df)):
+                            lnk_df['combined'] = lnk_df[['name', 'about', 'posts', 'experience', 'education']].astype(str).agg(' '.join, axis=1)
+                            lnk_df['clean'] = lnk_df['combined'].apply(clean_text)
+                        with span("score", rows=len(lnk_df)):
+                            lnk_traits = score_batch(lnk_df['clean'].tolist())
+                        lnk_avg = pd.DataFrame(lnk_traits).mean()
                 
-                if 'Latest Commit' not in git_df.columns:
-                    st.error("❌ GitHub CSV missing 'Latest Commit'.")
-                else:
-                    git_df['clean'] = git_df['Latest Commit'].astype(str).apply(clean_text)
-                    git_traits = predict_personality_batch(git_df['clean'].tolist())
-                    git_avg = pd.DataFrame(git_traits).mean()
+                    if 'Latest Commit' not in git_df.columns:
+                        st.error("❌ GitHub CSV missing 'Latest Commit'.")
+                    else:
+                        with span("clean", rows=len(git_df)):
+                            git_df['clean'] = git_df['Latest Commit'].astype(str).apply(clean_text)
+                        with span("score", rows=len(git_df)):
+                            git_traits = score_batch(git_df['clean'].tolist())
+                        git_avg = pd.DataFrame(git_traits).mean()
                 
-                if 'lnk_avg' in locals() and 'git_avg' in locals():
-                    comparison = pd.DataFrame({
-                        "Trait": lnk_avg.index,
-                        "LinkedIn": lnk_avg.values,
-                        "GitHub": git_avg.values
-                    })
-
-                    # Display comparison table
-                    st.markdown("### 📈 Trait Comparison Table")
-                    st.dataframe(
-                        comparison.style
-                        .background_gradient(cmap='Purples', subset=['LinkedIn'])
-                        .background_gradient(cmap='Greens', subset=['GitHub'])
-                        .format({"LinkedIn": "{:.2f}", "GitHub": "{:.2f}"}),
-                        use_container_width=True
-                    )
+                    if 'lnk_avg' in locals() and 'git_avg' in locals():
+                        comparison = pd.DataFrame({
+                            "Trait": lnk_avg.index,
+                            "LinkedIn": lnk_avg.values,
+                            "GitHub": git_avg.values
+                        })
 
-                    # Visual comparison
-                    st.markdown("### 📊 Platform Comparison")
-                    fig = go.Figure()
-                    fig.add_trace(go.Bar(
-                        x=comparison["Trait"],
-                        y=comparison["LinkedIn"],
-                        name="LinkedIn",
-                        marker_color="#4f46e5",
-                        hovertemplate="<b>LinkedIn</b><br>%{x}: %{y:.2f}<extra></extra>"
-                    ))
-                    fig.add_trace(go.Bar(
-                        x=comparison["Trait"],
-                        y=comparison["GitHub"],
-                        name="GitHub",
-                        marker_color="#10b981",
-                        hovertemplate="<b>GitHub</b><br>%{x}: %{y:.2f}<extra></extra>"
-                    ))
-                    fig.update_layout(
-                        barmode='group',
-                        title="Personality Trait Comparison: LinkedIn vs GitHub",
-                        plot_bgcolor='rgba(0,0,0,0)',
-                        paper_bgcolor='rgba(0,0,0,0)',
-                        xaxis_title=None,
-                        yaxis_title="Score",
-                        hovermode="x unified"
-                    )
-                    st.plotly_chart(fig, use_container_width=True)
+                        # Display comparison table
+                        st.markdown("### 📈 Trait Comparison Table")
+                        with span("render", styled=True):
+                            st.dataframe(
+                                comparison.style
+                                .background_gradient(cmap='Purples', subset=['LinkedIn'])
+                                .background_gradient(cmap='Greens', subset=['GitHub'])
+                                .format({"LinkedIn": "{:.2f}", "GitHub": "{:.2f}"}),
+                                use_container_width=True
+                            )
 
-                    # Key insights
-                    st.markdown("### 🔍 Key Insights")
-                    max_linkedin = comparison.loc[comparison['LinkedIn'].idxmax()]
-                    max_github = comparison.loc[comparison['GitHub'].idxmax()]
+                        # Visual comparison
+                        st.markdown("### 📊 Platform Comparison")
+                        fig = go.Figure()
+                        fig.add_trace(go.Bar(
+                            x=comparison["Trait"],
+                            y=comparison["LinkedIn"],
+                            name="LinkedIn",
+                            marker_color="#4f46e5",
+                            hovertemplate="<b>LinkedIn</b><br>%{x}: %{y:.2f}<extra></extra>"
+                        ))
+                        fig.add_trace(go.Bar(
+                            x=comparison["Trait"],
+                            y=comparison["GitHub"],
+                            name="GitHub",
+                            marker_color="#10b981",
+                            hovertemplate="<b>GitHub</b><br>%{x}: %{y:.2f}<extra></extra>"
+                        ))
+                        fig.update_layout(
+                            barmode='group',
+                            title="Personality Trait Comparison: LinkedIn vs GitHub",
+                            plot_bgcolor='rgba(0,0,0,0)',
+                            paper_bgcolor='rgba(0,0,0,0)',
+                            xaxis_title=None,
+                            yaxis_title="Score",
+                            hovermode="x unified"
+                        )
+                        st.plotly_chart(fig, use_container_width=True)
 
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown(f"""
-                            <div style="background-color: #eef2ff; border-radius: 12px; padding: 1.5rem; 
-                                border-left: 4px solid #4f46e5;">
-                                <h4 style="margin: 0 0 1rem 0;">📘 LinkedIn Dominant Trait</h4>
-                                <div style="font-size: 2rem; color: #4f46e5; margin-bottom: 0.5rem;">{max_linkedin['Trait']}</div>
-                                <div style="font-size: 1.5rem; font-weight: 600; color: #4f46e5;">{max_linkedin['LinkedIn']:.2f}</div>
-                                <p style="margin: 0.5rem 0 0; color: #64748b;">This trait is most prominent in LinkedIn profiles</p>
-                            </div>
-                        """, unsafe_allow_html=True)
+                        # Key insights
+                        st.markdown("### 🔍 Key Insights")
+                        max_linkedin = comparison.loc[comparison['LinkedIn'].idxmax()]
+                        max_github = comparison.loc[comparison['GitHub'].idxmax()]
 
-                    with col2:
-                        st.markdown(f"""
-                            <div style="background-color: #ecfdf5; border-radius: 12px; padding: 1.5rem; 
-                                border-left: 4px solid #10b981;">
-                                <h4 style="margin: 0 0 1rem 0;">🐙 GitHub Dominant Trait</h4>
-                                <div style="font-size: 2rem; color: #10b981; margin-bottom: 0.5rem;">{max_github['Trait']}</div>
-                                <div style="font-size: 1.5rem; font-weight: 600; color: #10b981;">{max_github['GitHub']:.2f}</div>
-                                <p style="margin: 0.5rem 0 0; color: #64748b;">This trait is most prominent in GitHub profiles</p>
-                            </div>
-                        """, unsafe_allow_html=True)
-
-        except Exception as e:
-            st.error(f"⚠️ Error during comparison: {str(e)}")
-            st.exception(e)
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.markdown(f"""
+                                <div style="background-color: #eef2ff; border-radius: 12px; padding: 1.5rem; 
+                                    border-left: 4px solid #4f46e5;">
+                                    <h4 style="margin: 0 0 1rem 0;">📘 LinkedIn Dominant Trait</h4>
+                                    <div style="font-size: 2rem; color: #4f46e5; margin-bottom: 0.5rem;">{max_linkedin['Trait']}</div>
+                                    <div style="font-size: 1.5rem; font-weight: 600; color: #4f46e5;">{max_linkedin['LinkedIn']:.2f}</div>
+                                    <p style="margin: 0.5rem 0 0; color: #64748b;">This trait is most prominent in LinkedIn profiles</p>
+                                </div>
+                            """, unsafe_allow_html=True)
+
+                        with col2:
+                            st.markdown(f"""
+                                <div style="background-color: #ecfdf5; border-radius: 12px; padding: 1.5rem; 
+                                    border-left: 4px solid #10b981;">
+                                    <h4 style="margin: 0 0 1rem 0;">🐙 GitHub Dominant Trait</h4>
+                                    <div style="font-size: 2rem; color: #10b981; margin-bottom: 0.5rem;">{max_github['Trait']}</div>
+                                    <div style="font-size: 1.5rem; font-weight: 600; color: #10b981;">{max_github['GitHub']:.2f}</div>
+                                    <p style="margin: 0.5rem 0 0; color: #64748b;">This trait is most prominent in GitHub profiles</p>
+                                </div>
+                            """, unsafe_allow_html=True)
+
+            except Exception as e:
+                st.error(f"⚠️ Error during comparison: {str(e)}")
+                st.exception(e)
+finally:
+    if profiler:
+        profiler.stop()
+    trace = finish_trace()
+
+# ---------------------------
+# Result Cache Stats
+# ---------------------------
+cache_stats = get_cache_stats()
+dedup = dedup_stats()
+cache_panel.markdown(f"""
+    <div style="background-color: rgba(255, 255, 255, 0.1); border-radius: 8px; padding: 0.75rem;">
+        <strong>⚡ Result Cache</strong><br>
+        Hits: {cache_stats['hits']} &nbsp;·&nbsp; Misses: {cache_stats['misses']}<br>
+        Hit rate: {cache_stats['hit_rate']:.0%}<br>
+        Dedup: {dedup['exact']} exact + {dedup['near']} near duplicates ({dedup['saved_fraction']:.0%} of inference saved)
+    </div>
+""", unsafe_allow_html=True)
+
+# ---------------------------
+# Stage Timings
+# ---------------------------
+with trace_panel.container():
+    st.markdown(f"**⏱️ Stage Timings** · {trace.elapsed_ms():.0f} ms")
+    if trace.spans:
+        spans = sorted(trace.spans, key=lambda s: s["start_ms"])
+        waterfall = go.Figure(go.Bar(
+            y=[s["name"] for s in spans],
+            x=[s["duration_ms"] for s in spans],
+            base=[s["start_ms"] for s in spans],
+            orientation='h',
+            marker_color="#38bdf8",
+            hovertemplate="%{y}: %{x:.1f} ms<extra></extra>"
+        ))
+        waterfall.update_layout(
+            height=60 + 28 * len(trace.totals()),
+            margin=dict(l=0, r=0, t=10, b=0),
+            xaxis_title="ms",
+            yaxis=dict(autorange="reversed"),
+            plot_bgcolor='rgba(0,0,0,0)',
+            paper_bgcolor='rgba(0,0,0,0)'
+        )
+        st.plotly_chart(waterfall, use_container_width=True)
+        st.caption(" · ".join(f"{name} {ms:.0f} ms" for name, ms in trace.totals().items()))
+        st.download_button(
+            "📥 Spans (JSONL)",
+            trace.to_jsonl(),
+            file_name=f"trace_{trace.trace_id}.jsonl",
+            mime="application/json"
+        )
+    if profiler:
+        with st.expander(f"🐞 {profiler.kind}"):
+            st.code(profiler.summary())
+            profile_name, profile_data = profiler.export()
+            st.download_button("📥 Profile", profile_data, file_name=profile_name)
 
 # ---------------------------
 # Footer
@@ -0,0 +1,254 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CSV = os.path.join(ROOT, "cleaned_texts.csv")
+DEFAULT_BASELINE = os.path.join(ROOT, "benchmark_baseline.json")
+TINY_MODEL_DIR = os.path.join(ROOT, ".cache", "tiny_models")
+
+# Pipeline order; batch stages are run once per batch size
+STAGES = ["clean", "embed", "embed_batch", "predict", "predict_batch", "report"]
+BATCH_STAGES = {"embed_batch", "predict_batch"}
+DEFAULT_SIZES = [100, 500]
+DEFAULT_BATCH_SIZES = [8, 16, 32]
+DEFAULT_THRESHOLD = 0.20
+
+def load_texts(csv_path: str, size: int) -> list[str]:
+    """
+    First `size` texts of the corpus. When `size` exceeds the corpus the texts
+    are repeated with a pass number appended, so no text is a cache hit.
+    """
+    import pandas as pd
+
+    corpus = pd.read_csv(csv_path)["text"].fillna("").astype(str).tolist()
+    texts = []
+    for n in range(size):
+        text, repeat = corpus[n % len(corpus)], n // len(corpus)
+        texts.append(text if repeat == 0 else f"{text} pass{repeat}")
+    return texts
+
+def build_tiny_models(target: str = TINY_MODEL_DIR, csv_path: str = DEFAULT_CSV) -> dict:
+    """
+    Write a tiny randomly initialised BERT classifier and sentence embedder to
+    `target`, with a WordPiece vocabulary built from the corpus. They have the
+    same interfaces as the real models, so every stage runs offline. Scores
+    from them are meaningless; only the timings are of interest.
+    """
+    classifier_dir = os.path.join(target, "classifier")
+    embedder_dir = os.path.join(target, "embedder")
+    paths = {"PERSONALITY_MODEL_ID": classifier_dir, "EMBEDDING_MODEL_NAME": embedder_dir}
+    if os.path.exists(os.path.join(embedder_dir, "modules.json")):
+        return paths
+
+    import re
+    from collections import Counter
+
+    import torch
+    from sentence_transformers import SentenceTransformer, models
+    from transformers import BertConfig, BertForSequenceClassification, BertModel, BertTokenizerFast
+
+    torch.manual_seed(0)
+    os.makedirs(target, exist_ok=True)
+    words = Counter(re.findall(r"[a-z]+", " ".join(load_texts(csv_path, 1000)).lower()))
+    letters = "abcdefghijklmnopqrstuvwxyz0123456789"
+    vocab = (["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + list(letters) + [f"##{c}" for c in letters]
+             + [w for w, _ in words.most_common(4000) if len(w) > 1])
+    vocab_path = os.path.join(target, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab) + "\n")
+    tokenizer = BertTokenizerFast(vocab_file=vocab_path, do_lower_case=True)
+
+    config = BertConfig(vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=128, max_position_embeddings=512, num_labels=5)
+    BertForSequenceClassification(config).save_pretrained(classifier_dir)
+    tokenizer.save_pretrained(classifier_dir)
+
+    encoder_dir = os.path.join(target, "encoder")
+    BertModel(config).save_pretrained(encoder_dir)
+    tokenizer.save_pretrained(encoder_dir)
+    encoder = models.Transformer(encoder_dir, max_seq_length=256)
+    pooling = models.Pooling(encoder.get_word_embedding_dimension(), pooling_mode="mean")
+    SentenceTransformer(modules=[encoder, pooling]).save(embedder_dir)
+    return paths
+
+def _peak_rss_mb() -> float:
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def _timed_calls(fn, chunks) -> list[float]:
+    import time
+
+    latencies = []
+    for chunk in chunks:
+        start = time.perf_counter()
+        fn(chunk)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+def run_case(stage: str, size: int, batch_size: int, csv_path: str, call_rows: int) -> dict:
+    """
+    Time one stage in this process. Inputs for a stage are produced by the
+    stages before it and are not timed; model loading is reported on its own.
+    Latencies are per call: per text for single-text stages, per chunk of
+    `call_rows` texts for batch stages.
+    """
+    import time
+
+    from utils.preprocess import clean_text, clean_texts, ensure_nltk_resources
+
+    raw = load_texts(csv_path, size)
+    ensure_nltk_resources()
+    texts = raw if stage == "clean" else clean_texts(raw)
+    chunks = [texts[i:i + call_rows] for i in range(0, len(texts), call_rows)]
+    load_seconds = 0.0
+
+    if stage == "clean":
+        fn, calls = clean_text, texts
+    elif stage in ("embed", "embed_batch"):
+        from model import bert_model
+
+        start = time.perf_counter()
+        bert_model.load_model()
+        load_seconds = time.perf_counter() - start
+        if stage == "embed":
+            fn, calls = bert_model.get_bert_embedding, texts
+        else:
+            fn, calls = (lambda chunk: bert_model.get_bert_embeddings_batch(chunk, batch_size)), chunks
+    elif stage in ("predict", "predict_batch"):
+        from model import predictor
+
+        start = time.perf_counter()
+        predictor.load_model()
+        predictor.predict_personality("warm up")
+        load_seconds = time.perf_counter() - start
+        if stage == "predict":
+            fn, calls = predictor.predict_personality, texts
+        else:
+            fn, calls = (lambda chunk: predictor.predict_personality_batch(chunk, batch_size)), chunks
+    elif stage == "report":
+        from model.predictor import TRAITS
+        from report.report_generator import generate_report
+
+        rng = np.random.default_rng(0)
+        calls = [(f"User {i}", dict(zip(TRAITS, rng.random(len(TRAITS)).round(2)))) for i in range(size)]
+        os.chdir(tempfile.mkdtemp(prefix="benchmark_reports_"))
+        fn = lambda args: generate_report(*args)
+    else:
+        raise ValueError(f"Unknown stage '{stage}'. Choose from: {', '.join(STAGES)}")
+
+    latencies = _timed_calls(fn, calls)
+    elapsed = sum(latencies)
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "items": size,
+        "items_per_sec": size / elapsed if elapsed else 0.0,
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p95_ms": float(np.percentile(latencies_ms, 95)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "load_seconds": load_seconds,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+def run_case_isolated(stage, size, batch_size, csv_path, call_rows, env) -> dict:
+    """
+    Run one case in a fresh interpreter so peak RSS and warm caches belong to
+    that case alone. The embedding cache is pointed at an empty directory.
+    """
+    with tempfile.TemporaryDirectory(prefix="benchmark_embeddings_") as cache_dir:
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--case", stage, str(size), str(batch_size),
+             "--csv", csv_path, "--call-rows", str(call_rows)],
+            capture_output=True, text=True, cwd=ROOT,
+            env={**os.environ, **env, "EMBEDDING_CACHE_DIR": cache_dir},
+        )
+    if proc.returncode != 0:
+        raise RuntimeError(f"{stage} (n={size}, batch={batch_size}) failed:\n{proc.stderr.strip()}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+def case_key(models: str, stage: str, size: int, batch_size: int) -> str:
+    batch = f"bs={batch_size}" if stage in BATCH_STAGES else "bs=-"
+    return f"{models}:{stage}:n={size}:{batch}"
+
+def find_regressions(results: dict, baseline: dict, threshold: float) -> list[str]:
+    """
+    Compare against stored baseline cases. Throughput may not drop, and p95
+    latency and peak RSS may not rise, by more than `threshold` (a fraction).
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        if current["items_per_sec"] < previous["items_per_sec"] * (1 - threshold):
+            regressions.append(f"{key}: throughput {previous['items_per_sec']:.1f} -> {current['items_per_sec']:.1f} items/s")
+        if current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{key}: p95 {previous['p95_ms']:.2f} -> {current['p95_ms']:.2f} ms")
+        if current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + threshold):
+            regressions.append(f"{key}: peak RSS {previous['peak_rss_mb']:.0f} -> {current['peak_rss_mb']:.0f} MB")
+    return regressions
+
+def _machine() -> dict:
+    return {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()}
+
+# Time clean -> embed -> predict -> report on the shipped corpus and check for regressions
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark the scoring pipeline stage by stage.")
+    parser.add_argument("--stages", default=",".join(STAGES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=DEFAULT_BATCH_SIZES)
+    parser.add_argument("--call-rows", type=int, default=64, help="Texts per call for batch stages")
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--tiny-models", action="store_true",
+                        help="Use tiny local checkpoints instead of downloading the real models")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed relative slowdown before a case is flagged")
+    parser.add_argument("--case", nargs=3, metavar=("STAGE", "SIZE", "BATCH_SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        stage, size, batch_size = args.case
+        print(json.dumps(run_case(stage, int(size), int(batch_size), args.csv, args.call_rows)))
+        raise SystemExit(0)
+
+    env = build_tiny_models(csv_path=args.csv) if args.tiny_models else {}
+    models = "tiny" if args.tiny_models else "full"
+    results = {}
+    print(f"{'case':<44} {'items/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'load s':>7} {'RSS MB':>7}")
+    for stage in [s for s in args.stages.split(",") if s]:
+        for size in args.sizes:
+            for batch_size in (args.batch_sizes if stage in BATCH_STAGES else [0]):
+                key = case_key(models, stage, size, batch_size)
+                result = run_case_isolated(stage, size, batch_size, args.csv, args.call_rows, env)
+                results[key] = result
+                print(f"{key:<44} {result['items_per_sec']:10.1f} {result['p50_ms']:9.2f} {result['p95_ms']:9.2f} "
+                      f"{result['p99_ms']:9.2f} {result['load_seconds']:7.2f} {result['peak_rss_mb']:7.0f}")
+
+    stored = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+
+    regressions = find_regressions(results, stored.get("cases", {}), args.threshold)
+    if stored and stored.get("machine") != _machine():
+        print(f"ℹ️ Baseline was recorded on {stored.get('machine')}; comparisons may not be meaningful.")
+    for line in regressions:
+        print(f"❌ {line}")
+
+    if args.save_baseline:
+        stored = {"machine": _machine(), "cases": {**stored.get("cases", {}), **results}}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(stored, f, indent=2, sort_keys=True)
+        print(f"💾 Saved {len(results)} cases to {args.baseline}")
+    elif not regressions:
+        print(f"✅ No regressions beyond {args.threshold:.0%}")
+    raise SystemExit(1 if regressions and not args.save_baseline else 0)
@@ -0,0 +1,51 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+
+# Each scenario runs in a fresh interpreter so nothing is already imported or loaded.
+# "eager" reproduces the old import-time behaviour: both Hugging Face models and the
+# NLTK data are loaded before the first page is rendered.
+_SCENARIO = r'''
+import json, sys, time
+start = time.perf_counter()
+if sys.argv[1] == "eager":
+    from utils.preprocess import ensure_nltk_resources
+    from model import bert_model, predictor
+    ensure_nltk_resources()
+    bert_model.load_model()
+    predictor.load_model()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file(sys.argv[2], default_timeout=600)
+at.run()
+elapsed = time.perf_counter() - start
+print(json.dumps({"seconds": elapsed, "exception": bool(at.exception)}))
+'''
+
+def time_first_paint(mode: str) -> dict:
+    proc = subprocess.run(
+        [sys.executable, "-c", _SCENARIO, mode, APP_PATH],
+        capture_output=True, text=True, check=True,
+        cwd=os.path.dirname(APP_PATH),
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+# Compare time-to-first-paint of the landing page with eager vs lazy model loading
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark Streamlit time-to-first-paint.")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    for mode in ["eager", "lazy"]:
+        timings = []
+        for _ in range(args.runs):
+            result = time_first_paint(mode)
+            if result["exception"]:
+                raise SystemExit(f"❌ App raised during the {mode} run.")
+            timings.append(result["seconds"])
+        timings.sort()
+        print(f"⏱️ {mode:>5}: median {timings[len(timings) // 2]:.2f}s  "
+              f"min {timings[0]:.2f}s  max {timings[-1]:.2f}s  ({args.runs} runs)")
@@ -1,19 +1,78 @@
-from sentence_transformers import SentenceTransformer
 import numpy as np
+import os
+import threading
+import time
+from model.embedding_cache import EmbeddingCache, default_cache_dir
+from utils.dedup import deduplicate
+from utils import metrics
 
-# Load SentenceTransformer model once
-model = SentenceTransformer('all-MiniLM-L6-v2')
+MODEL_NAME = os.environ.get("EMBEDDING_MODEL_NAME", 'all-MiniLM-L6-v2')
+CACHE_DIR = default_cache_dir(MODEL_NAME)
+
+# SentenceTransformer model and its cache are loaded on first use, once per process
+model = None
+cache = None
+_load_lock = threading.Lock()
+
+_load_seconds = metrics.gauge("embedding_model_load_seconds", "Seconds taken to load the sentence embedder")
+_embed_seconds = metrics.histogram("embedding_seconds", "Latency of one embedding call")
+_texts_total = metrics.counter("embedding_texts_total", "Texts requested from the embedder")
+_encoded_total = metrics.counter("embedding_encoded_total", "Texts actually encoded (embedding cache misses)")
+_texts_per_second = metrics.gauge("embedding_texts_per_second", "Throughput of the last embedding call")
+
+def load_model():
+    """
+    Load the SentenceTransformer model and embedding cache once and return them.
+    """
+    global model, cache
+    if model is None:
+        with _load_lock:
+            if model is None:
+                from sentence_transformers import SentenceTransformer
+                start = time.perf_counter()
+                loaded = SentenceTransformer(MODEL_NAME)
+                cache = EmbeddingCache(CACHE_DIR, loaded.get_sentence_embedding_dimension(), MODEL_NAME)
+                model = loaded
+                _load_seconds.set(time.perf_counter() - start)
+    return model, cache
+
+def _record_call(texts: int, elapsed: float):
+    _embed_seconds.observe(elapsed)
+    _texts_total.inc(texts)
+    if elapsed > 0:
+        _texts_per_second.set(texts / elapsed)
 
 def get_bert_embedding(text: str) -> np.ndarray:
     """
     Generate embedding vector for a single text input.
     """
-    embedding = model.encode([text], convert_to_numpy=True)[0]
+    model, cache = load_model()
+    start = time.perf_counter()
+    embedding = cache.get(text)
+    if embedding is None:
+        embedding = model.encode([text], convert_to_numpy=True)[0]
+        cache.put(text, embedding)
+        _encoded_total.inc()
+    _record_call(1, time.perf_counter() - start)
     return embedding
 
 def get_bert_embeddings_batch(text_list: list[str], batch_size: int = 16) -> list[np.ndarray]:
     """
     Generate embeddings for a batch of texts.
+    Duplicate texts are embedded once (see utils.dedup), and only texts
+    missing from the embedding cache are sent to the model.
     """
-    embeddings = model.encode(text_list, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True)
-    return embeddings.tolist()
+    model, cache = load_model()
+    start = time.perf_counter()
+    unique, index = deduplicate(text_list, stage="embed")
+    embeddings = cache.get_many(unique)
+    missing = [i for i, emb in enumerate(embeddings) if emb is None]
+    if missing:
+        missing_texts = [unique[i] for i in missing]
+        encoded = model.encode(missing_texts, batch_size=batch_size, show_progress_bar=False, convert_to_numpy=True)
+        cache.put_many(missing_texts, encoded)
+        for i, emb in zip(missing, encoded):
+            embeddings[i] = emb
+        _encoded_total.inc(len(missing))
+    _record_call(len(text_list), time.perf_counter() - start)
+    return [np.asarray(embeddings[j]).tolist() for j in index]
@@ -0,0 +1,53 @@
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.preprocess import clean_texts
+from model import predictor
+
+# Largest allowed per-trait difference from fp32 torch, on scores rounded to 2 decimals
+DEFAULT_TOLERANCES = {"int8": 0.05, "onnx": 0.01}
+
+def score_matrix(texts, backend: str, batch_size: int = 16):
+    """
+    Score texts with one backend; returns (n x 5 score matrix, texts per second).
+    """
+    predictor.set_backend(backend)
+    predictor.predict_personality_batch(texts[:batch_size], batch_size)  # warm up / export
+    start = time.perf_counter()
+    results = predictor.predict_personality_batch(texts, batch_size)
+    elapsed = time.perf_counter() - start
+    scores = np.array([[r[t] for t in predictor.TRAITS] for r in results])
+    return scores, len(texts) / elapsed
+
+# Agreement and throughput of each backend against fp32 torch on cleaned_texts.csv
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Check inference backends against fp32 torch.")
+    parser.add_argument("--csv", default="cleaned_texts.csv")
+    parser.add_argument("--column", default="text")
+    parser.add_argument("--limit", type=int, default=200, help="Rows to score (0 = all)")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--backends", default="int8,onnx")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.csv)[args.column].astype(str).tolist()
+    if args.limit:
+        texts = texts[:args.limit]
+    texts = clean_texts(texts)
+
+    reference, reference_rate = score_matrix(texts, "torch", args.batch_size)
+    print(f"torch  {reference_rate:8.1f} texts/s  (reference)")
+
+    failed = False
+    for backend in [b for b in args.backends.split(",") if b]:
+        scores, rate = score_matrix(texts, backend, args.batch_size)
+        diff = np.abs(scores - reference).max(axis=0)
+        tolerance = DEFAULT_TOLERANCES.get(backend, 0.0)
+        ok = bool((diff <= tolerance + 1e-9).all())
+        failed = failed or not ok
+        per_trait = "  ".join(f"{t[:4]} {d:.2f}" for t, d in zip(predictor.TRAITS, diff))
+        print(f"{backend:<6} {rate:8.1f} texts/s  x{rate / reference_rate:.2f}  "
+              f"max |Δ| {per_trait}  {'✅' if ok else '❌'} (tol {tolerance})")
+    raise SystemExit(1 if failed else 0)
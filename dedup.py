@@ -0,0 +1,183 @@
+import os
+import threading
+
+import numpy as np
+from utils import metrics
+
+# off: score every text; exact (default): identical texts are scored once;
+# near (opt-in): texts whose character-shingle Jaccard similarity reaches
+# NEAR_THRESHOLD also share one score, the first such text's. Near groups
+# depend on input order and batch composition, so the same row can be scored
+# differently across runs; only exact dedup is result-preserving.
+MODES = ("off", "exact", "near")
+DEDUP_MODE = os.environ.get("PERSONALITY_DEDUP", "exact")
+NEAR_THRESHOLD = float(os.environ.get("PERSONALITY_DEDUP_THRESHOLD", "0.9"))
+
+SHINGLE_CHARS = 5
+NUM_PERM = 64
+BANDS = 16
+
+_texts_total = metrics.counter("dedup_texts_total", "Texts passed through dedup, by stage and result")
+
+_rng = np.random.default_rng(1)
+# Multiply-shift hash family: odd 64-bit multipliers plus offsets, one pair per permutation
+_PERM_A = (_rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64) << np.uint64(1)) | np.uint64(1)
+_PERM_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_SHINGLE_WEIGHTS = np.uint64(256) ** np.arange(SHINGLE_CHARS - 1, -1, -1, dtype=np.uint64)
+
+_stats_lock = threading.Lock()
+_stats = {"texts": 0, "scored": 0, "exact": 0, "near": 0}
+
+def shingles(text: str, k: int = SHINGLE_CHARS) -> np.ndarray:
+    """
+    Sorted unique k-character shingles of `text` (whitespace collapsed), each
+    packed into one uint64. Cleaned texts are ASCII, so for k <= 8 the packing is exact.
+    """
+    data = np.frombuffer(" ".join(text.split()).encode("utf-8"), dtype=np.uint8)
+    if len(data) < k:
+        return np.zeros(0, dtype=np.uint64)
+    windows = np.lib.stride_tricks.sliding_window_view(data, k).astype(np.uint64)
+    return np.unique(windows @ _SHINGLE_WEIGHTS[-k:])
+
+def minhash(shingle_set: np.ndarray) -> np.ndarray:
+    """
+    NUM_PERM-value MinHash signature of a non-empty shingle array.
+    """
+    hashed = (_PERM_A[:, None] * shingle_set[None, :] + _PERM_B[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1)
+
+def jaccard(a: np.ndarray, b: np.ndarray) -> float:
+    if len(a) == 0 and len(b) == 0:
+        return 1.0
+    shared = len(np.intersect1d(a, b, assume_unique=True))
+    return shared / (len(a) + len(b) - shared)
+
+class NearDuplicateIndex:
+    """
+    MinHash/LSH index of representative texts.
+
+    Signatures are cut into BANDS bands; texts sharing any band are candidates,
+    and a candidate is accepted only if the exact Jaccard similarity of the
+    shingle sets reaches `threshold`. With 16 bands of 4 values, a pair at
+    similarity 0.9 becomes a candidate with probability above 0.999.
+    """
+
+    def __init__(self, threshold: float = NEAR_THRESHOLD, bands: int = BANDS):
+        if NUM_PERM % bands:
+            raise ValueError(f"bands must divide {NUM_PERM}")
+        self.threshold = threshold
+        self.rows = NUM_PERM // bands
+        self._buckets = [{} for _ in range(bands)]
+        self._shingles = {}
+
+    def _band_keys(self, signature):
+        return [signature[b * self.rows:(b + 1) * self.rows].tobytes() for b in range(len(self._buckets))]
+
+    def find_or_add(self, key: int, text: str):
+        """
+        Return the key of an indexed text similar enough to `text`, or index
+        `text` under `key` and return None. Texts shorter than one shingle are
+        never matched.
+        """
+        shingle_set = shingles(text)
+        if len(shingle_set) == 0:
+            return None
+        band_keys = self._band_keys(minhash(shingle_set))
+        candidates = dict.fromkeys(c for bucket, band in zip(self._buckets, band_keys) for c in bucket.get(band, ()))
+        best, best_similarity = None, self.threshold
+        for candidate in candidates:
+            similarity = jaccard(shingle_set, self._shingles[candidate])
+            if similarity >= best_similarity:
+                best, best_similarity = candidate, similarity
+        if best is not None:
+            return best
+        self._shingles[key] = shingle_set
+        for bucket, band in zip(self._buckets, band_keys):
+            bucket.setdefault(band, []).append(key)
+        return None
+
+def deduplicate(texts, mode: str = None, threshold: float = None, stage: str = "score") -> tuple[list[str], list[int]]:
+    """
+    Return `(unique, index)` such that `unique[index[i]]` is the text scored in
+    place of `texts[i]`. Exact duplicates are found by hashing; in "near" mode
+    the first text of each near-duplicate group represents the group.
+    """
+    mode = mode or DEDUP_MODE
+    if mode not in MODES:
+        raise ValueError(f"Unknown dedup mode '{mode}'. Choose from: {', '.join(MODES)}")
+    threshold = NEAR_THRESHOLD if threshold is None else threshold
+    texts = list(texts)
+    if mode == "off":
+        return texts, list(range(len(texts)))
+
+    near_index = NearDuplicateIndex(threshold) if mode == "near" else None
+    positions = {}
+    unique, index = [], []
+    exact = near = 0
+    for text in texts:
+        position = positions.get(text)
+        if position is not None:
+            exact += 1
+        else:
+            match = near_index.find_or_add(len(unique), text) if near_index else None
+            if match is not None:
+                position = match
+                near += 1
+            else:
+                position = len(unique)
+                unique.append(text)
+            positions[text] = position
+        index.append(position)
+
+    _texts_total.labels(stage=stage, result="unique").inc(len(unique))
+    _texts_total.labels(stage=stage, result="exact").inc(exact)
+    _texts_total.labels(stage=stage, result="near").inc(near)
+    with _stats_lock:
+        _stats["texts"] += len(texts)
+        _stats["scored"] += len(unique)
+        _stats["exact"] += exact
+        _stats["near"] += near
+    return unique, index
+
+def dedup_apply(texts, score_fn, mode: str = None, threshold: float = None, stage: str = "score") -> list:
+    """
+    Score each unique text once with `score_fn(list_of_texts)` and fan the
+    results back out to every input position.
+    """
+    unique, index = deduplicate(texts, mode, threshold, stage)
+    if not unique:
+        return []
+    results = score_fn(unique)
+    return [results[j] for j in index]
+
+def dedup_stats() -> dict:
+    """
+    Process-wide totals; `saved_fraction` is the share of texts that needed no inference of their own.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["saved_fraction"] = 1 - stats["scored"] / stats["texts"] if stats["texts"] else 0.0
+    return stats
+
+# Report how much inference dedup would save on a CSV export
+if __name__ == '__main__':
+    import argparse
+    import time
+    from utils.streaming import PLATFORMS, combine_texts
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Measure exact and near-duplicate texts in a CSV export.")
+    parser.add_argument("input")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default="linkedin")
+    parser.add_argument("--threshold", type=float, default=NEAR_THRESHOLD)
+    args = parser.parse_args()
+
+    id_columns, text_columns = PLATFORMS[args.platform]
+    df = pd.read_csv(args.input, usecols=list(dict.fromkeys(id_columns + text_columns))).fillna("")
+    texts = combine_texts(df, text_columns)
+    for mode in ("exact", "near"):
+        start = time.perf_counter()
+        unique, _ = deduplicate(texts, mode, args.threshold)
+        elapsed = time.perf_counter() - start
+        print(f"{mode:<6} {len(texts)} texts -> {len(unique)} to score "
+              f"({1 - len(unique) / max(len(texts), 1):.1%} inference saved, dedup took {elapsed * 1000:.0f} ms)")
@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import random
+import time
+
+import numpy as np
+
+from train_model import DATA_PATH, TRAIT_KEYS, clean_stage, label_stage, split_stage
+
+DEFAULT_LAYERS = 6
+DEFAULT_MAX_LENGTH = 256
+AGREEMENT_TOLERANCE = 0.05
+
+def build_student(teacher, num_layers: int = DEFAULT_LAYERS):
+    """
+    Same architecture as the teacher with `num_layers` encoder layers,
+    initialised from evenly spaced teacher layers (first and last included)
+    plus the teacher's embeddings, pooler and classifier.
+    """
+    import copy
+    from transformers import AutoModelForSequenceClassification
+
+    config = copy.deepcopy(teacher.config)
+    teacher_layers = config.num_hidden_layers
+    if not 1 <= num_layers <= teacher_layers:
+        raise ValueError(f"num_layers must be between 1 and {teacher_layers}")
+    config.num_hidden_layers = num_layers
+    student = AutoModelForSequenceClassification.from_config(config)
+
+    keep = np.linspace(0, teacher_layers - 1, num_layers).round().astype(int).tolist()
+    state = {}
+    for name, tensor in teacher.state_dict().items():
+        parts = name.split(".")
+        if "layer" in parts and parts[parts.index("layer") + 1].isdigit():
+            i = parts.index("layer") + 1
+            teacher_index = int(parts[i])
+            if teacher_index not in keep:
+                continue
+            parts[i] = str(keep.index(teacher_index))
+        state[".".join(parts)] = tensor
+    student.load_state_dict(state)
+    return student, keep
+
+def train_student(student, tokenizer, texts, targets, epochs: int = 3, batch_size: int = 16, lr: float = 5e-5,
+                  max_length: int = DEFAULT_MAX_LENGTH, seed: int = 42):
+    """
+    Fit sigmoid(student logits) to the teacher's trait probabilities (MSE).
+    Batches are length-bucketed so padding stays small, and shuffled per epoch.
+    """
+    import torch
+    from model.length_scheduler import LengthScheduler
+
+    torch.manual_seed(seed)
+    rng = random.Random(seed)
+    encodings = [tokenizer(text, truncation=True, max_length=max_length) for text in texts]
+    batches = LengthScheduler(batch_size=batch_size).schedule([len(e["input_ids"]) for e in encodings])
+    targets = torch.as_tensor(np.asarray(targets), dtype=torch.float32)
+    optimizer = torch.optim.AdamW(student.parameters(), lr=lr)
+    total_steps = epochs * len(batches)
+    scheduler = torch.optim.lr_scheduler.LambdaLR(optimizer, lambda step: 1 - step / max(total_steps, 1))
+
+    student.train()
+    for epoch in range(epochs):
+        rng.shuffle(batches)
+        losses = []
+        start = time.perf_counter()
+        for batch in batches:
+            inputs = tokenizer.pad([encodings[i] for i in batch], padding=True, return_tensors="pt")
+            loss = torch.nn.functional.mse_loss(torch.sigmoid(student(**inputs).logits), targets[batch])
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            scheduler.step()
+            losses.append(loss.item())
+        print(f"🏋️ Epoch {epoch + 1}/{epochs}: loss {np.mean(losses):.5f} ({time.perf_counter() - start:.0f}s)")
+    student.eval()
+    return student
+
+def agreement(student_scores: np.ndarray, teacher_scores: np.ndarray) -> dict:
+    diff = np.abs(student_scores - teacher_scores)
+    report = {}
+    for j, trait in enumerate(TRAIT_KEYS):
+        s, t = student_scores[:, j], teacher_scores[:, j]
+        report[trait] = {
+            "mae": float(diff[:, j].mean()),
+            "max_abs_diff": float(diff[:, j].max()),
+            f"within_{AGREEMENT_TOLERANCE}": float((diff[:, j] <= AGREEMENT_TOLERANCE + 1e-9).mean()),
+            "pearson_r": float(np.corrcoef(s, t)[0, 1]) if s.std() > 0 and t.std() > 0 else float("nan"),
+        }
+    return report
+
+def _timed_scores(backend: str, texts) -> tuple[np.ndarray, float]:
+    from model import predictor
+    predictor.set_backend(backend)
+    predictor.predict_personality_batch(texts[:16])  # warm up
+    start = time.perf_counter()
+    results = predictor.predict_personality_batch(texts)
+    rate = len(texts) / (time.perf_counter() - start)
+    return np.array([[r[t] for t in TRAIT_KEYS] for r in results]), rate
+
+# Distil the BERT personality classifier into a smaller student and report speedup and agreement
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Distil the personality classifier into a smaller student.")
+    parser.add_argument("--csv", default=DATA_PATH)
+    parser.add_argument("--layers", type=int, default=DEFAULT_LAYERS)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--lr", type=float, default=5e-5)
+    parser.add_argument("--max-length", type=int, default=DEFAULT_MAX_LENGTH,
+                        help="Training sequence length; inference still uses the model maximum")
+    parser.add_argument("--output", default=None, help="Defaults to PERSONALITY_STUDENT_DIR / model/student")
+    args = parser.parse_args()
+
+    from model import predictor
+    output = args.output or predictor.STUDENT_DIR
+
+    texts, clean_key = clean_stage(args.csv)
+    teacher_scores, _ = label_stage(texts, clean_key)
+    split, _ = split_stage(len(texts))
+    train_texts = [texts[i] for i in split["train"]]
+    test_texts = [texts[i] for i in split["test"]]
+
+    tokenizer, teacher = predictor.load_model()
+    student, kept = build_student(teacher, args.layers)
+    print(f"🎓 Student: {args.layers} of {teacher.config.num_hidden_layers} layers (teacher layers {kept}), "
+          f"{sum(p.numel() for p in student.parameters()) / 1e6:.1f}M vs "
+          f"{sum(p.numel() for p in teacher.parameters()) / 1e6:.1f}M parameters")
+    train_student(student, tokenizer, train_texts, np.asarray(teacher_scores)[split["train"]],
+                  args.epochs, args.batch_size, args.lr, args.max_length)
+
+    os.makedirs(output, exist_ok=True)
+    student.save_pretrained(output)
+    tokenizer.save_pretrained(output)
+    print(f"💾 Student saved to {output}")
+
+    # Held-out agreement and speed, both through predict_personality_batch
+    predictor.STUDENT_DIR = output
+    reference, teacher_rate = _timed_scores("torch", test_texts)
+    scores, student_rate = _timed_scores("student", test_texts)
+    report = {
+        "layers": args.layers,
+        "teacher_layers": kept,
+        "held_out_texts": len(test_texts),
+        "teacher_texts_per_sec": teacher_rate,
+        "student_texts_per_sec": student_rate,
+        "speedup": student_rate / teacher_rate,
+        "traits": agreement(scores, reference),
+    }
+    with open(os.path.join(output, "distillation_report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"⚡ teacher {teacher_rate:.1f} texts/s  student {student_rate:.1f} texts/s  (x{report['speedup']:.2f})")
+    print(f"{'trait':<18} {'MAE':>6} {'max |Δ|':>8} {f'≤{AGREEMENT_TOLERANCE}':>7} {'r':>6}")
+    for trait, r in report["traits"].items():
+        print(f"{trait:<18} {r['mae']:6.3f} {r['max_abs_diff']:8.3f} "
+              f"{r[f'within_{AGREEMENT_TOLERANCE}']:7.0%} {r['pearson_r']:6.2f}")
@@ -0,0 +1,276 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, one process per cache directory
+    fcntl = None
+
+DEFAULT_MAX_ENTRIES = 100_000
+_MIN_GROWTH_ROWS = 1024
+
+def default_cache_dir(model_name: str) -> str:
+    """
+    Per-model cache directory used by bert_model; EMBEDDING_CACHE_DIR overrides it.
+    """
+    return os.environ.get("EMBEDDING_CACHE_DIR", os.path.join(".cache", "embeddings", model_name.replace("/", "--")))
+
+def text_key(text: str, model_name: str) -> str:
+    """
+    Content address for a text under a given embedding model.
+    """
+    return hashlib.sha256(f"{model_name}\x00{text}".encode("utf-8")).hexdigest()
+
+class EmbeddingCache:
+    """
+    On-disk embedding cache keyed by hash(model name + text).
+
+    Vectors live in a memory-mapped float32 matrix (`vectors.f32`) and the
+    key -> row mapping in an append-only log (`index.jsonl`). When the cache
+    holds `max_entries` rows the least recently used entry is evicted and its
+    row reused. The log is rewritten in LRU order once it grows to twice the
+    number of live entries, which also persists the recency order.
+
+    Safe to share between threads and processes: every operation holds a
+    thread lock plus an fcntl lock on the directory, and first replays
+    index records other processes appended (or the whole index after they
+    compacted it), so two processes never hand out the same row.
+    """
+
+    def __init__(self, path: str, dim: int, model_name: str, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.dim = dim
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(path, exist_ok=True)
+        self._vectors_path = os.path.join(path, "vectors.f32")
+        self._index_path = os.path.join(path, "index.jsonl")
+        self._entries = OrderedDict()  # key -> row, oldest first
+        self._free_rows = []
+        self._high = 0  # rows ever allocated in vectors.f32
+        self._log_lines = 0
+        self._log_offset = 0  # bytes of index.jsonl already applied
+        self._log_inode = None
+        self._capacity = 0
+        self._vectors = None
+        self._lock = threading.RLock()
+        self._lock_file = open(os.path.join(path, "lock"), "a+b")
+
+        with self._locked(exclusive=False):
+            self._open_vectors()
+
+    @contextmanager
+    def _locked(self, exclusive: bool = True):
+        """
+        Hold the thread lock and the directory's file lock, with the index
+        caught up to what other processes wrote.
+        """
+        with self._lock:
+            if fcntl is not None:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self._sync()
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    # ---- persistence ----
+
+    def _sync(self):
+        """
+        Apply index records appended since the last sync; reload everything
+        if the index was compacted (replaced) in the meantime.
+        """
+        try:
+            stat = os.stat(self._index_path)
+        except FileNotFoundError:
+            return
+        if stat.st_ino != self._log_inode or stat.st_size < self._log_offset:
+            self._entries.clear()
+            self._log_lines = 0
+            self._log_offset = 0
+            self._log_inode = stat.st_ino
+        elif stat.st_size == self._log_offset:
+            return
+        with open(self._index_path, "rb") as f:
+            f.seek(self._log_offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # torn final line, or a record still being written
+                self._log_offset += len(line)
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn line left by a crash
+                self._log_lines += 1
+                key, row = record["k"], record["r"]
+                self._entries.pop(key, None)
+                if row >= 0:
+                    self._entries[key] = row
+        used = set(self._entries.values())
+        self._high = max(self._high, max(used, default=-1) + 1)
+        self._free_rows = [r for r in range(self._high) if r not in used]
+        if self._high > self._capacity:
+            self._open_vectors()
+
+    def _open_vectors(self):
+        rows = 0
+        if os.path.exists(self._vectors_path):
+            rows = os.path.getsize(self._vectors_path) // (self.dim * 4)
+        self._resize(max(rows, self._high))
+
+    def _resize(self, rows: int):
+        # Never shrink a file another process already grew
+        if os.path.exists(self._vectors_path):
+            rows = max(rows, os.path.getsize(self._vectors_path) // (self.dim * 4))
+        self._vectors = None
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(rows * self.dim * 4)
+        self._capacity = rows
+        if rows:
+            self._vectors = np.memmap(self._vectors_path, dtype=np.float32, mode="r+", shape=(rows, self.dim))
+
+    def _append_log(self, records):
+        payload = "".join(json.dumps({"k": key, "r": row}) + "\n" for key, row in records).encode("utf-8")
+        with open(self._index_path, "ab") as f:
+            f.write(payload)
+            self._log_inode = os.fstat(f.fileno()).st_ino
+        self._log_offset += len(payload)
+        self._log_lines += len(records)
+
+    def _compact(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for key, row in self._entries.items():
+                f.write((json.dumps({"k": key, "r": row}) + "\n").encode("utf-8"))
+            size = f.tell()
+        os.replace(tmp_path, self._index_path)
+        self._log_inode = os.stat(self._index_path).st_ino
+        self._log_offset = size
+        self._log_lines = len(self._entries)
+
+    def compact(self):
+        """
+        Rewrite the index log with only live entries, in LRU order.
+        """
+        with self._locked():
+            self._compact()
+
+    def flush(self):
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+
+    # ---- lookups ----
+
+    def __len__(self):
+        with self._locked(exclusive=False):
+            return len(self._entries)
+
+    def get(self, text: str):
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: list[str]) -> list:
+        """
+        Return a cached vector (or None) for each text.
+        """
+        out = []
+        with self._locked(exclusive=False):
+            for text in texts:
+                key = text_key(text, self.model_name)
+                row = self._entries.get(key)
+                if row is None:
+                    self.misses += 1
+                    out.append(None)
+                else:
+                    self.hits += 1
+                    self._entries.move_to_end(key)
+                    out.append(np.array(self._vectors[row]))
+        return out
+
+    def put(self, text: str, vector):
+        self.put_many([text], [vector])
+
+    def put_many(self, texts: list[str], vectors):
+        """
+        Store vectors for texts, evicting least recently used rows when full.
+
+        Evictions are logged before their rows are overwritten and new keys
+        only after their vectors are flushed, so a crash at any point leaves
+        every logged key pointing at its own vector.
+        """
+        with self._locked():
+            evicted, added, rows = [], [], []
+            for text in texts:
+                key = text_key(text, self.model_name)
+                row = self._entries.get(key)
+                if row is None:
+                    if len(self._entries) >= self.max_entries:
+                        old_key, row = self._entries.popitem(last=False)
+                        evicted.append((old_key, -1))
+                    elif self._free_rows:
+                        row = self._free_rows.pop()
+                    else:
+                        row = self._high
+                        self._high += 1
+                        if row >= self._capacity:
+                            grow = max(self._capacity * 2, _MIN_GROWTH_ROWS, row + 1)
+                            self._resize(min(grow, self.max_entries))
+                    added.append((key, row))
+                self._entries[key] = row
+                self._entries.move_to_end(key)
+                rows.append(row)
+            if evicted:
+                self._append_log(evicted)
+            for row, vector in zip(rows, vectors):
+                self._vectors[row] = np.asarray(vector, dtype=np.float32)
+            self.flush()
+            # A batch larger than max_entries can evict its own earlier texts
+            added = [(key, row) for key, row in added if self._entries.get(key) == row]
+            if added:
+                self._append_log(added)
+            if self._log_lines > 2 * max(len(self._entries), _MIN_GROWTH_ROWS):
+                self._compact()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+# Seed the cache from a precomputed matrix whose rows line up with a CSV
+if __name__ == '__main__':
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description="Import precomputed embeddings into the cache.")
+    parser.add_argument("--csv", default="cleaned_texts.csv")
+    parser.add_argument("--column", default="text")
+    parser.add_argument("--npy", default="bert_embeddings.npy")
+    parser.add_argument("--cache-dir", default=None, help="Defaults to the directory bert_model reads for --model-name")
+    parser.add_argument("--model-name", default=os.environ.get("EMBEDDING_MODEL_NAME", "all-MiniLM-L6-v2"))
+    args = parser.parse_args()
+    args.cache_dir = args.cache_dir or default_cache_dir(args.model_name)
+
+    texts = pd.read_csv(args.csv)[args.column].astype(str).tolist()
+    matrix = np.load(args.npy, mmap_mode="r")
+    if matrix.shape[0] != len(texts):
+        raise SystemExit(f"❌ {args.npy} has {matrix.shape[0]} rows but {args.csv} has {len(texts)} texts; "
+                         "rows must line up one-to-one.")
+
+    cache = EmbeddingCache(args.cache_dir, matrix.shape[1], args.model_name)
+    cache.put_many(texts, matrix)
+    print(f"✅ Cached {len(cache)} embeddings in {args.cache_dir}")
@@ -0,0 +1,122 @@
+import os
+import threading
+import time
+
+import numpy as np
+
+from model.head_export import EXPORT_DIR, FlatHead
+
+# The flat export from head_export.py is preferred over the pickle when both exist
+PICKLE_PATH = os.path.join("model", "personality_model.pkl")
+HEAD_PATH = os.environ.get("PERSONALITY_HEAD_PATH") or (EXPORT_DIR if os.path.isdir(EXPORT_DIR) else PICKLE_PATH)
+
+# Regression head trained by train_model.py on MiniLM embeddings; loaded on first use.
+# Like the head, model.predictor (and torch) is imported only when scoring, so app.py starts without it
+head = None
+_load_lock = threading.Lock()
+
+def head_available(path: str = HEAD_PATH) -> bool:
+    return os.path.exists(path)
+
+def load_head(path: str = HEAD_PATH):
+    """
+    Load the trained embedding -> traits regressor once per process and return it.
+    `path` is either a head_export.py directory (memory-mapped) or a joblib pickle.
+    """
+    global head
+    if head is None:
+        with _load_lock:
+            if head is None:
+                if not head_available(path):
+                    raise FileNotFoundError(f"No trained head at {path}; run train_model.py first.")
+                if os.path.isdir(path):
+                    head = FlatHead(path)
+                else:
+                    import joblib
+                    head = joblib.load(path)
+    return head
+
+def predict_from_embeddings(embeddings) -> np.ndarray:
+    """
+    Score a whole (n x dim) embedding matrix in one call; returns n x 5 scores in [0, 1].
+    """
+    from model.predictor import TRAITS
+
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    if embeddings.ndim == 1:
+        embeddings = embeddings[None, :]
+    if len(embeddings) == 0:
+        return np.zeros((0, len(TRAITS)), dtype=np.float32)
+    return np.clip(load_head().predict(embeddings), 0.0, 1.0)
+
+def predict_personality_fast(texts) -> list[dict]:
+    """
+    Fast drop-in for predict_personality_batch on cleaned texts: MiniLM
+    embeddings (through the embedding cache) scored by the regression head.
+    Blank texts get neutral zeros, like the BERT classifier.
+    """
+    from model.bert_model import get_bert_embeddings_batch
+    from model.predictor import _empty_traits, _is_blank, _to_traits
+
+    texts = [t if isinstance(t, str) else str(t) for t in texts]
+    results = [_empty_traits() for _ in texts]
+    scored = [i for i, text in enumerate(texts) if not _is_blank(text)]
+    if scored:
+        embeddings = get_bert_embeddings_batch([texts[i] for i in scored])
+        for i, scores in zip(scored, predict_from_embeddings(embeddings)):
+            results[i] = _to_traits(scores)
+    return results
+
+def _score_matrix(score_fn, texts) -> tuple[np.ndarray, float]:
+    from model.predictor import TRAITS
+
+    start = time.perf_counter()
+    results = score_fn(texts)
+    rate = len(texts) / (time.perf_counter() - start)
+    return np.array([[r[t] for t in TRAITS] for r in results]), rate
+
+# Fidelity and speed of the embedding head against the BERT classifier
+if __name__ == '__main__':
+    import argparse
+    import tempfile
+    import pandas as pd
+
+    # Empty embedding cache, so the head is timed with cold embeddings
+    os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="head_compare_")
+    from utils.preprocess import clean_texts
+    from model import bert_model, predictor
+
+    parser = argparse.ArgumentParser(description="Compare the embedding head with the BERT classifier.")
+    parser.add_argument("--csv", default="cleaned_texts.csv")
+    parser.add_argument("--column", default="text")
+    parser.add_argument("--all-rows", action="store_true",
+                        help="Score every row, not only the 20%% train_model.py held out")
+    args = parser.parse_args()
+
+    texts = pd.read_csv(args.csv)[args.column].astype(str).tolist()
+    if not args.all_rows:
+        from sklearn.model_selection import train_test_split
+        _, held_out = train_test_split(np.arange(len(texts)), test_size=0.2, random_state=42)
+        texts = [texts[i] for i in sorted(held_out)]
+    texts = clean_texts(texts)
+
+    predictor.load_model()
+    bert_model.load_model()
+    load_head()
+    predictor.predict_personality_batch(texts[:16])  # warm up
+    bert_model.get_bert_embedding("warm up")
+    reference, reference_rate = _score_matrix(predictor.predict_personality_batch, texts)
+    fast, fast_rate = _score_matrix(predict_personality_fast, texts)
+    embeddings = np.asarray(bert_model.get_bert_embeddings_batch(texts))
+    start = time.perf_counter()
+    predict_from_embeddings(embeddings)
+    head_rate = len(texts) / (time.perf_counter() - start)
+
+    print(f"{len(texts)} texts  classifier {reference_rate:.1f} texts/s  "
+          f"embed + head {fast_rate:.1f} texts/s (x{fast_rate / reference_rate:.1f})  "
+          f"head alone {head_rate:.0f} texts/s")
+    print(f"{'trait':<18} {'MAE':>6} {'max |Δ|':>8} {'r':>6}")
+    for j, trait in enumerate(predictor.TRAITS):
+        diff = np.abs(fast[:, j] - reference[:, j])
+        r = np.corrcoef(fast[:, j], reference[:, j])[0, 1] if reference[:, j].std() > 0 else float("nan")
+        print(f"{trait:<18} {diff.mean():6.3f} {diff.max():8.3f} {r:6.2f}")
@@ -0,0 +1,216 @@
+import argparse
+import csv
+import itertools
+import json
+import os
+import random
+import re
+import sys
+from collections import Counter
+
+csv.field_size_limit(sys.maxsize)
+
+LINKEDIN_SCHEMA = ['name', 'about', 'posts', 'experience', 'education']
+GITHUB_SCHEMA = ['Username', 'Name', 'Followers', 'Following', 'Public Repos',
+                 'Repo Name', 'Description', 'Languages', 'Latest Commit', 'README']
+
+_WORD_RE = re.compile(r"\S+")
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+def _read_rows(path):
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        yield from csv.DictReader(f)
+
+# Placeholders the GitHub scraper writes instead of a README; sampled as they are
+README_PLACEHOLDERS = {'No README', 'Error decoding README'}
+README_CHARS = 100
+
+_JSON = json.JSONDecoder()
+
+def split_linkedin_text(text: str) -> dict:
+    """
+    Split one cleaned_texts.csv row back into its LinkedIn fields. A row is
+    the profile's about text followed by its JSON arrays (posts, experience,
+    education, sometimes volunteering); arrays are told apart by their item
+    keys. Fields the profile did not have come back as ''.
+    """
+    fields = dict.fromkeys(LINKEDIN_SCHEMA[1:], '')
+    about, i = [], 0
+    while i < len(text):
+        start = text.find('[', i)
+        if start == -1:
+            about.append(text[i:])
+            break
+        try:
+            items, end = _JSON.raw_decode(text, start)
+        except json.JSONDecodeError:
+            about.append(text[i:start + 1])
+            i = start + 1
+            continue
+        about.append(text[i:start])
+        i = end
+        if not isinstance(items, list) or not items or not isinstance(items[0], dict):
+            continue
+        keys = items[0].keys()
+        column = 'posts' if 'attribution' in keys else 'education' if 'degree' in keys else \
+            'experience' if not fields['experience'] else None  # a second array is volunteering
+        if column and not fields[column]:
+            fields[column] = text[start:end]
+    fields['about'] = ''.join(about).strip()
+    return fields
+
+class TextModel:
+    """
+    Empirical model of a text corpus, fitted from the shipped CSVs.
+
+    Each column keeps its shipped values as templates and its own word
+    frequency table. To sample, a template is drawn and every string in it
+    is replaced by random words from that column with the same word count. JSON structure, item counts and length distribution are kept,
+    but none of the original text is.
+    """
+
+    def __init__(self, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.words = {}
+        self.columns = {}
+        self._vocab = {}
+
+    def add(self, column: str, value: str):
+        if value is None or value == '':
+            return
+        self.words.setdefault(column, Counter()).update(w for w in _WORD_RE.findall(value) if 'http' not in w)
+        try:
+            parsed = json.loads(value) if value.startswith('[') else value
+        except json.JSONDecodeError:
+            parsed = value
+        self.columns.setdefault(column, []).append(parsed)
+
+    def _vocabulary(self, column: str):
+        if column not in self._vocab:
+            words, counts = zip(*self.words[column].most_common(50_000))
+            self._vocab[column] = (words, list(itertools.accumulate(counts)))
+        return self._vocab[column]
+
+    def words_like(self, column: str, text: str) -> str:
+        words, cum_weights = self._vocabulary(column)
+        count = max(1, len(_WORD_RE.findall(text)))
+        return ' '.join(self.rng.choices(words, cum_weights=cum_weights, k=count))
+
+    def _resynth(self, column: str, value):
+        if value == '' or value in README_PLACEHOLDERS:
+            return value
+        if isinstance(value, str):
+            if value.startswith('http'):
+                return f"https://example.com/{self.rng.getrandbits(48):x}"
+            return self.words_like(column, value)
+        if isinstance(value, list):
+            return [self._resynth(column, v) for v in value]
+        if isinstance(value, dict):
+            return {k: self._resynth(column, v) for k, v in value.items()}
+        return value
+
+    def sample(self, column: str) -> str:
+        templates = self.columns.get(column)
+        if not templates:
+            return ''
+        value = self._resynth(column, self.rng.choice(templates))
+        return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+    def choice(self, column: str):
+        return self.rng.choice(self.columns[column])
+
+def fit_linkedin(model: TextModel, cleaned_texts=os.path.join(DATA_DIR, 'cleaned_texts.csv'),
+                 traits=os.path.join(DATA_DIR, 'Linkedin final traits.csv')):
+    for row in _read_rows(cleaned_texts):
+        for column, value in split_linkedin_text(row['text']).items():
+            if value:
+                model.add(column, value)
+            else:
+                # Keep missing fields, so they are as common as in the real profiles
+                model.columns.setdefault(column, []).append('')
+    for row in _read_rows(traits):
+        model.add('name', row['name'])
+
+def fit_github(model: TextModel, profiles=os.path.join(DATA_DIR, 'github_profiles_pakistan final.csv')):
+    repos_per_user = Counter()
+    for row in _read_rows(profiles):
+        repos_per_user[row['Username']] += 1
+        model.add('Name', row['Name'])
+        for column in ['Repo Name', 'Description', 'Latest Commit', 'README']:
+            value = row[column]
+            if value and value not in README_PLACEHOLDERS:
+                model.add(column, value)
+            else:
+                # Keep empty values and README placeholders as they are, so both are as common as in the real data
+                model.columns.setdefault(column, []).append(value)
+        model.columns.setdefault('Languages', []).append(row['Languages'])
+        model.columns.setdefault('counts', []).append((row['Followers'], row['Following'], row['Public Repos']))
+    model.columns['repos_per_user'] = list(repos_per_user.values())
+
+def _person_name(model: TextModel, column: str) -> str:
+    """
+    Recombine a first and a last name token from two shipped names.
+    """
+    first = (model.choice(column).split() or ['User'])[0]
+    last = (model.choice(column).split() or ['Name'])[-1]
+    return f"{first} {last}"
+
+def linkedin_rows(model: TextModel):
+    while True:
+        yield [_person_name(model, 'name')] + [model.sample(column) for column in LINKEDIN_SCHEMA[1:]]
+
+def _readme(model: TextModel) -> str:
+    """
+    A sampled README, cut like the scraper does: the first README_CHARS characters plus '...'.
+    """
+    readme = model.sample('README')
+    return readme if not readme or readme in README_PLACEHOLDERS else readme[:README_CHARS] + '...'
+
+def github_rows(model: TextModel):
+    for n in itertools.count():
+        name = _person_name(model, 'Name')
+        username = re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') + f"-{n}"
+        followers, following, public_repos = model.choice('counts')
+        for _ in range(model.choice('repos_per_user')):
+            yield [
+                username, name, followers, following, public_repos,
+                model.sample('Repo Name').replace(' ', '-'),
+                model.sample('Description'),
+                model.choice('Languages'),
+                model.sample('Latest Commit'),
+                _readme(model),
+            ]
+
+def generate(platform: str, output, rows: int, seed: int = 0):
+    """
+    Stream `rows` synthetic rows in the schema app.py validates for `platform`.
+    Rows are written one at a time, so memory does not grow with `rows`.
+    """
+    model = TextModel(seed)
+    if platform == 'linkedin':
+        fit_linkedin(model)
+        header, source = LINKEDIN_SCHEMA, linkedin_rows(model)
+    else:
+        fit_github(model)
+        header, source = GITHUB_SCHEMA, github_rows(model)
+
+    writer = csv.writer(output)
+    writer.writerow(header)
+    for row in itertools.islice(source, rows):
+        writer.writerow(row)
+
+# Emit large LinkedIn/GitHub CSVs for load testing
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Generate synthetic LinkedIn or GitHub CSVs for load testing.")
+    parser.add_argument("platform", choices=["linkedin", "github"])
+    parser.add_argument("output", help="Output CSV path, or - for stdout")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.output == '-':
+        generate(args.platform, sys.stdout, args.rows, args.seed)
+    else:
+        with open(args.output, 'w', newline='', encoding='utf-8') as f:
+            generate(args.platform, f, args.rows, args.seed)
+        print(f"✅ Wrote {args.rows} {args.platform} rows to {args.output}", file=sys.stderr)
@@ -0,0 +1,103 @@
+import argparse
+import hashlib
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Headers worth replaying; conditional-request headers are left out so replays are always full 200s
+_REPLAY_HEADERS = ('Content-Type', 'X-RateLimit-Limit', 'X-RateLimit-Remaining', 'X-RateLimit-Reset',
+                   'X-RateLimit-Resource')
+
+def request_key(method: str, path: str, body: bytes) -> str:
+    """
+    Recording key for a request: method, path with query string, and body.
+    """
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body):
+        digest.update(part + b"\x00")
+    return digest.hexdigest()
+
+class StubHandler(BaseHTTPRequestHandler):
+    """
+    Replays recorded GitHub REST/GraphQL responses from `server.record_dir`.
+    With `server.upstream` set, unknown requests are proxied there and recorded.
+    """
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def _handle(self, method):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        path = os.path.join(self.server.record_dir, request_key(method, self.path, body) + ".json")
+        with self.server.lock:
+            self.server.request_count += 1
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                recorded = json.load(f)
+        elif self.server.upstream:
+            recorded = self._record(method, body, path)
+        else:
+            recorded = {"status": 404, "headers": {"Content-Type": "application/json"},
+                        "body": json.dumps({"message": f"No recorded response for {method} {self.path}"})}
+
+        payload = recorded["body"].encode("utf-8")
+        self.send_response(recorded["status"])
+        for name, value in recorded["headers"].items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _record(self, method, body, path):
+        import requests
+
+        headers = {name: self.headers[name] for name in ("Authorization", "Accept", "Content-Type")
+                   if self.headers.get(name)}
+        response = requests.request(method, self.server.upstream + self.path, headers=headers, data=body, timeout=60)
+        recorded = {
+            "status": response.status_code,
+            "headers": {name: response.headers[name] for name in _REPLAY_HEADERS if name in response.headers},
+            "body": response.text,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(recorded, f, ensure_ascii=False)
+        return recorded
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(record_dir: str, port: int = 0, upstream: str = None) -> ThreadingHTTPServer:
+    """
+    Build a stub server; port 0 picks a free port (see `server.server_address`).
+    """
+    os.makedirs(record_dir, exist_ok=True)
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.record_dir = record_dir
+    server.upstream = upstream.rstrip("/") if upstream else None
+    server.request_count = 0
+    server.lock = threading.Lock()
+    return server
+
+# Serve recorded GitHub responses; set GITHUB_API_URL=http://127.0.0.1:<port> for the collector
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Record/replay stub for the GitHub REST and GraphQL APIs.")
+    parser.add_argument("--record-dir", default="github_recordings")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--record", metavar="UPSTREAM", nargs="?", const="https://api.github.com",
+                        help="Proxy unknown requests to UPSTREAM and record them")
+    args = parser.parse_args()
+
+    server = make_server(args.record_dir, args.port, args.record)
+    host, port = server.server_address[:2]
+    print(f"🧪 Serving {args.record_dir} on http://{host}:{port} ({'recording' if args.record else 'replay only'})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(f"📊 {server.request_count} requests served")
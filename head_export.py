@@ -0,0 +1,221 @@
+import json
+import os
+
+import numpy as np
+
+EXPORT_FORMAT = 1
+EXPORT_DIR = os.path.join("model", "personality_head")
+_ACTIVATIONS = {
+    "identity": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0, out=x),
+    "tanh": np.tanh,
+    "logistic": lambda x: 1.0 / (1.0 + np.exp(-x)),
+}
+
+def _unwrap(model):
+    """
+    Split an optional leading StandardScaler off a pipeline: (mean, scale, estimator).
+    """
+    steps = getattr(model, "steps", None)
+    if not steps:
+        return None, None, model
+    if len(steps) == 2 and type(steps[0][1]).__name__ == "StandardScaler":
+        scaler = steps[0][1]
+        mean = scaler.mean_ if scaler.with_mean else np.zeros(scaler.n_features_in_)
+        scale = scaler.scale_ if scaler.with_std else np.ones(scaler.n_features_in_)
+        return mean, scale, steps[1][1]
+    if len(steps) == 1:
+        return None, None, steps[0][1]
+    raise ValueError(f"Unsupported pipeline: {[name for name, _ in steps]}")
+
+def _flatten_trees(trees, n_outputs: int) -> dict:
+    """
+    Concatenate (tree, output column or None, weight) triples into one node
+    table; returns the arrays and the deepest tree's depth. Leaf values are pre-multiplied by the tree weight and placed in
+    their output column, so a prediction is the sum of one leaf per tree.
+    """
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree, column, weight in trees:
+        t = tree.tree_
+        leaf = t.children_left == -1
+        roots.append(offset)
+        feature.append(np.where(leaf, 0, t.feature).astype(np.int32))
+        threshold.append(t.threshold.astype(np.float64))
+        # Leaves point to themselves, so every row can take the same number of steps
+        left.append((np.where(leaf, np.arange(t.node_count), t.children_left) + offset).astype(np.int32))
+        right.append((np.where(leaf, np.arange(t.node_count), t.children_right) + offset).astype(np.int32))
+        leaf_values = np.zeros((t.node_count, n_outputs), dtype=np.float64)
+        if column is None:
+            leaf_values[:] = t.value[:, :, 0] * weight
+        else:
+            leaf_values[:, column] = t.value[:, 0, 0] * weight
+        value.append(leaf_values)
+        offset += t.node_count
+    return {
+        "feature": np.concatenate(feature),
+        "threshold": np.concatenate(threshold),
+        # children[2 * node] is the left child and children[2 * node + 1] the right
+        "children": np.stack([np.concatenate(left), np.concatenate(right)], axis=1).ravel(),
+        "value": np.concatenate(value).astype(np.float32),
+        "roots": np.array(roots, dtype=np.int32),
+    }, max(tree.tree_.max_depth for tree, _, _ in trees)
+
+def export_head(model, out_dir: str) -> dict:
+    """
+    Write a trained regressor as flat .npy arrays plus meta.json.
+
+    Supported: a random forest (native multi-output or one per output via
+    MultiOutputRegressor), linear models (Ridge, LinearRegression, ...) and
+    MLPRegressor, each optionally behind a StandardScaler in a pipeline.
+    """
+    mean, scale, estimator = _unwrap(model)
+    arrays = {}
+    kind = type(estimator).__name__
+
+    if kind == "MultiOutputRegressor":
+        forests = estimator.estimators_
+        if not all(type(f).__name__ in ("RandomForestRegressor", "ExtraTreesRegressor") for f in forests):
+            raise ValueError("MultiOutputRegressor export supports forests only")
+        trees = [(tree, k, 1.0 / len(f.estimators_)) for k, f in enumerate(forests) for tree in f.estimators_]
+        flat, max_depth = _flatten_trees(trees, len(forests))
+        arrays.update(flat)
+        meta = {"kind": "trees", "n_outputs": len(forests), "max_depth": max_depth}
+    elif kind in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        n_outputs = estimator.n_outputs_
+        trees = [(tree, None, 1.0 / len(estimator.estimators_)) for tree in estimator.estimators_]
+        flat, max_depth = _flatten_trees(trees, n_outputs)
+        arrays.update(flat)
+        meta = {"kind": "trees", "n_outputs": n_outputs, "max_depth": max_depth}
+    elif kind == "MLPRegressor":
+        for i, (w, b) in enumerate(zip(estimator.coefs_, estimator.intercepts_)):
+            arrays[f"W{i}"] = w.astype(np.float32)
+            arrays[f"b{i}"] = b.astype(np.float32)
+        meta = {"kind": "mlp", "n_outputs": estimator.n_outputs_, "layers": len(estimator.coefs_),
+                "activation": estimator.activation, "out_activation": estimator.out_activation_}
+    elif hasattr(estimator, "coef_") and hasattr(estimator, "intercept_"):
+        coef = np.atleast_2d(estimator.coef_)
+        arrays["coef"] = coef.T.astype(np.float32)
+        arrays["intercept"] = np.atleast_1d(estimator.intercept_).astype(np.float32)
+        meta = {"kind": "linear", "n_outputs": coef.shape[0]}
+    else:
+        raise ValueError(f"Cannot export {kind}")
+
+    if mean is not None:
+        arrays["x_mean"] = mean.astype(np.float32)
+        arrays["x_scale"] = scale.astype(np.float32)
+    meta.update({"format": EXPORT_FORMAT, "source": kind, "n_features": int(model.n_features_in_),
+                 "arrays": sorted(arrays)})
+
+    os.makedirs(out_dir, exist_ok=True)
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(out_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+def refresh_export(model, out_dir: str = EXPORT_DIR):
+    """
+    Re-export after training so the export never lags behind the pickle. A
+    model that cannot be exported removes the old export instead, so loaders
+    fall back to the pickle.
+    """
+    try:
+        meta = export_head(model, out_dir)
+        print(f"📦 Exported {meta['source']} to {out_dir}")
+    except ValueError as e:
+        import shutil
+        shutil.rmtree(out_dir, ignore_errors=True)
+        print(f"⚠️ Not exported ({e}); loaders will use the pickle")
+
+class FlatHead:
+    """
+    Exported regressor loaded from .npy files with mmap_mode='r', so workers
+    that load the same export share its pages. `predict` matches the
+    estimator's own predict on float32 input.
+    """
+
+    def __init__(self, path: str, chunk_rows: int = 1024):
+        with open(os.path.join(path, "meta.json"), "r", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("format") != EXPORT_FORMAT:
+            raise ValueError(f"Unsupported head export format {self.meta.get('format')} in {path}")
+        # Plain ndarray views of the maps: same shared pages, without memmap indexing overhead
+        self.arrays = {name: np.asarray(np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r"))
+                       for name in self.meta["arrays"]}
+        self.chunk_rows = chunk_rows
+
+    def _predict_trees(self, X):
+        a = self.arrays
+        n_features = X.shape[1]
+        out = np.empty((len(X), self.meta["n_outputs"]), dtype=np.float64)
+        for start in range(0, len(X), self.chunk_rows):
+            chunk = X[start:start + self.chunk_rows]
+            flat = chunk.ravel()
+            offsets = (np.arange(len(chunk)) * n_features)[:, None]
+            node = np.broadcast_to(a["roots"], (len(chunk), len(a["roots"]))).copy()
+            for step in range(self.meta["max_depth"]):
+                go_right = flat[offsets + a["feature"][node]] > a["threshold"][node]
+                next_node = a["children"][2 * node + go_right]
+                if step % 4 == 3 and np.array_equal(next_node, node):
+                    break
+                node = next_node
+            out[start:start + len(chunk)] = a["value"][node].sum(axis=1)
+        return out
+
+    def predict(self, X) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X[None, :]
+        a, kind = self.arrays, self.meta["kind"]
+        if "x_mean" in a:
+            X = (X - a["x_mean"]) / a["x_scale"]
+        if kind == "trees":
+            return self._predict_trees(X)
+        if kind == "linear":
+            return X @ a["coef"] + a["intercept"]
+        hidden = _ACTIVATIONS[self.meta["activation"]]
+        for i in range(self.meta["layers"]):
+            X = X @ a[f"W{i}"] + a[f"b{i}"]
+            X = (hidden if i < self.meta["layers"] - 1 else _ACTIVATIONS[self.meta["out_activation"]])(X)
+        return X
+
+def _dir_size(path: str) -> int:
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+# Export the trained head and compare size, load time and predict time with the pickle
+if __name__ == '__main__':
+    import argparse
+    import time
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Export the trait regressor as memory-mappable arrays.")
+    parser.add_argument("--model", default=os.path.join("model", "personality_model.pkl"))
+    parser.add_argument("--output", default=EXPORT_DIR)
+    parser.add_argument("--embeddings", default="bert_embeddings.npy", help="Rows used to time predict")
+    parser.add_argument("--rows", type=int, default=1000)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    model = joblib.load(args.model)
+    pickle_load = time.perf_counter() - start
+    meta = export_head(model, args.output)
+    start = time.perf_counter()
+    head = FlatHead(args.output)
+    flat_load = time.perf_counter() - start
+
+    X = np.resize(np.load(args.embeddings).astype(np.float32), (args.rows, meta["n_features"]))
+    timings = {}
+    for name, predictor in (("pickle", model), ("flat", head)):
+        predictor.predict(X[:10])
+        start = time.perf_counter()
+        predictions = predictor.predict(X)
+        timings[name] = (time.perf_counter() - start, predictions)
+
+    diff = np.abs(np.asarray(timings["pickle"][1]) - timings["flat"][1]).max()
+    print(f"📦 Exported {meta['source']} ({meta['kind']}) to {args.output}")
+    print(f"{'':<8} {'size MB':>9} {'load ms':>9} {f'predict {args.rows} ms':>16}")
+    print(f"{'pickle':<8} {os.path.getsize(args.model) / 1e6:9.2f} {pickle_load * 1000:9.1f} {timings['pickle'][0] * 1000:16.1f}")
+    print(f"{'flat':<8} {_dir_size(args.output) / 1e6:9.2f} {flat_load * 1000:9.1f} {timings['flat'][0] * 1000:16.1f}")
+    print(f"{'✅' if diff < 1e-4 else '❌'} max |Δ| between predictions: {diff:.2e}")
+    raise SystemExit(0 if diff < 1e-4 else 1)
@@ -0,0 +1,89 @@
+import argparse
+
+DEFAULT_BOUNDARIES = (32, 64, 128, 256, 512)
+
+class LengthScheduler:
+    """
+    Group token sequences into length buckets and micro-batches.
+
+    Each index goes into the first bucket whose upper boundary fits its length.
+    Inside a bucket indices are sorted by length and cut into batches, so a
+    batch is only padded to the longest sequence in that batch.
+    """
+
+    def __init__(self, boundaries=DEFAULT_BOUNDARIES, batch_size: int = 16):
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1.")
+        self.boundaries = tuple(sorted(boundaries))
+        self.batch_size = batch_size
+        self.last_stats = None
+
+    def bucket_of(self, length: int) -> int:
+        for b, upper in enumerate(self.boundaries):
+            if length <= upper:
+                return b
+        return len(self.boundaries)
+
+    def schedule(self, lengths: list[int], batch_size: int = None) -> list[list[int]]:
+        """
+        Return batches of indices into `lengths`. Every index appears once.
+        """
+        batch_size = batch_size or self.batch_size
+        buckets = [[] for _ in range(len(self.boundaries) + 1)]
+        for i, length in enumerate(lengths):
+            buckets[self.bucket_of(length)].append(i)
+
+        batches = []
+        for bucket in buckets:
+            bucket.sort(key=lambda i: lengths[i])
+            for start in range(0, len(bucket), batch_size):
+                batches.append(bucket[start:start + batch_size])
+
+        self.last_stats = padding_stats(lengths, batches)
+        return batches
+
+def padding_stats(lengths: list[int], batches: list[list[int]]) -> dict:
+    """
+    Count real vs padded tokens for a batch plan.
+    `waste_ratio` is the share of computed positions that are padding.
+    """
+    real = sum(lengths[i] for batch in batches for i in batch)
+    padded = sum(max(lengths[i] for i in batch) * len(batch) for batch in batches if batch)
+    return {
+        "batches": len(batches),
+        "real_tokens": real,
+        "padded_tokens": padded,
+        "waste_ratio": (padded - real) / padded if padded else 0.0,
+    }
+
+def _unsorted_batches(n: int, batch_size: int) -> list[list[int]]:
+    return [list(range(start, min(start + batch_size, n))) for start in range(0, n, batch_size)]
+
+# Report padding waste on a CSV so bucket boundaries can be tuned
+if __name__ == '__main__':
+    import pandas as pd
+    from transformers import AutoTokenizer
+    from model.predictor import MODEL_ID
+
+    parser = argparse.ArgumentParser(description="Report padding waste for BERT scoring batches.")
+    parser.add_argument("csv", nargs="?", default="cleaned_texts.csv")
+    parser.add_argument("--column", default="text")
+    parser.add_argument("--batch-sizes", default="8,16,32")
+    parser.add_argument("--boundaries", default=",".join(map(str, DEFAULT_BOUNDARIES)),
+                        help="Comma-separated bucket upper bounds in tokens")
+    args = parser.parse_args()
+
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+    texts = pd.read_csv(args.csv)[args.column].astype(str).tolist()
+    lengths = [len(ids) for ids in tokenizer(texts, truncation=True)["input_ids"]]
+    boundaries = [int(b) for b in args.boundaries.split(",") if b]
+
+    print(f"📄 {len(lengths)} texts, mean length {sum(lengths) / len(lengths):.1f} tokens")
+    for batch_size in [int(b) for b in args.batch_sizes.split(",")]:
+        naive = padding_stats(lengths, _unsorted_batches(len(lengths), batch_size))
+        scheduler = LengthScheduler(boundaries, batch_size)
+        scheduler.schedule(lengths)
+        bucketed = scheduler.last_stats
+        print(f"batch={batch_size:>3}  unsorted waste={naive['waste_ratio']:.1%}  "
+              f"bucketed waste={bucketed['waste_ratio']:.1%}  "
+              f"({bucketed['padded_tokens']} vs {naive['padded_tokens']} padded tokens)")
@@ -0,0 +1,237 @@
+import atexit
+import bisect
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# Metrics are collected only when PERSONALITY_METRICS is set; otherwise every
+# metric is a shared no-op object and instrumented code pays one method call
+ENABLED = os.environ.get("PERSONALITY_METRICS", "").lower() not in ("", "0", "false", "no")
+METRICS_FILE = os.environ.get("PERSONALITY_METRICS_FILE")
+METRICS_PORT = int(os.environ.get("PERSONALITY_METRICS_PORT") or 0)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384)
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in labels)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(labels, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help = help_text
+        self._labels = labels
+        self._children = {}
+        self._lock = threading.Lock()
+
+    def labels(self, **labels):
+        """
+        Child metric for one label combination, created on first use.
+        """
+        key = tuple(sorted(labels.items()))
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._child(key))
+        return child
+
+    def _child(self, labels: tuple):
+        return type(self)(self.name, self.help, labels, *self._args())
+
+    def _args(self):
+        return ()
+
+    def _series(self):
+        """
+        (suffix, labels, value) rows for this metric and its children.
+        """
+        yield from self._own_series()
+        for child in list(self._children.values()):
+            yield from child._own_series()
+
+    def expose(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines += [f"{self.name}{suffix}{_format_labels(labels)} {_format_value(value)}"
+                  for suffix, labels, value in self._series()]
+        return "\n".join(lines) + "\n"
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def _own_series(self):
+        if self._labels or not self._children:
+            yield "", self._labels, self.value
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float):
+        with self._lock:
+            self.value = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def _args(self):
+        return (self.buckets,)
+
+    def observe(self, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            if i < len(self.counts):
+                self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def time(self):
+        """
+        Context manager observing the seconds spent inside it.
+        """
+        return _Timer(self)
+
+    def _own_series(self):
+        if not self._labels and self._children:
+            return
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield "_bucket", self._labels + (("le", _format_value(bound)),), cumulative
+        yield "_bucket", self._labels + (("le", "+Inf"),), self.count
+        yield "_sum", self._labels, self.sum
+        yield "_count", self._labels, self.count
+
+class _Timer:
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        self.histogram.observe(self.elapsed)
+        return False
+
+class _NoOpMetric:
+    """
+    Stand-in for every metric type while metrics are disabled.
+    """
+
+    def labels(self, **labels):
+        return self
+
+    def inc(self, amount: float = 1.0):
+        pass
+
+    def set(self, value: float):
+        pass
+
+    def observe(self, value: float):
+        pass
+
+    def time(self):
+        return nullcontext()
+
+_NOOP = _NoOpMetric()
+_registry = {}
+_registry_lock = threading.Lock()
+
+def _register(cls, name, help_text, **kwargs):
+    if not ENABLED:
+        return _NOOP
+    with _registry_lock:
+        metric = _registry.get(name)
+        if metric is None:
+            metric = _registry[name] = cls(name, help_text, **kwargs)
+        elif not isinstance(metric, cls):
+            raise ValueError(f"Metric '{name}' is already registered as a {metric.kind}")
+        return metric
+
+def counter(name: str, help_text: str):
+    return _register(Counter, name, help_text)
+
+def gauge(name: str, help_text: str):
+    return _register(Gauge, name, help_text)
+
+def histogram(name: str, help_text: str, buckets=LATENCY_BUCKETS):
+    return _register(Histogram, name, help_text, buckets=buckets)
+
+def render() -> str:
+    """
+    All registered metrics in the Prometheus text exposition format.
+    """
+    with _registry_lock:
+        metrics = [_registry[name] for name in sorted(_registry)]
+    return "".join(metric.expose() for metric in metrics)
+
+def write_file(path: str = METRICS_FILE):
+    """
+    Dump the current metrics to `path` (e.g. for the node_exporter textfile collector).
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(render())
+    os.replace(tmp_path, path)
+
+_server = None
+
+def start_http_server(port: int = METRICS_PORT, host: str = "127.0.0.1"):
+    """
+    Serve GET /metrics on a daemon thread, once per process.
+    """
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            payload = render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _registry_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
+
+if ENABLED and METRICS_FILE:
+    atexit.register(write_file)
+if ENABLED and METRICS_PORT:
+    try:
+        start_http_server()
+    except OSError:
+        pass  # another process (e.g. a scoring worker) already serves this port
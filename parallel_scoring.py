@@ -0,0 +1,82 @@
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from model import predictor
+
+DEFAULT_SHARD_SIZE = 64
+
+_pool = None
+_pool_config = None
+_pool_lock = threading.Lock()
+
+def _init_worker(threads: int, backend: str):
+    import torch
+    torch.set_num_threads(threads)
+    predictor.set_backend(backend)
+    predictor.load_backend_model()
+
+def _score_shard(texts, mark_failed=False):
+    return predictor.predict_personality_batch(texts, mark_failed=mark_failed)
+
+def get_pool(workers: int, threads_per_worker: int = None) -> ProcessPoolExecutor:
+    """
+    Return the process-wide scoring pool, starting it on first use.
+
+    Workers are spawned (not forked) so they never inherit a half-initialised
+    torch thread pool, and each loads the classifier once in its initializer.
+    Asking for a different worker count, thread count or predictor backend
+    restarts the pool.
+    """
+    global _pool, _pool_config
+    threads = threads_per_worker or max(1, (os.cpu_count() or 1) // workers)
+    config = (workers, threads, predictor.backend)
+    with _pool_lock:
+        if _pool is not None and _pool_config != config:
+            _pool.shutdown(wait=True)
+            _pool = None
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(threads, predictor.backend),
+            )
+            _pool_config = config
+        return _pool
+
+def shutdown_pool():
+    global _pool, _pool_config
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=True)
+        _pool = None
+        _pool_config = None
+
+atexit.register(shutdown_pool)
+
+def predict_personality_parallel(texts, workers: int = None, threads_per_worker: int = None,
+                                 shard_size: int = DEFAULT_SHARD_SIZE, mark_failed: bool = False):
+    """
+    Score texts across worker processes; results come back in input order.
+
+    The list is cut into shards of at most `shard_size`, small enough that
+    every worker gets one, and each shard goes through
+    predict_personality_batch in a worker. With one worker (or one text)
+    this is just predict_personality_batch in the calling process.
+    """
+    texts = [str(t) for t in texts]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(texts) <= 1:
+        return predictor.predict_personality_batch(texts, mark_failed=mark_failed)
+
+    pool = get_pool(workers, threads_per_worker)
+    shard_size = max(1, min(shard_size, math.ceil(len(texts) / workers)))
+    shards = [texts[i:i + shard_size] for i in range(0, len(texts), shard_size)]
+    results = []
+    for shard_results in pool.map(_score_shard, shards, [mark_failed] * len(shards)):
+        results.extend(shard_results)
+    return results
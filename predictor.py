@@ -1,37 +1,264 @@
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
+import os
+import threading
+import time
 import torch
 import numpy as np
+from model.length_scheduler import LengthScheduler
+from utils import metrics
 
-# Load tokenizer and model from Hugging Face
-tokenizer = AutoTokenizer.from_pretrained("Minej/bert-base-personality")
-model = AutoModelForSequenceClassification.from_pretrained("Minej/bert-base-personality")
+MODEL_ID = os.environ.get("PERSONALITY_MODEL_ID", "Minej/bert-base-personality")
+
+# Tokenizer and model are loaded from Hugging Face on first use and shared by
+# every caller in the process
+tokenizer = None
+model = None
+student_tokenizer = None
+student_model = None
+_load_lock = threading.Lock()
+
+_load_seconds = metrics.gauge("personality_model_load_seconds", "Seconds taken to load the personality classifier")
+_predict_seconds = metrics.histogram("personality_predict_seconds", "Latency of one predict call")
+_texts_total = metrics.counter("personality_texts_total", "Texts scored by the personality classifier")
+_texts_per_second = metrics.gauge("personality_texts_per_second", "Throughput of the last predict call")
+_batch_rows = metrics.histogram("personality_batch_rows", "Texts per forward pass", metrics.SIZE_BUCKETS)
+_batch_tokens = metrics.histogram("personality_batch_tokens", "Padded tokens per forward pass", metrics.SIZE_BUCKETS)
+_truncated_total = metrics.counter("personality_truncated_total", "Texts cut at the model's maximum length")
+_errors_total = metrics.counter("personality_errors_total", "Scoring failures, per batch or per text")
+
+def load_model():
+    """
+    Load the tokenizer and classifier once per process and return them.
+    """
+    global tokenizer, model
+    if model is None:
+        with _load_lock:
+            if model is None:
+                from transformers import AutoTokenizer, AutoModelForSequenceClassification
+                start = time.perf_counter()
+                tokenizer = AutoTokenizer.from_pretrained(MODEL_ID)
+                loaded = AutoModelForSequenceClassification.from_pretrained(MODEL_ID)
+                loaded.eval()
+                model = loaded
+                _load_seconds.set(time.perf_counter() - start)
+    return tokenizer, model
+
+def get_model_revision() -> str:
+    """
+    Hub commit the active backend's weights were resolved to; used to invalidate cached scores.
+    """
+    return getattr(load_backend_model()[1].config, "_commit_hash", None) or "main"
+
+# Inference backends: fp32 torch, torch dynamic int8 on the Linear layers,
+# an ONNX export run through onnxruntime, and the distilled student from
+# distill_student.py (same tokenizer, fewer layers)
+BACKENDS = ("torch", "int8", "onnx", "student")
+backend = os.environ.get("PERSONALITY_BACKEND", "torch")
+ONNX_DIR = os.environ.get("PERSONALITY_ONNX_DIR", os.path.join(".cache", "onnx"))
+STUDENT_DIR = os.environ.get("PERSONALITY_STUDENT_DIR", os.path.join("model", "student"))
+_runners = {}
+
+def load_student():
+    """
+    Load the distilled student and its tokenizer from STUDENT_DIR once per process.
+    """
+    global student_tokenizer, student_model
+    if student_model is None:
+        with _load_lock:
+            if student_model is None:
+                from transformers import AutoTokenizer, AutoModelForSequenceClassification
+                student_tokenizer = AutoTokenizer.from_pretrained(STUDENT_DIR)
+                loaded = AutoModelForSequenceClassification.from_pretrained(STUDENT_DIR)
+                loaded.eval()
+                student_model = loaded
+    return student_tokenizer, student_model
+
+def load_backend_model():
+    """
+    Tokenizer and model the active backend runs on; the student backend never loads the teacher.
+    """
+    return load_student() if backend == "student" else load_model()
+
+def set_backend(name: str):
+    global backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+    backend = name
+
+def model_identifier() -> str:
+    """
+    Model id plus backend, so scores from different backends never share a cache key.
+    The student is also keyed by its weights file, so retraining it invalidates its scores.
+    """
+    if backend == "student":
+        files = os.listdir(STUDENT_DIR) if os.path.isdir(STUDENT_DIR) else []
+        weights = [name for name in files if name.endswith((".safetensors", ".bin"))]
+        stamp = max(int(os.path.getmtime(os.path.join(STUDENT_DIR, name))) for name in weights) if weights else 0
+        return f"{MODEL_ID}+student@{stamp}"
+    return MODEL_ID if backend == "torch" else f"{MODEL_ID}+{backend}"
+
+def _torch_runner(module):
+    def run(inputs):
+        with torch.inference_mode():
+            return module(**inputs).logits.numpy()
+    return run
+
+def _onnx_runner(tokenizer, model):
+    import onnxruntime as ort
+
+    path = os.path.join(ONNX_DIR, MODEL_ID.replace("/", "--"), f"{get_model_revision()}.onnx")
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        dummy = tokenizer("export", return_tensors="pt")
+        names = list(dummy.keys())
+        tmp_path = path + ".tmp"
+        with torch.no_grad():
+            torch.onnx.export(
+                model, tuple(dummy[name] for name in names), tmp_path,
+                input_names=names, output_names=["logits"],
+                dynamic_axes={**{name: {0: "batch", 1: "sequence"} for name in names}, "logits": {0: "batch"}},
+                opset_version=14,
+                dynamo=False,  # the dynamo exporter needs onnxscript
+            )
+        os.replace(tmp_path, path)
+
+    session = ort.InferenceSession(path, providers=["CPUExecutionProvider"])
+    names = [i.name for i in session.get_inputs()]
+
+    def run(inputs):
+        return session.run(["logits"], {name: inputs[name].numpy() for name in names})[0]
+    return run
+
+def _get_runner():
+    """
+    Return a callable mapping padded pt inputs to a logits array for the active backend.
+    """
+    tokenizer, model = load_backend_model()
+    name = backend
+    runner = _runners.get(name)
+    if runner is None:
+        with _load_lock:
+            runner = _runners.get(name)
+            if runner is None:
+                if name == "torch":
+                    runner = _torch_runner(model)
+                elif name == "int8":
+                    quantized = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+                    runner = _torch_runner(quantized)
+                elif name == "onnx":
+                    runner = _onnx_runner(tokenizer, model)
+                elif name == "student":
+                    runner = _torch_runner(model)
+                else:
+                    raise ValueError(f"Unknown backend '{name}'. Choose from: {', '.join(BACKENDS)}")
+                _runners[name] = runner
+    return runner
+
+def _sigmoid(logits):
+    return torch.sigmoid(torch.from_numpy(logits)).numpy()
+
+TRAITS = ["Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]
+DEFAULT_BATCH_SIZE = 16
+
+# Buckets texts by token length so padding stays inside each bucket
+scheduler = LengthScheduler(batch_size=DEFAULT_BATCH_SIZE)
+
+def _empty_traits():
+    return {trait: 0.0 for trait in TRAITS}
+
+def _is_blank(text):
+    return text.strip() == "" or text.lower() == "nan"
+
+def _to_traits(probabilities):
+    return dict(zip(TRAITS, [float(np.round(p, 2)) for p in probabilities]))
+
+def _record_call(texts: int, elapsed: float):
+    _predict_seconds.labels(backend=backend).observe(elapsed)
+    _texts_total.labels(backend=backend).inc(texts)
+    if elapsed > 0:
+        _texts_per_second.labels(backend=backend).set(texts / elapsed)
 
 def predict_personality(text):
     if not isinstance(text, str):
         text = str(text)
-    if text.strip() == "" or text.lower() == "nan":
-        return {trait: 0.0 for trait in ["Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]}
+    if _is_blank(text):
+        return _empty_traits()
 
+    tokenizer, _ = load_backend_model()
+    start = time.perf_counter()
     inputs = tokenizer(text, return_tensors="pt", truncation=True, padding=True)
-    with torch.no_grad():
-        outputs = model(**inputs)
-    logits = outputs.logits
-    probabilities = torch.sigmoid(logits).numpy()[0]
-    traits = ["Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]
-    return dict(zip(traits, [float(np.round(p, 2)) for p in probabilities]))
-
-def predict_personality_batch(texts):
-    results = []
-    for text in texts:
+    tokens = inputs["input_ids"].shape[1]
+    if tokens >= tokenizer.model_max_length:
+        _truncated_total.inc()
+    probabilities = _sigmoid(_get_runner()(inputs))[0]
+    _batch_rows.observe(1)
+    _batch_tokens.observe(tokens)
+    _record_call(1, time.perf_counter() - start)
+    return _to_traits(probabilities)
+
+def _forward_batch(encodings):
+    """
+    Run one padded forward pass over a list of tokenized inputs.
+    """
+    tokenizer, _ = load_backend_model()
+    inputs = tokenizer.pad(encodings, padding=True, return_tensors="pt")
+    _batch_rows.observe(len(encodings))
+    _batch_tokens.observe(inputs["input_ids"].numel())
+    return _sigmoid(_get_runner()(inputs))
+
+def predict_personality_batch(texts, batch_size: int = None, mark_failed: bool = False):
+    """
+    Predict traits for many texts using padded micro-batches.
+
+    Texts are tokenized once and handed to the length scheduler, which buckets
+    them by token length so each micro-batch is padded only to its own longest
+    text. Each batch is scored in a single forward pass. If a batch fails, its
+    rows are retried one by one so a bad row only affects itself; a backend
+    that cannot be loaded at all raises instead. Rows that still fail get
+    neutral zeros, or None with `mark_failed` (so callers can avoid caching
+    them). Results are returned in input order; `scheduler.last_stats` holds
+    the padding waste.
+    """
+    tokenizer, _ = load_backend_model()
+    start = time.perf_counter()
+    texts = list(texts)
+    results = [None] * len(texts)
+    encoded = []  # (index, text, encoding)
+
+    for i, text in enumerate(texts):
         if not isinstance(text, str):
             text = str(text)
-        if text.strip() == "" or text.lower() == "nan":
-            results.append({trait: 0.0 for trait in ["Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]})
+        if _is_blank(text):
+            results[i] = _empty_traits()
             continue
         try:
-            result = predict_personality(text)
-            results.append(result)
+            encoded.append((i, text, tokenizer(text, truncation=True)))
         except Exception as e:
             print(f"⚠️ Skipping text due to error: {e}")
-            results.append({trait: 0.0 for trait in ["Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]})
-    return results
\ No newline at end of file
+            _errors_total.labels(stage="tokenize").inc()
+            results[i] = None if mark_failed else _empty_traits()
+
+    lengths = [len(enc["input_ids"]) for _, _, enc in encoded]
+    _truncated_total.inc(sum(length >= tokenizer.model_max_length for length in lengths))
+    if encoded:
+        # Load the backend outside the per-row fallback, so a missing student
+        # or onnxruntime fails the call instead of scoring every row as zeros
+        _get_runner()
+
+    for batch_idx in scheduler.schedule(lengths, batch_size):
+        batch = [encoded[j] for j in batch_idx]
+        try:
+            probabilities = _forward_batch([enc for _, _, enc in batch])
+            for (i, _, _), probs in zip(batch, probabilities):
+                results[i] = _to_traits(probs)
+        except Exception:
+            _errors_total.labels(stage="batch").inc()
+            for i, text, _ in batch:
+                try:
+                    results[i] = predict_personality(text)
+                except Exception as e:
+                    print(f"⚠️ Skipping text due to error: {e}")
+                    _errors_total.labels(stage="text").inc()
+                    results[i] = None if mark_failed else _empty_traits()
+
+    _record_call(len(texts), time.perf_counter() - start)
+    return results
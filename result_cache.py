@@ -0,0 +1,184 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import partial
+from utils import metrics
+
+DEFAULT_DB_PATH = os.environ.get("TRAIT_CACHE_DB", os.path.join(".cache", "trait_scores.sqlite"))
+DEFAULT_BACKENDS = os.environ.get("TRAIT_CACHE_BACKEND", "lru,sqlite")
+
+_lookups_total = metrics.counter("trait_cache_lookups_total", "Trait cache lookups by result")
+
+class LRUBackend:
+    """
+    In-process LRU map of cache key -> trait dict.
+    """
+
+    def __init__(self, max_entries: int = 10_000):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+class SQLiteBackend:
+    """
+    Trait dicts persisted in a local SQLite file, shared across processes.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS traits (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM traits WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, value):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO traits (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+            self._conn.commit()
+
+class ResultCache:
+    """
+    Trait-score cache keyed by hash(model id + revision + cleaned text).
+
+    Backends are checked in order; a hit in a later backend is copied into
+    the earlier ones. Changing the model id or revision changes every key,
+    so stale scores are never returned after a model update.
+    """
+
+    def __init__(self, backends, model_id: str, revision: str):
+        self.backends = list(backends)
+        self.model_id = model_id
+        self.revision = revision
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_id}\x00{self.revision}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get(self, text: str):
+        key = self.key(text)
+        for depth, backend in enumerate(self.backends):
+            value = backend.get(key)
+            if value is not None:
+                for earlier in self.backends[:depth]:
+                    earlier.put(key, value)
+                self.hits += 1
+                _lookups_total.labels(result="hit").inc()
+                return value
+        self.misses += 1
+        _lookups_total.labels(result="miss").inc()
+        return None
+
+    def put(self, text: str, value: dict):
+        key = self.key(text)
+        for backend in self.backends:
+            backend.put(key, value)
+
+    def get_or_compute(self, texts: list[str], compute) -> list[dict]:
+        """
+        Look up every text and score only the misses with `compute(list_of_texts)`.
+        `compute` returns None for rows it could not score; those are not stored
+        and come back as None, so a transient failure is retried next time.
+        """
+        results = [self.get(text) for text in texts]
+        missing = [i for i, value in enumerate(results) if value is None]
+        if missing:
+            computed = compute([texts[i] for i in missing])
+            for i, value in zip(missing, computed):
+                if value is not None:
+                    self.put(texts[i], value)
+                results[i] = value
+        return results
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+def make_backends(spec: str = DEFAULT_BACKENDS):
+    backends = []
+    for name in [part.strip() for part in spec.split(",") if part.strip()]:
+        if name == "lru":
+            backends.append(LRUBackend())
+        elif name == "sqlite":
+            backends.append(SQLiteBackend())
+        else:
+            raise ValueError(f"Unknown trait cache backend: {name}")
+    return backends
+
+_default_cache = None
+
+def get_cache() -> ResultCache:
+    """
+    Process-wide cache for the active predictor backend.
+    Switching backends keeps the storage but changes the key namespace.
+    """
+    global _default_cache
+    from model import predictor
+    model_id = predictor.model_identifier()
+    if _default_cache is None:
+        _default_cache = ResultCache(make_backends(), model_id, predictor.get_model_revision())
+    elif _default_cache.model_id != model_id:
+        _default_cache.model_id = model_id
+    return _default_cache
+
+def cache_stats() -> dict:
+    """
+    Hit/miss counters without forcing the model to load.
+    """
+    if _default_cache is None:
+        return {"hits": 0, "misses": 0, "hit_rate": 0.0}
+    return _default_cache.stats()
+
+def _fill_failed(results: list) -> list:
+    from model.predictor import _empty_traits
+    return [_empty_traits() if value is None else value for value in results]
+
+def cached_predict(text: str) -> dict:
+    """
+    Cached drop-in for predictor.predict_personality on a cleaned text.
+    """
+    from model.predictor import predict_personality_batch
+    compute = partial(predict_personality_batch, mark_failed=True)
+    return _fill_failed(get_cache().get_or_compute([text], compute))[0]
+
+def cached_predict_batch(texts, workers: int = 1, dedup: bool = True) -> list[dict]:
+    """
+    Cached drop-in for predictor.predict_personality_batch on cleaned texts.
+    Duplicate texts are looked up and scored once unless `dedup` is False
+    (for callers that already deduplicated). With `workers > 1` cache misses
+    are scored in a process pool.
+    """
+    if workers > 1:
+        from model.parallel_scoring import predict_personality_parallel
+        compute = partial(predict_personality_parallel, workers=workers, mark_failed=True)
+    else:
+        from model.predictor import predict_personality_batch
+        compute = partial(predict_personality_batch, mark_failed=True)
+    texts = [str(t) for t in texts]
+    if not dedup:
+        return _fill_failed(get_cache().get_or_compute(texts, compute))
+    from utils.dedup import dedup_apply
+    return _fill_failed(dedup_apply(texts, lambda unique: get_cache().get_or_compute(unique, compute), stage="predict"))
@@ -0,0 +1,131 @@
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.streaming import PLATFORMS, combine_texts
+
+def _checkpoint_path(output: str) -> str:
+    return output + ".ckpt.json"
+
+def load_checkpoint(output: str, input_path: str) -> dict:
+    """
+    Return the last checkpoint for `output`, or a fresh one.
+    A checkpoint written for a different input file is refused.
+    """
+    path = _checkpoint_path(output)
+    if not os.path.exists(path):
+        return {"input": os.path.abspath(input_path), "rows_done": 0, "output_bytes": 0}
+    with open(path, "r", encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint["input"] != os.path.abspath(input_path):
+        raise SystemExit(f"❌ {path} belongs to {checkpoint['input']}; remove it to start over.")
+    return checkpoint
+
+def save_checkpoint(output: str, checkpoint: dict):
+    path = _checkpoint_path(output)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _append_rows(output: str, rows: pd.DataFrame, header: bool) -> int:
+    with open(output, "a", newline="", encoding="utf-8") as f:
+        rows.to_csv(f, index=False, header=header)
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+def score_csv(input_path, output, platform="linkedin", checkpoint_every=500, batch_size=16, score_fn=None,
+              workers=1):
+    """
+    Score a CSV into `output`, checkpointing every `checkpoint_every` rows.
+
+    Rows are appended to `output` and the checkpoint is committed after each
+    block, so a crashed run resumes from the last finished block. Output
+    past the checkpoint is truncated on resume, so no block is written twice.
+    Duplicate texts within a block are scored once (see utils.dedup).
+    Returns throughput and per-row latency stats for the rows scored in this run.
+    """
+    from utils.dedup import deduplicate
+    if score_fn is None:
+        from functools import partial
+        from model.result_cache import cached_predict_batch
+        score_fn = partial(cached_predict_batch, workers=workers, dedup=False)
+
+    id_columns, text_columns = PLATFORMS[platform]
+    checkpoint = load_checkpoint(output, input_path)
+    if os.path.exists(output):
+        with open(output, "r+b") as f:
+            f.truncate(checkpoint["output_bytes"])
+    if checkpoint["rows_done"]:
+        print(f"↩️ Resuming after row {checkpoint['rows_done']}")
+
+    reader = pd.read_csv(
+        input_path,
+        chunksize=checkpoint_every,
+        usecols=list(dict.fromkeys(id_columns + text_columns)),
+        skiprows=range(1, checkpoint["rows_done"] + 1),
+    )
+    row_latencies = []
+    scored = unique_scored = 0
+    start = time.perf_counter()
+
+    for chunk in reader:
+        texts = combine_texts(chunk, text_columns)
+        unique, index = deduplicate(texts)
+        rows_per_text = np.bincount(index, minlength=len(unique))
+        unique_traits = []
+        # With a pool, the whole block is one call so it is sharded across every worker
+        step = max(len(unique), 1) if workers > 1 else batch_size
+        for i in range(0, len(unique), step):
+            batch_start = time.perf_counter()
+            unique_traits.extend(score_fn(unique[i:i + step]))
+            batch_rows = int(rows_per_text[i:i + step].sum())
+            # Rows in a batch (duplicates included) share one forward pass, so each is charged an equal share
+            row_latencies.extend([(time.perf_counter() - batch_start) / batch_rows] * batch_rows)
+        traits = [unique_traits[j] for j in index]
+        unique_scored += len(unique)
+
+        rows = pd.concat([chunk[id_columns].reset_index(drop=True), pd.DataFrame(traits)], axis=1)
+        checkpoint["output_bytes"] = _append_rows(output, rows, header=checkpoint["rows_done"] == 0)
+        checkpoint["rows_done"] += len(rows)
+        save_checkpoint(output, checkpoint)
+
+        scored += len(rows)
+        elapsed = time.perf_counter() - start
+        print(f"💾 {checkpoint['rows_done']} rows done ({scored / elapsed:.1f} rows/s)")
+
+    elapsed = time.perf_counter() - start
+    latencies = np.array(row_latencies) * 1000
+    return {
+        "rows": scored,
+        "seconds": elapsed,
+        "rows_per_sec": scored / elapsed if elapsed else 0.0,
+        "dedup_saved": 1 - unique_scored / scored if scored else 0.0,
+        "p50_ms": float(np.percentile(latencies, 50)) if scored else 0.0,
+        "p95_ms": float(np.percentile(latencies, 95)) if scored else 0.0,
+    }
+
+# Headless batch scoring of a LinkedIn or GitHub CSV
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score a LinkedIn or GitHub CSV into a traits CSV.")
+    parser.add_argument("input")
+    parser.add_argument("output")
+    parser.add_argument("--platform", choices=sorted(PLATFORMS), default="linkedin")
+    parser.add_argument("--checkpoint-every", type=int, default=500, help="Rows per checkpoint")
+    parser.add_argument("--batch-size", type=int, default=16,
+                        help="Rows per scoring call; with --workers each checkpoint block is one call")
+    parser.add_argument("--workers", type=int, default=1, help="Scoring processes")
+    args = parser.parse_args()
+
+    stats = score_csv(args.input, args.output, args.platform, args.checkpoint_every, args.batch_size,
+                      workers=args.workers)
+    print(f"✅ Scored {stats['rows']} rows in {stats['seconds']:.1f}s "
+          f"({stats['rows_per_sec']:.1f} rows/s, p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms per row, "
+          f"{stats['dedup_saved']:.0%} of inference saved by dedup)")
@@ -0,0 +1,294 @@
+import argparse
+import json
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PORT = 8700
+DEFAULT_MAX_BATCH = 32
+DEFAULT_MAX_WAIT_MS = 10
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_TIMEOUT = 30.0
+
+class QueueFull(Exception):
+    pass
+
+class Coalescer:
+    """
+    Merges concurrent requests into one batch call.
+
+    `submit` splits each request into chunks of at most `max_batch` texts. A
+    worker thread takes the first waiting chunk, then keeps collecting until
+    the next chunk would exceed `max_batch` texts or `max_wait_ms` has passed,
+    scores them with one `batch_fn(texts)` call and hands each chunk its own
+    slice of the results. The queue holds at most `max_queue` chunks; `submit`
+    raises QueueFull beyond that instead of letting latency grow without
+    bound. Chunks whose caller already timed out are dropped unscored, so a
+    cancelled request costs at most the one batch already running.
+    """
+
+    def __init__(self, batch_fn, max_batch: int = DEFAULT_MAX_BATCH, max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+                 max_queue: int = DEFAULT_QUEUE_SIZE):
+        self.batch_fn = batch_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._submit_lock = threading.Lock()
+        self._carry = None  # chunk that did not fit in the previous batch
+        self.batches = 0
+        self.texts = 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, texts: list) -> Future:
+        texts = list(texts)
+        chunks = [texts[i:i + self.max_batch] for i in range(0, len(texts), self.max_batch)]
+        parts = [Future() for _ in chunks]
+        with self._submit_lock:
+            # Only the worker takes from the queue, so free space cannot shrink under the lock
+            if self._queue.maxsize - self._queue.qsize() < len(chunks):
+                raise QueueFull(f"{len(chunks)} chunks do not fit; {self._queue.qsize()} of "
+                                f"{self._queue.maxsize} already waiting")
+            for chunk, part in zip(chunks, parts):
+                self._queue.put_nowait((chunk, part))
+        return _gather(parts)
+
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def _collect(self):
+        batch = [self._carry or self._queue.get()]
+        self._carry = None
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if size + len(item[0]) > self.max_batch:
+                self._carry = item
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = [(texts, future) for texts, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            texts = [text for request_texts, _ in batch for text in request_texts]
+            try:
+                results = self.batch_fn(texts)
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            offset = 0
+            for request_texts, future in batch:
+                future.set_result(results[offset:offset + len(request_texts)])
+                offset += len(request_texts)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.depth(),
+            "batches": self.batches,
+            "texts": self.texts,
+            "mean_batch": self.texts / self.batches if self.batches else 0.0,
+        }
+
+def _gather(parts: list) -> Future:
+    """
+    One future for the concatenated results of `parts`; cancelling it cancels
+    the parts that have not started, and the first failure fails it.
+    """
+    combined = Future()
+    if not parts:
+        combined.set_result([])
+        return combined
+    pending = [len(parts)]
+    lock = threading.Lock()
+
+    def part_done(part):
+        if part.cancelled():
+            return
+        with lock:
+            pending[0] -= 1
+            error = part.exception()
+            if error is None and pending[0]:
+                return
+            try:
+                if error is not None:
+                    combined.set_exception(error)
+                else:
+                    combined.set_result([result for p in parts for result in p.result()])
+            except InvalidStateError:
+                pass  # already failed or cancelled
+
+    def combined_done(future):
+        if future.cancelled() or future.exception() is not None:
+            for part in parts:
+                part.cancel()
+
+    for part in parts:
+        part.add_done_callback(part_done)
+    combined.add_done_callback(combined_done)
+    return combined
+
+def _predict_batch(texts):
+    from model.result_cache import cached_predict_batch
+    return cached_predict_batch(texts)
+
+def _embed_batch(texts):
+    from model.bert_model import get_bert_embeddings_batch
+    return get_bert_embeddings_batch(texts)
+
+class ScoringHandler(BaseHTTPRequestHandler):
+    """
+    POST /predict and /embed take {"texts": [...], "timeout": seconds} with
+    cleaned texts and answer {"results": [...]} in the same order.
+    503 means the queue is full, 504 that the request timed out waiting.
+    GET /health reports queue depth and batching stats.
+    """
+
+    def do_GET(self):
+        if self.path != "/health":
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        self._send(200, {name: c.stats() for name, c in self.server.coalescers.items()})
+
+    def do_POST(self):
+        coalescer = self.server.coalescers.get(self.path.strip("/"))
+        if coalescer is None:
+            self._send(404, {"error": f"Unknown path {self.path}"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            texts = [str(t) for t in body["texts"]]
+            timeout = min(float(body.get("timeout", self.server.request_timeout)), self.server.request_timeout)
+        except (ValueError, KeyError, TypeError) as e:
+            self._send(400, {"error": f"Expected {{\"texts\": [...]}}: {e}"})
+            return
+
+        try:
+            future = coalescer.submit(texts)
+        except QueueFull as e:
+            self._send(503, {"error": f"Scoring queue is full: {e}"}, {"Retry-After": "1"})
+            return
+        try:
+            results = future.result(timeout=timeout)
+        except FutureTimeout:
+            future.cancel()
+            self._send(504, {"error": f"Timed out after {timeout:.1f}s"})
+            return
+        except Exception as e:
+            self._send(500, {"error": str(e)})
+            return
+        self._send(200, {"results": results})
+
+    def _send(self, status: int, payload: dict, headers: dict = None):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(port: int = DEFAULT_PORT, host: str = "127.0.0.1", max_batch: int = DEFAULT_MAX_BATCH,
+                max_wait_ms: float = DEFAULT_MAX_WAIT_MS, max_queue: int = DEFAULT_QUEUE_SIZE,
+                timeout: float = DEFAULT_TIMEOUT, predict_fn=_predict_batch, embed_fn=_embed_batch) -> ThreadingHTTPServer:
+    """
+    Build the scoring server; port 0 picks a free port (see `server.server_address`).
+    """
+    server = ThreadingHTTPServer((host, port), ScoringHandler)
+    server.daemon_threads = True
+    server.request_timeout = timeout
+    server.coalescers = {
+        "predict": Coalescer(predict_fn, max_batch, max_wait_ms, max_queue),
+        "embed": Coalescer(embed_fn, max_batch, max_wait_ms, max_queue),
+    }
+    return server
+
+class RemoteScorer:
+    """
+    Client for the scoring service, with the same call shapes as
+    cached_predict / cached_predict_batch / get_bert_embeddings_batch.
+    Large inputs are sent `batch_size` texts per request so each one fits
+    in the server's timeout. A full queue (503) is retried with backoff;
+    other errors raise.
+    """
+
+    def __init__(self, url: str = None, timeout: float = DEFAULT_TIMEOUT, retries: int = 3,
+                 batch_size: int = DEFAULT_MAX_BATCH):
+        import requests
+
+        self.url = (url or os.environ.get("PERSONALITY_SERVICE_URL") or f"http://127.0.0.1:{DEFAULT_PORT}").rstrip("/")
+        self.timeout = timeout
+        self.retries = retries
+        self.batch_size = batch_size
+        self.session = requests.Session()
+
+    def _post(self, path: str, texts) -> list:
+        texts = [str(t) for t in texts]
+        results = []
+        for i in range(0, len(texts), self.batch_size):
+            results.extend(self._post_chunk(path, texts[i:i + self.batch_size]))
+        return results
+
+    def _post_chunk(self, path: str, texts: list) -> list:
+        for attempt in range(self.retries + 1):
+            response = self.session.post(f"{self.url}{path}", json={"texts": texts, "timeout": self.timeout},
+                                         timeout=self.timeout + 5)
+            if response.status_code != 503 or attempt == self.retries:
+                break
+            time.sleep(float(response.headers.get("Retry-After", 1)) * (attempt + 1))
+        if response.status_code != 200:
+            raise RuntimeError(f"Scoring service {path} failed ({response.status_code}): {response.text}")
+        return response.json()["results"]
+
+    def predict(self, text: str) -> dict:
+        return self._post("/predict", [text])[0]
+
+    def predict_batch(self, texts) -> list[dict]:
+        return self._post("/predict", texts)
+
+    def embed_batch(self, texts) -> list[list[float]]:
+        return self._post("/embed", texts)
+
+# Serve /predict and /embed for app.py sessions; point them here with PERSONALITY_SERVICE_URL
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Micro-batching personality scoring service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=DEFAULT_MAX_BATCH, help="Texts per coalesced batch")
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS,
+                        help="How long the first request in a batch waits for company")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help="Waiting chunks of up to --max-batch texts before 503")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Per-request timeout in seconds")
+    args = parser.parse_args()
+
+    from model import bert_model, predictor
+    predictor.load_backend_model()
+    bert_model.load_model()
+    server = make_server(args.port, args.host, args.max_batch, args.max_wait_ms, args.max_queue, args.timeout)
+    host, port = server.server_address[:2]
+    print(f"🛰️ Scoring service on http://{host}:{port} (batch ≤ {args.max_batch}, window {args.max_wait_ms:g} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,145 @@
+import argparse
+import json
+import os
+import pickle
+import time
+
+import numpy as np
+
+from train_model import DATA_PATH, EMBEDDER_NAME, MODEL_OUT, PRECOMPUTED_EMBEDDINGS, TRAIT_KEYS, prepare_data
+
+DEFAULT_LATENCY_BUDGET_MS = 50.0
+LATENCY_ROWS = 1000
+
+def candidates(seed: int = 42) -> dict:
+    """
+    Regressor heads to compare; each maps an embedding matrix to 5 trait scores.
+    Estimators run single-threaded, since folds are already spread over cores.
+    """
+    from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
+    from sklearn.linear_model import Ridge
+    from sklearn.multioutput import MultiOutputRegressor
+    from sklearn.neural_network import MLPRegressor
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return {
+        "forest": lambda: RandomForestRegressor(n_estimators=100, min_samples_leaf=2, random_state=seed),
+        "hist_gb": lambda: MultiOutputRegressor(HistGradientBoostingRegressor(max_iter=200, random_state=seed)),
+        "ridge": lambda: make_pipeline(StandardScaler(), Ridge(alpha=10.0)),
+        "mlp": lambda: make_pipeline(StandardScaler(), MLPRegressor(hidden_layer_sizes=(128,), alpha=1e-3,
+                                                                   early_stopping=True, max_iter=500,
+                                                                   random_state=seed)),
+    }
+
+def latency_per_1k(model, X) -> float:
+    """
+    Milliseconds to score LATENCY_ROWS rows in one predict call (best of 3).
+    """
+    rows = np.resize(np.asarray(X, dtype=np.float32), (LATENCY_ROWS, X.shape[1]))
+    model.predict(rows[:10])
+    timings = []
+    for _ in range(3):
+        start = time.perf_counter()
+        model.predict(rows)
+        timings.append(time.perf_counter() - start)
+    return min(timings) * 1000
+
+def _fit(name, make, X, y):
+    model = make()
+    start = time.perf_counter()
+    model.fit(X, y)
+    return name, model, time.perf_counter() - start
+
+def _run_fold(name, make, X, y, train_idx, valid_idx):
+    _, model, train_seconds = _fit(name, make, X[train_idx], y[train_idx])
+    errors = ((model.predict(X[valid_idx]) - y[valid_idx]) ** 2).mean(axis=0)
+    return name, train_seconds, errors
+
+def cross_validate(X, y, train_idx, folds: int = 5, n_jobs: int = -1, seed: int = 42) -> dict:
+    """
+    K-fold CV of every candidate on the training rows. All (candidate, fold)
+    fits run in parallel across cores.
+    """
+    from joblib import Parallel, delayed
+    from sklearn.model_selection import KFold
+
+    X, y = np.asarray(X), np.asarray(y)
+    train_idx = np.asarray(train_idx)
+    splits = list(KFold(folds, shuffle=True, random_state=seed).split(train_idx))
+    jobs = [delayed(_run_fold)(name, make, X, y, train_idx[a], train_idx[b])
+            for name, make in candidates(seed).items() for a, b in splits]
+    results = {}
+    for name, train_seconds, errors in Parallel(n_jobs=n_jobs)(jobs):
+        entry = results.setdefault(name, {"train_seconds": [], "mse": []})
+        entry["train_seconds"].append(train_seconds)
+        entry["mse"].append(errors)
+    return {
+        name: {
+            "cv_train_seconds": float(np.mean(entry["train_seconds"])),
+            "cv_mse": float(np.mean(entry["mse"])),
+            "cv_mse_per_trait": dict(zip(TRAIT_KEYS, np.mean(entry["mse"], axis=0).tolist())),
+        }
+        for name, entry in results.items()
+    }
+
+def select(report: dict, latency_budget_ms: float) -> str:
+    """
+    Lowest CV MSE among candidates within the latency budget; the fastest one if none is.
+    """
+    within = [name for name, r in report.items() if r["latency_ms_per_1k"] <= latency_budget_ms]
+    if within:
+        return min(within, key=lambda name: report[name]["cv_mse"])
+    return min(report, key=lambda name: report[name]["latency_ms_per_1k"])
+
+# Compare regressor heads with cross-validation and save the best one under a latency budget
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cross-validated model selection for the trait regressor.")
+    parser.add_argument("--csv", default=DATA_PATH)
+    parser.add_argument("--embedder", default=EMBEDDER_NAME)
+    parser.add_argument("--precomputed-embeddings", default=PRECOMPUTED_EMBEDDINGS)
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--latency-budget-ms", type=float, default=DEFAULT_LATENCY_BUDGET_MS,
+                        help="Max milliseconds to score 1000 embeddings")
+    parser.add_argument("--output", default=MODEL_OUT)
+    parser.add_argument("--report", default="model/model_selection.json")
+    args = parser.parse_args()
+
+    data = prepare_data(args.csv, args.embedder, args.precomputed_embeddings)
+    X, y, split = np.asarray(data["X"]), np.asarray(data["y"]), data["split"]
+
+    print(f"🔁 {args.folds}-fold CV of {len(candidates())} candidates on {len(split['train'])} rows...")
+    report = cross_validate(X, y, split["train"], args.folds, args.n_jobs)
+
+    # Refit each candidate on the whole training split (in parallel), then
+    # measure size, latency and held-out error one model at a time
+    from joblib import Parallel, delayed
+    fitted = {}
+    refits = Parallel(n_jobs=args.n_jobs)(delayed(_fit)(name, make, X[split["train"]], y[split["train"]])
+                                          for name, make in candidates().items())
+    for name, model, train_seconds in refits:
+        report[name]["train_seconds"] = train_seconds
+        report[name]["latency_ms_per_1k"] = latency_per_1k(model, X[split["test"]])
+        report[name]["size_bytes"] = len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL))
+        report[name]["test_mse"] = float(((model.predict(X[split["test"]]) - y[split["test"]]) ** 2).mean())
+        fitted[name] = model
+
+    best = select(report, args.latency_budget_ms)
+    print(f"{'model':<8} {'cv mse':>8} {'test mse':>9} {'train s':>8} {'ms/1k':>8} {'size MB':>8}  per-trait cv mse")
+    for name, r in sorted(report.items(), key=lambda item: item[1]["cv_mse"]):
+        per_trait = " ".join(f"{t[:4]} {v:.4f}" for t, v in r["cv_mse_per_trait"].items())
+        marker = "⭐" if name == best else ("  " if r["latency_ms_per_1k"] <= args.latency_budget_ms else "⏱️")
+        print(f"{name:<8} {r['cv_mse']:8.4f} {r['test_mse']:9.4f} {r['train_seconds']:8.2f} "
+              f"{r['latency_ms_per_1k']:8.1f} {r['size_bytes'] / 1e6:8.2f}  {per_trait} {marker}")
+
+    import joblib
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    joblib.dump(fitted[best], args.output)
+    os.makedirs(os.path.dirname(args.report) or ".", exist_ok=True)
+    with open(args.report, "w", encoding="utf-8") as f:
+        json.dump({"selected": best, "latency_budget_ms": args.latency_budget_ms, "candidates": report}, f, indent=2)
+    print(f"💾 Saved {best} to {args.output} (report: {args.report})")
+
+    from model.head_export import refresh_export
+    refresh_export(fitted[best])
@@ -0,0 +1,58 @@
+import os
+import pandas as pd
+from utils.preprocess import clean_texts
+from utils.tracing import span
+
+LINKEDIN_COLUMNS = ['name', 'about', 'posts', 'experience', 'education']
+GITHUB_TEXT_COLUMNS = ['Description', 'Languages', 'Latest Commit', 'README']
+DEFAULT_CHUNK_ROWS = 500
+
+# (id columns, text columns) for each supported CSV export
+PLATFORMS = {
+    'linkedin': (['name'], LINKEDIN_COLUMNS),
+    'github': (['Username', 'Name'], GITHUB_TEXT_COLUMNS),
+}
+
+def read_csv_columns(file) -> list[str]:
+    """
+    Read only the header of an uploaded CSV and rewind it.
+    """
+    columns = list(pd.read_csv(file, nrows=0).columns)
+    file.seek(0)
+    return columns
+
+def combine_texts(chunk, text_columns) -> list[str]:
+    """
+    Join the text columns of each row and clean the result.
+    """
+    return clean_texts(chunk[text_columns].fillna('').astype(str).agg(' '.join, axis=1))
+
+def _file_size(file) -> int:
+    pos = file.tell()
+    file.seek(0, os.SEEK_END)
+    size = file.tell()
+    file.seek(pos)
+    return size
+
+def stream_scores(file, id_columns, text_columns, score_fn, chunksize: int = DEFAULT_CHUNK_ROWS):
+    """
+    Score a CSV chunk by chunk.
+
+    Yields `(results, fraction_done)` per chunk, where `results` holds the
+    id columns plus one column per trait for that chunk only. Only one chunk
+    of raw text is in memory at a time. `score_fn` takes a list of cleaned
+    texts and returns a list of trait dicts.
+    """
+    size = _file_size(file) or 1
+    reader = pd.read_csv(file, chunksize=chunksize, usecols=list(dict.fromkeys(id_columns + text_columns)))
+    while True:
+        with span("read_csv"):
+            chunk = next(reader, None)
+        if chunk is None:
+            return
+        with span("clean", rows=len(chunk)):
+            texts = combine_texts(chunk, text_columns)
+        with span("score", rows=len(chunk)):
+            traits = score_fn(texts)
+        results = pd.concat([chunk[id_columns].reset_index(drop=True), pd.DataFrame(traits)], axis=1)
+        yield results, min(file.tell() / size, 1.0)
@@ -0,0 +1,58 @@
+import os
+import re
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def sample_texts(n: int = 32) -> list[str]:
+    """
+    Lowercased letters-only texts from the shipped corpus, close to what clean_texts produces.
+    """
+    import pandas as pd
+
+    texts = pd.read_csv(os.path.join(ROOT, "cleaned_texts.csv"))["text"].fillna("").astype(str).head(n)
+    return [" ".join(re.sub(r"[^a-zA-Z\s]", " ", text).lower().split()[:200]) for text in texts]
+
+@pytest.fixture(scope="session")
+def tiny_classifier(tmp_path_factory):
+    """
+    A randomly initialised 2-layer BERT classifier with a corpus vocabulary,
+    small enough to score offline in a second.
+    """
+    pytest.importorskip("transformers")
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    target = str(tmp_path_factory.mktemp("tiny_classifier"))
+    words = sorted({w for text in sample_texts(200) for w in text.split() if len(w) > 1})
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    vocab = ["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + list(letters) + [f"##{c}" for c in letters] + words
+    vocab_path = os.path.join(target, "vocab.txt")
+    with open(vocab_path, "w", encoding="utf-8") as f:
+        f.write("\n".join(vocab) + "\n")
+
+    torch.manual_seed(0)
+    config = BertConfig(vocab_size=len(vocab), hidden_size=64, num_hidden_layers=2, num_attention_heads=2,
+                        intermediate_size=128, max_position_embeddings=512, num_labels=5)
+    BertForSequenceClassification(config).save_pretrained(target)
+    BertTokenizerFast(vocab_file=vocab_path, do_lower_case=True).save_pretrained(target)
+    return target
+
+@pytest.fixture
+def predictor(tiny_classifier, monkeypatch):
+    """
+    model.predictor pointed at the tiny classifier, with a fresh model and runners.
+    """
+    from model import predictor
+
+    monkeypatch.setattr(predictor, "MODEL_ID", tiny_classifier)
+    monkeypatch.setattr(predictor, "tokenizer", None)
+    monkeypatch.setattr(predictor, "model", None)
+    monkeypatch.setattr(predictor, "student_tokenizer", None)
+    monkeypatch.setattr(predictor, "student_model", None)
+    monkeypatch.setattr(predictor, "_runners", {})
+    monkeypatch.setattr(predictor, "backend", "torch")
+    return predictor
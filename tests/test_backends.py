@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from conftest import sample_texts
+
+def test_int8_stays_within_tolerance_of_fp32(predictor):
+    compare_backends = pytest.importorskip("compare_backends")
+    texts = sample_texts()
+    reference, _ = compare_backends.score_matrix(texts, "torch")
+    scores, _ = compare_backends.score_matrix(texts, "int8")
+    assert scores.shape == (len(texts), len(predictor.TRAITS))
+    assert np.abs(scores - reference).max() <= compare_backends.DEFAULT_TOLERANCES["int8"] + 1e-9
+
+def test_onnx_export_matches_fp32(predictor, tmp_path, monkeypatch):
+    pytest.importorskip("onnx")
+    pytest.importorskip("onnxruntime")
+    compare_backends = pytest.importorskip("compare_backends")
+    monkeypatch.setattr(predictor, "ONNX_DIR", str(tmp_path))
+    texts = sample_texts()
+    reference, _ = compare_backends.score_matrix(texts, "torch")
+    scores, _ = compare_backends.score_matrix(texts, "onnx")
+    assert np.abs(scores - reference).max() <= compare_backends.DEFAULT_TOLERANCES["onnx"] + 1e-9
+
+def test_student_backend_never_loads_the_teacher(predictor, tiny_classifier, tmp_path, monkeypatch):
+    monkeypatch.setattr(predictor, "MODEL_ID", str(tmp_path / "no-teacher-here"))
+    monkeypatch.setattr(predictor, "STUDENT_DIR", tiny_classifier)
+    predictor.set_backend("student")
+    results = predictor.predict_personality_batch(sample_texts(4) + [""])
+    assert [sorted(r) for r in results] == [sorted(predictor.TRAITS)] * 5
+    assert predictor.model is None
+    assert predictor.get_model_revision() == "main"
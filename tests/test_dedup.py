@@ -0,0 +1,53 @@
+import pytest
+
+from utils.dedup import NearDuplicateIndex, dedup_apply, dedup_stats, deduplicate, jaccard, shingles
+
+BASE = "software engineer who loves open source python and machine learning projects"
+
+def test_exact_mode_maps_every_text_to_its_unique_copy():
+    texts = ["b", "a", "b", "c", "a"]
+    unique, index = deduplicate(texts, mode="exact")
+    assert unique == ["b", "a", "c"]
+    assert [unique[j] for j in index] == texts
+
+def test_off_mode_keeps_every_text():
+    texts = ["a", "a"]
+    assert deduplicate(texts, mode="off") == (texts, [0, 1])
+
+def test_near_mode_groups_similar_texts_only():
+    texts = [BASE, BASE + "!", "a completely different profile about gardening and cooking", BASE]
+    unique, index = deduplicate(texts, mode="near", threshold=0.9)
+    assert unique == [BASE, texts[2]]
+    assert index == [0, 0, 1, 0]
+    # Exact mode never merges texts that differ
+    assert len(deduplicate(texts, mode="exact")[0]) == 3
+
+def test_short_texts_are_never_near_duplicates():
+    index = NearDuplicateIndex(threshold=0.5)
+    assert index.find_or_add(0, "abc") is None
+    assert index.find_or_add(1, "abc") is None
+
+def test_shingles_and_jaccard():
+    assert len(shingles("abcdef")) == 2
+    assert len(shingles("a  b   c")) == len(shingles("a b c"))
+    assert jaccard(shingles(BASE), shingles(BASE)) == 1.0
+    assert jaccard(shingles(""), shingles("")) == 1.0
+
+def test_dedup_apply_scores_each_unique_text_once():
+    calls = []
+
+    def score(texts):
+        calls.append(list(texts))
+        return [text.upper() for text in texts]
+
+    before = dedup_stats()
+    assert dedup_apply(["x", "y", "x"], score, mode="exact") == ["X", "Y", "X"]
+    assert calls == [["x", "y"]]
+    after = dedup_stats()
+    assert after["texts"] - before["texts"] == 3
+    assert after["exact"] - before["exact"] == 1
+    assert dedup_apply([], score) == []
+
+def test_unknown_mode_raises():
+    with pytest.raises(ValueError):
+        deduplicate(["a"], mode="fuzzy")
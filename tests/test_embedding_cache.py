@@ -0,0 +1,69 @@
+import multiprocessing
+
+import numpy as np
+
+from model.embedding_cache import EmbeddingCache
+
+DIM = 4
+
+def _vector(value):
+    return np.full(DIM, value, dtype=np.float32)
+
+def _fill(path, worker):
+    cache = EmbeddingCache(path, DIM, "test-model", max_entries=50)
+    for j in range(40):
+        cache.put(f"text {worker}-{j}", _vector(worker * 100 + j))
+
+def test_round_trip_and_reopen(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), DIM, "test-model")
+    cache.put_many(["alice", "bob"], [_vector(1), _vector(2)])
+    assert cache.get("carol") is None
+
+    reopened = EmbeddingCache(str(tmp_path), DIM, "test-model")
+    assert len(reopened) == 2
+    np.testing.assert_array_equal(reopened.get("alice"), _vector(1))
+    np.testing.assert_array_equal(reopened.get("bob"), _vector(2))
+    # Keys are per model
+    assert EmbeddingCache(str(tmp_path), DIM, "other-model").get("alice") is None
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), DIM, "test-model", max_entries=2)
+    cache.put("a", _vector(1))
+    cache.put("b", _vector(2))
+    cache.get("a")
+    cache.put("c", _vector(3))
+    assert cache.get("b") is None
+
+    reopened = EmbeddingCache(str(tmp_path), DIM, "test-model", max_entries=2)
+    np.testing.assert_array_equal(reopened.get("a"), _vector(1))
+    np.testing.assert_array_equal(reopened.get("c"), _vector(3))
+    assert reopened.get("b") is None
+
+def test_instances_see_each_others_writes_and_compaction(tmp_path):
+    first = EmbeddingCache(str(tmp_path), DIM, "test-model")
+    second = EmbeddingCache(str(tmp_path), DIM, "test-model")
+    first.put("alice", _vector(1))
+    second.put("bob", _vector(2))
+    np.testing.assert_array_equal(second.get("alice"), _vector(1))
+    np.testing.assert_array_equal(first.get("bob"), _vector(2))
+
+    second.compact()
+    first.put("carol", _vector(3))
+    np.testing.assert_array_equal(second.get("carol"), _vector(3))
+    np.testing.assert_array_equal(second.get("alice"), _vector(1))
+
+def test_processes_never_share_a_row(tmp_path):
+    workers = [multiprocessing.Process(target=_fill, args=(str(tmp_path), i)) for i in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    cache = EmbeddingCache(str(tmp_path), DIM, "test-model", max_entries=50)
+    assert len(cache) == 50
+    for i in range(4):
+        for j in range(40):
+            vector = cache.get(f"text {i}-{j}")
+            if vector is not None:
+                np.testing.assert_array_equal(vector, _vector(i * 100 + j))
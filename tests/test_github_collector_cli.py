@@ -0,0 +1,150 @@
+import base64
+import json
+import os
+import runpy
+import sqlite3
+import subprocess
+import sys
+import threading
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "webscrapinggithub (1).py")
+sys.path.insert(0, ROOT)
+
+from github_stub_server import make_server, request_key
+
+def _profile(username, repos=()):
+    return {"username": username, "name": username.title(), "followers": 1, "following": 2, "public_repos": len(repos),
+            "repos": [{"repo_name": name, "description": "demo", "languages": ["Python"], "latest_commit": "init",
+                       "readme": "# readme"} for name in repos]}
+
+def _record(record_dir, path, body, status=200, method="GET", request=b""):
+    recorded = {"status": status, "headers": {"Content-Type": "application/json"}, "body": json.dumps(body)}
+    with open(os.path.join(record_dir, request_key(method, path, request) + ".json"), "w", encoding="utf-8") as f:
+        json.dump(recorded, f)
+
+@pytest.fixture
+def stub(tmp_path):
+    record_dir = str(tmp_path / "recordings")
+    server = make_server(record_dir)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, record_dir
+    server.shutdown()
+    server.server_close()
+
+def run_cli(cwd, *args, api_url="http://127.0.0.1:9", fetch_mode="rest"):
+    env = dict(os.environ, GITHUB_API_URL=api_url, GITHUB_HTTP_CACHE=os.path.join(cwd, "http_cache"),
+               GITHUB_FETCH_MODE=fetch_mode)
+    result = subprocess.run([sys.executable, SCRIPT, *args], cwd=cwd, env=env, capture_output=True, text=True,
+                            timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert "Fatal error" not in result.stdout, result.stdout
+    assert "Traceback" not in result.stderr, result.stderr
+    return result.stdout
+
+def _store_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT username FROM profiles ORDER BY id").fetchall()
+
+def _store_profiles(path):
+    with sqlite3.connect(path) as conn:
+        return [json.loads(data) for (data,) in conn.execute("SELECT data FROM profiles ORDER BY id")]
+
+def test_import_json_export_and_compact(tmp_path):
+    cwd = str(tmp_path)
+    legacy = [_profile("alice", ["one", "two"]), _profile("bob", ["three"])]
+    (tmp_path / "github_profiles_pakistan.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    assert "Read 2 profiles" in run_cli(cwd, "import-json")
+    # The legacy JSON is an input only and is never rewritten
+    assert json.loads((tmp_path / "github_profiles_pakistan.json").read_text(encoding="utf-8")) == legacy
+    assert _store_rows(tmp_path / "github_profiles_pakistan.sqlite") == [("alice",), ("bob",)]
+
+    assert "Exported 2 users" in run_cli(cwd, "export")
+    lines = (tmp_path / "github_profiles_pakistan.csv").read_text(encoding="utf-8").splitlines()
+    assert lines[0].startswith("Username,Name")
+    assert len(lines) == 1 + 3
+
+    # A second fetch of alice is superseded by compaction
+    with sqlite3.connect(tmp_path / "github_profiles_pakistan.sqlite") as conn:
+        conn.execute("INSERT INTO profiles (username, fetched_at, data) VALUES (?, ?, ?)",
+                     ("alice", 0.0, json.dumps(_profile("alice", ["one"]))))
+    assert "Removed 1 superseded" in run_cli(cwd, "compact")
+    assert _store_rows(tmp_path / "github_profiles_pakistan.sqlite") == [("bob",), ("alice",)]
+
+def test_collect_stores_new_users_and_exports(tmp_path, stub):
+    server, record_dir = stub
+    cwd = str(tmp_path)
+    _record(record_dir, "/search/users?q=location:Pakistan&per_page=30&page=1",
+            {"items": [{"login": "alice"}, {"login": "carol"}]})
+    _record(record_dir, "/users/carol", {"login": "carol", "name": "Carol", "followers": 3, "following": 4,
+                                         "public_repos": 0})
+    _record(record_dir, "/users/carol/repos?per_page=100&sort=updated", [])
+    (tmp_path / "github_profiles_pakistan.json").write_text(json.dumps([_profile("alice", ["one"])]), encoding="utf-8")
+
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+    output = run_cli(cwd, "collect", "--pages", "1", api_url=api_url)
+    assert "1 new users found" in output
+    assert _store_rows(tmp_path / "github_profiles_pakistan.sqlite") == [("alice",), ("carol",)]
+    assert (tmp_path / "github_profiles_pakistan.csv").exists()
+
+    # Nothing new on the next run
+    assert "No new users found" in run_cli(cwd, "collect", "--pages", "1", api_url=api_url)
+
+def _record_rest_and_graphql(record_dir, collector):
+    _record(record_dir, "/search/users?q=location:Pakistan&per_page=30&page=1",
+            {"items": [{"login": "carol"}, {"login": "dave"}]})
+
+    # REST: carol has a fully populated repo, dave an empty one without description, commits or README
+    _record(record_dir, "/users/carol", {"login": "carol", "name": "Carol", "followers": 3, "following": 4,
+                                         "public_repos": 1})
+    _record(record_dir, "/users/carol/repos?per_page=100&sort=updated", [{"name": "proj", "description": "demo"}])
+    _record(record_dir, "/repos/carol/proj/commits?per_page=1", [{"commit": {"message": "init"}}])
+    _record(record_dir, "/repos/carol/proj/languages", {"Python": 900, "Shell": 10})
+    _record(record_dir, "/repos/carol/proj/readme",
+            {"content": base64.b64encode(b"# Proj\nA demo project").decode()})
+    _record(record_dir, "/users/dave", {"login": "dave", "name": None, "followers": 0, "following": 1,
+                                        "public_repos": 1})
+    _record(record_dir, "/users/dave/repos?per_page=100&sort=updated", [{"name": "empty", "description": None}])
+    _record(record_dir, "/repos/dave/empty/commits?per_page=1", {"message": "Git Repository is empty."}, 409)
+    _record(record_dir, "/repos/dave/empty/languages", {})
+    _record(record_dir, "/repos/dave/empty/readme", {"message": "Not Found"}, 404)
+
+    # GraphQL: the same two users in one page
+    repo = {"name": "proj", "description": "demo", "languages": {"nodes": [{"name": "Python"}, {"name": "Shell"}]},
+            "defaultBranchRef": {"target": {"message": "init"}}, "readme0": {"text": "# Proj\nA demo project"}}
+    empty = {"name": "empty", "description": None, "languages": {"nodes": []}, "defaultBranchRef": None}
+    data = {
+        "u0": {"login": "carol", "name": "Carol", "followers": {"totalCount": 3}, "following": {"totalCount": 4},
+               "repositories": {"totalCount": 1}, "recent": {"nodes": [repo]}},
+        "u1": {"login": "dave", "name": None, "followers": {"totalCount": 0}, "following": {"totalCount": 1},
+               "repositories": {"totalCount": 1}, "recent": {"nodes": [empty]}},
+    }
+    query = json.dumps({"query": collector["profiles_query"](["carol", "dave"])}).encode("utf-8")
+    _record(record_dir, "/graphql", {"data": data}, method="POST", request=query)
+
+def test_graphql_collects_the_same_profiles_as_rest(tmp_path, stub, monkeypatch):
+    server, record_dir = stub
+    monkeypatch.setenv("GITHUB_HTTP_CACHE", str(tmp_path / "import_cache"))
+    _record_rest_and_graphql(record_dir, runpy.run_path(SCRIPT))
+    api_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+    profiles = {}
+    for mode in ("rest", "graphql"):
+        cwd = tmp_path / mode
+        cwd.mkdir()
+        output = run_cli(str(cwd), "collect", "--pages", "1", api_url=api_url, fetch_mode=mode)
+        assert "2 new users found" in output
+        # The concurrent REST collector stores users in completion order
+        profiles[mode] = sorted(_store_profiles(cwd / "github_profiles_pakistan.sqlite"), key=lambda p: p["username"])
+        if mode == "graphql":
+            assert "1 GraphQL requests" in output
+
+    assert [p["username"] for p in profiles["rest"]] == ["carol", "dave"]
+    assert profiles["graphql"] == profiles["rest"]
+    csv_rows = {mode: sorted((tmp_path / mode / "github_profiles_pakistan.csv").read_text(encoding="utf-8").splitlines())
+                for mode in profiles}
+    assert csv_rows["graphql"] == csv_rows["rest"]
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+sklearn = pytest.importorskip("sklearn")
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+from sklearn.multioutput import MultiOutputRegressor
+from sklearn.neural_network import MLPRegressor
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import StandardScaler
+
+from model.head_export import FlatHead, export_head, refresh_export
+
+def _data(rows=200, features=16, outputs=5):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(rows, features)).astype(np.float32)
+    y = 1 / (1 + np.exp(-X[:, :outputs] @ rng.normal(size=(outputs, outputs))))
+    return X, y
+
+MODELS = {
+    "forest": lambda: RandomForestRegressor(n_estimators=8, max_depth=6, random_state=0),
+    "per_output_forest": lambda: MultiOutputRegressor(RandomForestRegressor(n_estimators=4, random_state=0)),
+    "scaled_ridge": lambda: make_pipeline(StandardScaler(), Ridge()),
+    "mlp": lambda: MLPRegressor(hidden_layer_sizes=(8,), max_iter=50, random_state=0),
+}
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+@pytest.mark.parametrize("name", sorted(MODELS))
+def test_flat_head_matches_estimator(name, tmp_path):
+    X, y = _data()
+    model = MODELS[name]().fit(X, y)
+    meta = export_head(model, str(tmp_path))
+    assert meta["n_features"] == X.shape[1]
+
+    head = FlatHead(str(tmp_path), chunk_rows=64)
+    np.testing.assert_allclose(head.predict(X), model.predict(X), atol=1e-4)
+    np.testing.assert_allclose(head.predict(X[0]), model.predict(X[:1]), atol=1e-4)
+
+def test_unexportable_model_removes_stale_export(tmp_path):
+    X, y = _data()
+    export_dir = tmp_path / "head"
+    export_head(Ridge().fit(X, y), str(export_dir))
+    refresh_export(object(), str(export_dir))
+    assert not export_dir.exists()
+
+def test_rejects_other_export_formats(tmp_path):
+    X, y = _data()
+    export_head(Ridge().fit(X, y), str(tmp_path))
+    (tmp_path / "meta.json").write_text('{"format": 99, "arrays": []}', encoding="utf-8")
+    with pytest.raises(ValueError):
+        FlatHead(str(tmp_path))
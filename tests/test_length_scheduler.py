@@ -0,0 +1,33 @@
+import pytest
+
+from model.length_scheduler import LengthScheduler, padding_stats
+
+def test_every_index_is_scheduled_once_in_length_buckets():
+    lengths = [5, 300, 40, 33, 12, 600, 64, 31, 128, 7]
+    scheduler = LengthScheduler(boundaries=(32, 64, 128, 256, 512), batch_size=2)
+    batches = scheduler.schedule(lengths)
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    assert all(len(batch) <= 2 for batch in batches)
+    for batch in batches:
+        assert len({scheduler.bucket_of(lengths[i]) for i in batch}) == 1
+        assert [lengths[i] for i in batch] == sorted(lengths[i] for i in batch)
+
+def test_bucket_of_uses_inclusive_upper_bounds():
+    scheduler = LengthScheduler(boundaries=(64, 32))
+    assert [scheduler.bucket_of(n) for n in (1, 32, 33, 64, 65)] == [0, 0, 1, 1, 2]
+
+def test_batch_size_override_and_padding_stats():
+    lengths = [10, 20, 30, 40]
+    scheduler = LengthScheduler(batch_size=16)
+    batches = scheduler.schedule(lengths, batch_size=1)
+    assert len(batches) == 4
+    assert scheduler.last_stats == {"batches": 4, "real_tokens": 100, "padded_tokens": 100, "waste_ratio": 0.0}
+
+    stats = padding_stats(lengths, [[0, 1, 2, 3]])
+    assert stats["padded_tokens"] == 160
+    assert stats["waste_ratio"] == pytest.approx(60 / 160)
+    assert padding_stats([], [])["waste_ratio"] == 0.0
+
+def test_rejects_empty_batches():
+    with pytest.raises(ValueError):
+        LengthScheduler(batch_size=0)
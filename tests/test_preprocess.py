@@ -0,0 +1,35 @@
+import os
+
+import pandas as pd
+import pytest
+
+from conftest import ROOT
+
+nltk = pytest.importorskip("nltk")
+from utils.preprocess import NLTK_RESOURCES, clean_text, clean_texts
+
+def _nltk_data_missing() -> bool:
+    for path in NLTK_RESOURCES.values():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            return True
+    return False
+
+pytestmark = pytest.mark.skipif(_nltk_data_missing(), reason="NLTK data is not installed")
+
+SHIPPED = {
+    "cleaned_texts.csv": ["text"],
+    "github_profiles_pakistan final.csv": ["Description", "Languages", "Latest Commit", "README"],
+    "Linkedin final traits.csv": ["name"],
+}
+
+@pytest.mark.parametrize("path", sorted(SHIPPED))
+def test_clean_texts_matches_clean_text_on_shipped_csvs(path):
+    df = pd.read_csv(os.path.join(ROOT, path))
+    texts = df[SHIPPED[path]].fillna("").astype(str).agg(" ".join, axis=1).tolist()
+    assert clean_texts(texts) == [clean_text(t) for t in texts]
+
+def test_clean_texts_handles_contractions_and_pool():
+    texts = ["I cannot wait, gonna ship it!", "Visit https://example.com NOW", ""] * 300
+    assert clean_texts(texts, n_jobs=2, chunksize=256) == [clean_text(t) for t in texts]
@@ -0,0 +1,51 @@
+from model.result_cache import LRUBackend, ResultCache, SQLiteBackend
+
+TRAITS = {"Openness": 0.5, "Conscientiousness": 0.4, "Extraversion": 0.3, "Agreeableness": 0.2, "Neuroticism": 0.1}
+
+def test_lru_backend_evicts_least_recently_used():
+    lru = LRUBackend(max_entries=2)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    lru.get("a")
+    lru.put("c", 3)
+    assert (lru.get("a"), lru.get("b"), lru.get("c")) == (1, None, 3)
+
+def test_sqlite_backend_persists_across_connections(tmp_path):
+    path = str(tmp_path / "traits.sqlite")
+    SQLiteBackend(path).put("key", TRAITS)
+    assert SQLiteBackend(path).get("key") == TRAITS
+    assert SQLiteBackend(path).get("other") is None
+
+def test_hits_in_later_backends_are_copied_forward(tmp_path):
+    sqlite = SQLiteBackend(str(tmp_path / "traits.sqlite"))
+    ResultCache([sqlite], "model", "rev1").put("hello", TRAITS)
+
+    lru = LRUBackend()
+    cache = ResultCache([lru, sqlite], "model", "rev1")
+    assert cache.get("hello") == TRAITS
+    assert lru.get(cache.key("hello")) == TRAITS
+    assert cache.stats() == {"hits": 1, "misses": 0, "hit_rate": 1.0}
+
+def test_model_id_and_revision_change_every_key():
+    lru = LRUBackend()
+    ResultCache([lru], "model", "rev1").put("hello", TRAITS)
+    assert ResultCache([lru], "model", "rev2").get("hello") is None
+    assert ResultCache([lru], "model+int8", "rev1").get("hello") is None
+    assert ResultCache([lru], "model", "rev1").get("hello") == TRAITS
+
+def test_get_or_compute_scores_misses_only_and_skips_failures():
+    cache = ResultCache([LRUBackend()], "model", "rev1")
+    cache.put("cached", TRAITS)
+    calls = []
+
+    def compute(texts):
+        calls.append(list(texts))
+        return [None if text == "broken" else dict(TRAITS, Openness=0.9) for text in texts]
+
+    results = cache.get_or_compute(["cached", "new", "broken"], compute)
+    assert calls == [["new", "broken"]]
+    assert results == [TRAITS, dict(TRAITS, Openness=0.9), None]
+
+    # The failed row is retried, the scored one is not
+    cache.get_or_compute(["new", "broken"], compute)
+    assert calls[-1] == ["broken"]
@@ -0,0 +1,65 @@
+import pandas as pd
+import pytest
+
+import score_csv
+from utils.streaming import LINKEDIN_COLUMNS
+
+class Crash(Exception):
+    pass
+
+def _score(texts):
+    return [{"Openness": len(text) / 100, "Neuroticism": text.count("a") / 10} for text in texts]
+
+def _crash_after(calls):
+    remaining = [calls]
+
+    def score(texts):
+        if remaining[0] == 0:
+            raise Crash()
+        remaining[0] -= 1
+        return _score(texts)
+    return score
+
+@pytest.fixture
+def profiles(tmp_path, monkeypatch):
+    monkeypatch.setattr(score_csv, "combine_texts",
+                        lambda chunk, columns: chunk[columns].fillna("").astype(str).agg(" ".join, axis=1).tolist())
+    rows = [{"name": f"user {i % 7}", **{column: f"{column} {i % 7}" for column in LINKEDIN_COLUMNS[1:]}}
+            for i in range(23)]
+    path = tmp_path / "profiles.csv"
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+def test_resume_after_crash_matches_a_clean_run(profiles, tmp_path):
+    expected_path = str(tmp_path / "expected.csv")
+    score_csv.score_csv(profiles, expected_path, checkpoint_every=5, batch_size=2, score_fn=_score)
+
+    output = str(tmp_path / "traits.csv")
+    with pytest.raises(Crash):
+        score_csv.score_csv(profiles, output, checkpoint_every=5, batch_size=2, score_fn=_crash_after(7))
+    assert score_csv.load_checkpoint(output, profiles)["rows_done"] == 10
+
+    stats = score_csv.score_csv(profiles, output, checkpoint_every=5, batch_size=2, score_fn=_score)
+    assert stats["rows"] == 13
+    with open(output, encoding="utf-8") as f, open(expected_path, encoding="utf-8") as g:
+        assert f.read() == g.read()
+
+def test_duplicate_texts_are_scored_once_per_block(profiles, tmp_path):
+    seen = []
+
+    def score(texts):
+        seen.extend(texts)
+        return _score(texts)
+
+    stats = score_csv.score_csv(profiles, str(tmp_path / "traits.csv"), checkpoint_every=23, score_fn=score)
+    assert len(seen) == len(set(seen)) == 7
+    assert stats["rows"] == 23
+    assert stats["dedup_saved"] == pytest.approx(1 - 7 / 23)
+
+def test_checkpoint_for_another_input_is_refused(profiles, tmp_path):
+    output = str(tmp_path / "traits.csv")
+    score_csv.score_csv(profiles, output, checkpoint_every=5, score_fn=_score)
+    other = tmp_path / "other.csv"
+    other.write_text("name\n", encoding="utf-8")
+    with pytest.raises(SystemExit):
+        score_csv.load_checkpoint(output, str(other))
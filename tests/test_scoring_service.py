@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from model.scoring_service import Coalescer, QueueFull, RemoteScorer, make_server
+
+class RecordingBatch:
+    def __init__(self, started=None, release=None):
+        self.calls = []
+        self.started = started
+        self.release = release
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        if self.started:
+            self.started.set()
+        if self.release:
+            self.release.wait(5)
+        return [text.upper() for text in texts]
+
+def test_splits_large_requests_into_max_batch_chunks():
+    batch_fn = RecordingBatch()
+    coalescer = Coalescer(batch_fn, max_batch=4, max_wait_ms=1)
+    texts = [f"t{i}" for i in range(10)]
+    assert coalescer.submit(texts).result(timeout=5) == [t.upper() for t in texts]
+    assert all(len(call) <= 4 for call in batch_fn.calls)
+    assert sum(batch_fn.calls, []) == texts
+
+def test_merges_concurrent_requests_without_exceeding_max_batch():
+    started, release = threading.Event(), threading.Event()
+    batch_fn = RecordingBatch(started, release)
+    coalescer = Coalescer(batch_fn, max_batch=4, max_wait_ms=50)
+    blocker = coalescer.submit(["block"])
+    assert started.wait(5)
+    futures = [coalescer.submit([f"a{i}", f"b{i}"]) for i in range(3)]
+    release.set()
+    assert blocker.result(timeout=5) == ["BLOCK"]
+    assert [f.result(timeout=5) for f in futures] == [[f"A{i}", f"B{i}"] for i in range(3)]
+    assert [len(call) for call in batch_fn.calls] == [1, 4, 2]
+
+def test_queue_limit_counts_chunks_and_cancel_drops_waiting_ones():
+    started, release = threading.Event(), threading.Event()
+    batch_fn = RecordingBatch(started, release)
+    coalescer = Coalescer(batch_fn, max_batch=2, max_wait_ms=1, max_queue=4)
+    coalescer.submit(["block"])
+    assert started.wait(5)
+    waiting = coalescer.submit(["a", "b", "c", "d", "e"])  # three chunks
+    with pytest.raises(QueueFull):
+        coalescer.submit(["f", "h", "i"])  # two more do not fit
+    assert waiting.cancel()
+    release.set()
+    assert coalescer.submit(["g"]).result(timeout=5) == ["G"]
+    assert batch_fn.calls == [["block"], ["g"]]
+
+def test_remote_scorer_sends_chunks_that_fit_the_server():
+    batch_fn = RecordingBatch()
+    server = make_server(port=0, max_batch=8, max_wait_ms=1, predict_fn=batch_fn, embed_fn=batch_fn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        scorer = RemoteScorer(f"http://127.0.0.1:{server.server_address[1]}", batch_size=5)
+        texts = [f"t{i}" for i in range(12)]
+        assert scorer.predict_batch(texts) == [t.upper() for t in texts]
+        assert [len(call) for call in batch_fn.calls] == [5, 5, 2]
+    finally:
+        server.shutdown()
+        server.server_close()
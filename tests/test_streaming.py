@@ -0,0 +1,9 @@
+import numpy as np
+import pandas as pd
+
+from utils import streaming
+
+def test_combine_texts_treats_missing_values_as_empty(monkeypatch):
+    monkeypatch.setattr(streaming, "clean_texts", list)
+    chunk = pd.DataFrame({"Description": ["demo", np.nan], "README": [np.nan, "# readme"], "Stars": [1, 2]})
+    assert streaming.combine_texts(chunk, ["Description", "README"]) == ["demo ", " # readme"]
@@ -0,0 +1,181 @@
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+
+# Every finished trace is appended here as JSONL when set
+TRACE_LOG = os.environ.get("TRACE_LOG")
+PROFILERS = ("Off", "cProfile", "Stack sampling")
+
+class Trace:
+    """
+    Timing spans recorded during one script run.
+
+    Spans nest: `depth` is the number of spans open when a span started.
+    Times are milliseconds from the start of the trace.
+    """
+
+    def __init__(self, name: str):
+        self.trace_id = uuid.uuid4().hex[:12]
+        self.name = name
+        self.started_at = time.time()
+        self._t0 = time.perf_counter()
+        self._depth = 0
+        self.spans = []
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        start = time.perf_counter()
+        depth = self._depth
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.spans.append({
+                "name": name,
+                "start_ms": (start - self._t0) * 1000,
+                "duration_ms": (time.perf_counter() - start) * 1000,
+                "depth": depth,
+                "attrs": attrs,
+            })
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+    def totals(self) -> dict:
+        """
+        Total milliseconds per span name, top-level spans only, in first-seen order.
+        """
+        totals = {}
+        for s in sorted(self.spans, key=lambda s: s["start_ms"]):
+            if s["depth"] == 0:
+                totals[s["name"]] = totals.get(s["name"], 0.0) + s["duration_ms"]
+        return totals
+
+    def to_jsonl(self) -> str:
+        header = {"trace_id": self.trace_id, "trace": self.name, "started_at": self.started_at}
+        return "".join(json.dumps({**header, **s}) + "\n" for s in sorted(self.spans, key=lambda s: s["start_ms"]))
+
+# Streamlit runs each session's script in its own thread, so the active
+# trace is per thread
+_local = threading.local()
+
+def start_trace(name: str) -> Trace:
+    _local.trace = Trace(name)
+    return _local.trace
+
+def current_trace():
+    return getattr(_local, "trace", None)
+
+def span(name: str, **attrs):
+    """
+    Time a block under the active trace; a no-op when no trace is active.
+    """
+    trace = current_trace()
+    return trace.span(name, **attrs) if trace is not None else nullcontext()
+
+def finish_trace(path: str = TRACE_LOG):
+    """
+    End the active trace, appending it to `path` as JSONL when given.
+    """
+    trace = current_trace()
+    _local.trace = None
+    if trace is not None and path and trace.spans:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(trace.to_jsonl())
+    return trace
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+class StackSampler:
+    """
+    Samples one thread's stack every `interval` seconds from a background
+    thread. `folded()` returns the counts in the collapsed-stack format that
+    `py-spy record --format raw`, speedscope and flamegraph.pl all read.
+    """
+
+    def __init__(self, thread_id: int = None, interval: float = 0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.counts.most_common())
+
+class RunProfiler:
+    """
+    Optional profiler for one script run: deterministic (cProfile) or sampling.
+    """
+
+    def __init__(self, kind: str):
+        if kind not in PROFILERS[1:]:
+            raise ValueError(f"Unknown profiler '{kind}'. Choose from: {', '.join(PROFILERS[1:])}")
+        self.kind = kind
+        self._profile = cProfile.Profile() if kind == "cProfile" else None
+        self._sampler = StackSampler() if kind == "Stack sampling" else None
+
+    def start(self):
+        if self._profile is not None:
+            self._profile.enable()
+        else:
+            self._sampler.start()
+
+    def stop(self):
+        if self._profile is not None:
+            self._profile.disable()
+        else:
+            self._sampler.stop()
+
+    def summary(self, limit: int = 20) -> str:
+        """
+        Top functions by cumulative time, or the hottest sampled stacks.
+        """
+        if self._profile is not None:
+            out = io.StringIO()
+            pstats.Stats(self._profile, stream=out).sort_stats("cumulative").print_stats(limit)
+            return out.getvalue()
+        return "".join(f"{count:6d}  {stack.rsplit(';', 1)[-1]}\n"
+                       for stack, count in self._sampler.counts.most_common(limit))
+
+    def export(self) -> tuple[str, bytes]:
+        """
+        (file name, contents) for download: a .prof file for snakeviz/pstats,
+        or folded stacks for speedscope/flamegraph.pl.
+        """
+        if self._profile is not None:
+            import marshal
+            self._profile.create_stats()
+            return "profile.prof", marshal.dumps(self._profile.stats)
+        return "profile.folded", self._sampler.folded().encode("utf-8")
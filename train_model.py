@@ -1,106 +1,213 @@
-from transformers import BertTokenizer, BertForSequenceClassification
-import torch
-import pandas as pd
-import numpy as np
-import joblib
-import nltk
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
-from sklearn.multioutput import MultiOutputRegressor
-from sklearn.metrics import mean_squared_error
-from sentence_transformers import SentenceTransformer
-import warnings
+import argparse
+import hashlib
+import json
 import os
-from model.predictor import predict_personality_batch  # Import from updated file
-from tqdm import tqdm
+import warnings
 
-# Download NLTK resources
-nltk.download("punkt")
-nltk.download("stopwords")
-nltk.download("wordnet")
+import numpy as np
+import pandas as pd
 
 warnings.filterwarnings("ignore")
 
-# Detect device
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-print(f"✅ Using device: {device}")
-
-# Load dataset
-print("📥 Loading dataset...")
-df = pd.read_csv("data/cleaned_texts.csv")  # Ensure this file exists
-
-if 'text' not in df.columns:
-    raise ValueError("The CSV must contain a 'text' column.")
-
-texts = df["text"].astype(str).tolist()
-if len(texts) == 0:
-    raise ValueError("No data found in 'text' column.")
-
-# Generate sentence embeddings
-print("🔄 Generating sentence embeddings...")
-embedder = SentenceTransformer("all-MiniLM-L6-v2", device=device.type)
-try:
-    embeddings = embedder.encode(texts, show_progress_bar=True)
-except Exception as e:
-    raise RuntimeError(f"Error during embedding generation: {e}")
-
-embeddings = np.array(embeddings)
-if embeddings.ndim != 2:
-    raise ValueError("Embeddings must be a 2D array.")
-
-# Generate pseudo labels using BERT model
-print("🔮 Generating pseudo labels...")
-trait_keys = ["Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]
-pseudo_labels = []
-valid_embeddings = []
-
-# Run batch predictions
-try:
-    all_trait_scores = predict_personality_batch(texts)
-except Exception as e:
-    raise RuntimeError(f"❌ Error during batched prediction: {e}")
-
-# Match predictions to embeddings with progress bar
-for idx, (traits, emb) in tqdm(enumerate(zip(all_trait_scores, embeddings)), total=len(all_trait_scores), desc="🔄 Matching pseudo labels"):
-    if not isinstance(emb, (np.ndarray, list)) or len(emb) == 0:
-        continue
-    try:
-        label_vector = [traits[k] for k in trait_keys]
-        pseudo_labels.append(label_vector)
-        valid_embeddings.append(emb)
-    except Exception as e:
-        print(f"⚠️ Error at index {idx}: {e}")
-
-# Prepare data for training
-X = np.array(valid_embeddings)
-y = np.array(pseudo_labels)
-
-print("✅ Data ready for training.")
-print("🔢 Feature shape (X):", X.shape)
-print("🔢 Target shape (y):", y.shape)
-
-if len(X) == 0 or len(y) == 0:
-    raise ValueError("❌ No valid training data available.")
-
-# Split dataset
-print("📊 Splitting dataset...")
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
-
-print("🎯 Training model...")
-base_model = RandomForestRegressor(n_estimators=100, random_state=42)
-regression_model = MultiOutputRegressor(base_model)
-
-# Simulate training progress
-for i in tqdm(range(1), desc="🏋️ Training model"):  # Just to visualize progress (since `.fit` is not iterable)
-    regression_model.fit(X_train, y_train)
-
-# Evaluate model
-print("📈 Evaluating model...")
-y_pred = regression_model.predict(X_test)
-mse = mean_squared_error(y_test, y_pred)
-print(f"✅ Mean Squared Error: {mse:.4f}")
-
-# Save model
-os.makedirs("model", exist_ok=True)
-joblib.dump(regression_model, "model/personality_model.pkl")
-print("💾 Model saved to model/personality_model.pkl")
\ No newline at end of file
+DATA_PATH = "data/cleaned_texts.csv"
+EMBEDDER_NAME = "all-MiniLM-L6-v2"
+PRECOMPUTED_EMBEDDINGS = "bert_embeddings.npy"
+STAGE_DIR = os.environ.get("TRAIN_CACHE_DIR", os.path.join(".cache", "train"))
+MODEL_OUT = "model/personality_model.pkl"
+TRAIT_KEYS = ["Openness", "Conscientiousness", "Extraversion", "Agreeableness", "Neuroticism"]
+
+def file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def stage_key(*parts) -> str:
+    """
+    Artifact key from the keys of a stage's inputs and its own settings, so a
+    change anywhere upstream makes every later stage stale.
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()[:16]
+
+def _save(path: str, value, kind: str):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    if kind == "npy":
+        with open(tmp_path, "wb") as f:
+            np.save(f, np.ascontiguousarray(value))
+    elif kind == "json":
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(value, f)
+    else:
+        import joblib
+        joblib.dump(value, tmp_path)
+    os.replace(tmp_path, path)
+
+def _load(path: str, kind: str):
+    if kind == "npy":
+        return np.load(path, mmap_mode="r")
+    if kind == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    import joblib
+    return joblib.load(path)
+
+def run_stage(name: str, key: str, compute, kind: str = "npy", stage_dir: str = STAGE_DIR):
+    """
+    Return the artifact of `name` for `key`, computing and storing it only
+    when it is missing. Arrays come back memory-mapped from .npy files.
+    """
+    path = os.path.join(stage_dir, f"{name}-{key}.{kind}")
+    if os.path.exists(path):
+        print(f"♻️ {name}: up to date ({os.path.basename(path)})")
+    else:
+        print(f"🔄 {name}...")
+        _save(path, compute(), kind)
+    return _load(path, kind)
+
+def clean_stage(csv_path: str) -> tuple[list[str], str]:
+    key = stage_key("clean", file_hash(csv_path))
+
+    def compute():
+        from utils.preprocess import clean_texts
+        df = pd.read_csv(csv_path)
+        if 'text' not in df.columns:
+            raise ValueError("The CSV must contain a 'text' column.")
+        texts = clean_texts(df["text"].fillna("").astype(str))
+        if len(texts) == 0:
+            raise ValueError("No data found in 'text' column.")
+        return texts
+
+    return run_stage("clean", key, compute, kind="json"), key
+
+def _matches_texts(matrix, texts: list[str], embedder, sample: int = 8, tolerance: float = 1e-3) -> bool:
+    """
+    Re-embed a few evenly spaced texts and check they equal the matrix rows,
+    so a matrix computed on other (e.g. raw) text is not mistaken for ours.
+    """
+    rows = np.unique(np.linspace(0, len(texts) - 1, min(sample, len(texts))).astype(int))
+    expected = embedder.encode([texts[i] for i in rows], convert_to_numpy=True)
+    return np.allclose(np.asarray(matrix[rows], dtype=np.float32), expected, atol=tolerance)
+
+def embed_stage(texts: list[str], clean_key: str, embedder_name: str = EMBEDDER_NAME,
+                precomputed: str = PRECOMPUTED_EMBEDDINGS) -> tuple[np.ndarray, str]:
+    """
+    MiniLM embeddings of the cleaned texts. A precomputed matrix is reused
+    only when it has one row per text and a sample of its rows re-embeds to
+    the same vectors; its content hash is part of the stage key.
+    """
+    use_precomputed = bool(precomputed) and os.path.exists(precomputed)
+    key = stage_key("embed", clean_key, embedder_name, file_hash(precomputed) if use_precomputed else None)
+
+    def compute():
+        import torch
+        from sentence_transformers import SentenceTransformer
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        print(f"✅ Using device: {device}")
+        embedder = SentenceTransformer(embedder_name, device=device)
+
+        if use_precomputed:
+            matrix = np.load(precomputed, mmap_mode="r")
+            if matrix.ndim != 2 or matrix.shape != (len(texts), embedder.get_sentence_embedding_dimension()):
+                print(f"⚠️ Ignoring {precomputed}: shape {matrix.shape} for {len(texts)} texts")
+            elif not _matches_texts(matrix, texts, embedder):
+                print(f"⚠️ Ignoring {precomputed}: its rows were not computed from these cleaned texts")
+            else:
+                print(f"📎 Reusing {precomputed} ({matrix.shape[0]} x {matrix.shape[1]})")
+                return np.asarray(matrix, dtype=np.float32)
+
+        embeddings = np.asarray(embedder.encode(texts, show_progress_bar=True, convert_to_numpy=True), dtype=np.float32)
+        if embeddings.ndim != 2:
+            raise ValueError("Embeddings must be a 2D array.")
+        return embeddings
+
+    return run_stage("embed", key, compute), key
+
+def label_stage(texts: list[str], clean_key: str) -> tuple[np.ndarray, str]:
+    """
+    Pseudo labels: the BERT classifier's five trait scores per text.
+    Keyed by the model revision too, so new weights under the same id relabel.
+    """
+    from model import predictor
+    key = stage_key("label", clean_key, predictor.model_identifier(), predictor.get_model_revision())
+
+    def compute():
+        scores = predictor.predict_personality_batch(texts)
+        return np.array([[traits[k] for k in TRAIT_KEYS] for traits in scores], dtype=np.float32)
+
+    return run_stage("label", key, compute), key
+
+def split_stage(n_rows: int, test_size: float = 0.2, seed: int = 42) -> tuple[dict, str]:
+    key = stage_key("split", n_rows, test_size, seed)
+
+    def compute():
+        from sklearn.model_selection import train_test_split
+        train_idx, test_idx = train_test_split(np.arange(n_rows), test_size=test_size, random_state=seed)
+        return {"train": train_idx.tolist(), "test": test_idx.tolist()}
+
+    return run_stage("split", key, compute, kind="json"), key
+
+def fit_stage(X, y, split: dict, input_key: str, n_estimators: int = 100, seed: int = 42):
+    key = stage_key("fit", input_key, "RandomForestRegressor", n_estimators, seed)
+
+    def compute():
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.multioutput import MultiOutputRegressor
+        regression_model = MultiOutputRegressor(RandomForestRegressor(n_estimators=n_estimators, random_state=seed, n_jobs=-1))
+        regression_model.fit(X[split["train"]], y[split["train"]])
+        return regression_model
+
+    return run_stage("fit", key, compute, kind="pkl"), key
+
+def evaluate_stage(model, X, y, split: dict, fit_key: str) -> dict:
+    key = stage_key("evaluate", fit_key)
+
+    def compute():
+        from sklearn.metrics import mean_squared_error
+        y_test = y[split["test"]]
+        y_pred = model.predict(X[split["test"]])
+        return {
+            "mse": float(mean_squared_error(y_test, y_pred)),
+            "mse_per_trait": dict(zip(TRAIT_KEYS, mean_squared_error(y_test, y_pred, multioutput="raw_values").tolist())),
+        }
+
+    return run_stage("evaluate", key, compute, kind="json")
+
+def prepare_data(csv_path: str = DATA_PATH, embedder_name: str = EMBEDDER_NAME,
+                 precomputed: str = PRECOMPUTED_EMBEDDINGS, test_size: float = 0.2, seed: int = 42) -> dict:
+    """
+    Run (or reuse) the clean, embed, pseudo-label and split stages.
+    """
+    texts, clean_key = clean_stage(csv_path)
+    X, embed_key = embed_stage(texts, clean_key, embedder_name, precomputed)
+    y, label_key = label_stage(texts, clean_key)
+    split, split_key = split_stage(len(texts), test_size, seed)
+    return {"texts": texts, "X": X, "y": y, "split": split, "key": stage_key(embed_key, label_key, split_key)}
+
+# Train the embedding -> traits regressor; unchanged stages are reused from .cache/train
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the personality regression head with cached stages.")
+    parser.add_argument("--csv", default=DATA_PATH)
+    parser.add_argument("--embedder", default=EMBEDDER_NAME)
+    parser.add_argument("--precomputed-embeddings", default=PRECOMPUTED_EMBEDDINGS,
+                        help="Embedding matrix to reuse if it has one row per text ('' to disable)")
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--output", default=MODEL_OUT)
+    args = parser.parse_args()
+
+    data = prepare_data(args.csv, args.embedder, args.precomputed_embeddings)
+    print("🔢 Feature shape (X):", data["X"].shape)
+    print("🔢 Target shape (y):", data["y"].shape)
+
+    regression_model, fit_key = fit_stage(data["X"], data["y"], data["split"], data["key"], args.n_estimators)
+    report = evaluate_stage(regression_model, data["X"], data["y"], data["split"], fit_key)
+    print(f"✅ Mean Squared Error: {report['mse']:.4f}")
+
+    import joblib
+    os.makedirs(os.path.dirname(args.output) or ".", exist_ok=True)
+    joblib.dump(regression_model, args.output)
+    print(f"💾 Model saved to {args.output}")
+
+    from model.head_export import refresh_export
+    refresh_export(regression_model)
@@ -1,17 +1,16 @@
-# -*- coding: utf-8 -*-
-"""webscrapinggithub.ipynb
-
-Automatically generated by Colab.
-
-Original file is located at
-    https://colab.research.google.com/drive/1-r3Qp_4SFiOQ7hcQOn5S69DbsUKsvAq8
-"""
-
 import requests
 import base64
 import time
 import json
 import csv
+import threading
+import os
+import hashlib
+import sqlite3
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 
 # GitHub authentication
 GITHUB_TOKEN = ''  # Replace with your token
@@ -20,31 +19,210 @@ HEADERS = {
     'Accept': 'application/vnd.github+json'
 }
 
-# Search GitHub users by location
-def search_users_by_location(location='Pakistan', per_page=30):
-    url = f'https://api.github.com/search/users?q=location:{location}&per_page={per_page}'
-    response = requests.get(url, headers=HEADERS)
+# API endpoints; point them at github_stub_server.py to replay recorded responses offline
+API_URL = os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+GRAPHQL_URL = os.environ.get('GITHUB_GRAPHQL_URL', f'{API_URL}/graphql')
+
+# Requests actually sent, by API, so REST and GraphQL runs can be compared
+REQUEST_COUNTS = {'rest': 0, 'graphql': 0}
+_count_lock = threading.Lock()
+
+def _count_request(api):
+    with _count_lock:
+        REQUEST_COUNTS[api] += 1
+
+# Shared keep-alive session, with enough pooled connections for the concurrent collector
+MAX_WORKERS = 8
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=MAX_WORKERS * 4))
+
+# Quota tracker driven by GitHub's X-RateLimit-Remaining / X-RateLimit-Reset headers.
+# Calls go out immediately while the remaining quota covers every call waiting for it;
+# only when it can't are the rest spread evenly until the reset, and an exhausted
+# quota waits for the reset. Until the first response arrives it allows `initial`
+# calls at once, then 1 request/second.
+class RateLimiter:
+    def __init__(self, initial=10):
+        self.initial = initial
+        self.remaining = initial
+        self.reset_at = None  # epoch seconds, from X-RateLimit-Reset
+        self.waiting = 0
+        self.next_slot = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            self.waiting += 1
+        try:
+            while True:
+                with self.lock:
+                    now = time.time()
+                    if self.reset_at is not None and now >= self.reset_at:
+                        # New window; the next response reports the real quota
+                        self.remaining = max(self.remaining, self.initial)
+                        self.reset_at = None
+                    if self.remaining >= self.waiting:
+                        self.remaining -= 1
+                        return
+                    if self.reset_at is None:
+                        interval = 1.0  # quota unknown until a response reports it
+                    elif self.remaining > 0:
+                        interval = (self.reset_at - now) / self.remaining
+                    else:
+                        interval = None
+                    if interval is None:
+                        wait = self.reset_at - now + 1
+                    elif now >= self.next_slot:
+                        self.next_slot = now + interval
+                        self.remaining = max(self.remaining - 1, 0)
+                        return
+                    else:
+                        wait = self.next_slot - now
+                time.sleep(wait)
+        finally:
+            with self.lock:
+                self.waiting -= 1
+
+    def update(self, headers):
+        remaining = headers.get('X-RateLimit-Remaining')
+        reset = headers.get('X-RateLimit-Reset')
+        if remaining is None or reset is None:
+            return
+        remaining, reset = int(remaining), float(reset)
+        with self.lock:
+            if self.reset_at is None or reset > self.reset_at:
+                self.remaining = remaining
+                self.reset_at = reset
+            else:
+                # Same window: calls still in flight were already taken off locally
+                self.remaining = min(self.remaining, remaining)
+
+# Search, core REST and GraphQL have separate quotas
+LIMITERS = {'core': RateLimiter(), 'search': RateLimiter(), 'graphql': RateLimiter()}
+
+def _resource(url):
+    if '/search/' in url:
+        return 'search'
+    if url.endswith('/graphql'):
+        return 'graphql'
+    return 'core'
+
+# On-disk conditional-request cache. Bodies are stored with their ETag / Last-Modified
+# and revalidated with If-None-Match / If-Modified-Since; a 304 is answered from disk
+# (and does not count against GitHub's quota).
+class HttpCache:
+    def __init__(self, path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.lock = threading.Lock()
+        os.makedirs(path, exist_ok=True)
+
+    def _file(self, url):
+        return os.path.join(self.path, hashlib.sha256(url.encode('utf-8')).hexdigest() + '.json')
+
+    def load(self, url):
+        try:
+            with open(self._file(url), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def store(self, url, response):
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        with self.lock:
+            self.misses += 1
+        if response.status_code != 200 or not (etag or last_modified):
+            return
+        entry = {'url': url, 'etag': etag, 'last_modified': last_modified,
+                 'content_type': response.headers.get('Content-Type'), 'body': response.text}
+        tmp_path = self._file(url) + f'.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_path, self._file(url))
+
+    def replay(self, entry, not_modified):
+        body = entry['body'].encode('utf-8')
+        with self.lock:
+            self.hits += 1
+            self.bytes_saved += len(body)
+        response = requests.Response()
+        response.status_code = 200
+        response._content = body
+        response.encoding = 'utf-8'
+        response.url = entry['url']
+        response.headers = CaseInsensitiveDict(not_modified.headers)
+        if entry.get('content_type'):
+            response.headers['Content-Type'] = entry['content_type']
+        return response
+
+    def summary(self):
+        total = self.hits + self.misses
+        rate = self.hits / total if total else 0.0
+        return (f"🗄️ HTTP cache: {self.hits} hits, {self.misses} misses ({rate:.0%} hit rate), "
+                f"{self.bytes_saved / 1024:.1f} KiB not re-downloaded")
+
+HTTP_CACHE = HttpCache(os.environ.get('GITHUB_HTTP_CACHE', os.path.join('.cache', 'github_http')))
+
+# Rate-limited, cache-revalidated GET through the shared session;
+# waits out an exhausted quota and retries
+def github_get(url, retries=3):
+    limiter = LIMITERS[_resource(url)]
+    entry = HTTP_CACHE.load(url)
+    for attempt in range(retries):
+        limiter.acquire()
+        _count_request('rest')
+        response = SESSION.get(url, headers=HTTP_CACHE.conditional_headers(entry), timeout=30)
+        limiter.update(response.headers)
+        if response.status_code == 304 and entry:
+            return HTTP_CACHE.replay(entry, response)
+        if response.status_code in (403, 429) and attempt < retries - 1:
+            if response.headers.get('Retry-After'):
+                time.sleep(int(response.headers['Retry-After']))
+                continue
+            if response.headers.get('X-RateLimit-Remaining') == '0':
+                time.sleep(max(float(response.headers['X-RateLimit-Reset']) - time.time(), 0) + 1)
+                continue
+        HTTP_CACHE.store(url, response)
+        return response
+    return response
+
+# Search GitHub users by location with pagination
+def search_users_by_location(location='Pakistan', per_page=30, page=1):
+    url = f'{API_URL}/search/users?q=location:{location}&per_page={per_page}&page={page}'
+    response = github_get(url)
     response.raise_for_status()
     return response.json().get('items', [])
 
 # Get basic user profile
 def get_user_details(username):
-    url = f'https://api.github.com/users/{username}'
-    response = requests.get(url, headers=HEADERS)
+    url = f'{API_URL}/users/{username}'
+    response = github_get(url)
     response.raise_for_status()
     return response.json()
 
 # Get user repositories
 def get_user_repos(username):
-    url = f'https://api.github.com/users/{username}/repos?per_page=100&sort=updated'
-    response = requests.get(url, headers=HEADERS)
+    url = f'{API_URL}/users/{username}/repos?per_page=100&sort=updated'
+    response = github_get(url)
     response.raise_for_status()
     return response.json()
 
 # Get the latest commit message from a repository
 def get_latest_commit(username, repo_name):
-    url = f'https://api.github.com/repos/{username}/{repo_name}/commits?per_page=1'
-    response = requests.get(url, headers=HEADERS)
+    url = f'{API_URL}/repos/{username}/{repo_name}/commits?per_page=1'
+    response = github_get(url)
     if response.status_code == 200:
         commits = response.json()
         if isinstance(commits, list) and commits:
@@ -53,16 +231,16 @@ def get_latest_commit(username, repo_name):
 
 # Get programming languages used in a repository
 def get_languages(username, repo_name):
-    url = f'https://api.github.com/repos/{username}/{repo_name}/languages'
-    response = requests.get(url, headers=HEADERS)
+    url = f'{API_URL}/repos/{username}/{repo_name}/languages'
+    response = github_get(url)
     if response.status_code == 200:
         return list(response.json().keys())
     return []
 
 # Get README content for a repository
 def get_readme(username, repo_name):
-    url = f'https://api.github.com/repos/{username}/{repo_name}/readme'
-    response = requests.get(url, headers=HEADERS)
+    url = f'{API_URL}/repos/{username}/{repo_name}/readme'
+    response = github_get(url)
     if response.status_code == 200:
         content = response.json().get('content')
         if content:
@@ -72,240 +250,238 @@ def get_readme(username, repo_name):
                 return "Error decoding README"
     return None
 
-# Collect complete profile data
-def collect_data(users):
-    profiles = []
+# Collect one user's profile; with a thread pool the per-repo calls run in parallel
+def collect_user(username, pool=None):
+    print(f'🔍 Collecting data for {username}...')
+    try:
+        details = get_user_details(username)
+        repos = get_user_repos(username)
+    except Exception as e:
+        print(f"❌ Error fetching data for {username}: {e}")
+        return None
+
+    repos = repos[:3]  # Limit to 3 repos per user to avoid rate limits
+    calls = (get_latest_commit, get_languages, get_readme)
+    if pool is None:
+        fetched = [[call(username, repo['name']) for call in calls] for repo in repos]
+    else:
+        futures = [[pool.submit(call, username, repo['name']) for call in calls] for repo in repos]
+        fetched = [[f.result() for f in repo_futures] for repo_futures in futures]
+
+    user_repos = []
+    for repo, (commit_msg, languages, readme) in zip(repos, fetched):
+        user_repos.append({
+            'repo_name': repo['name'],
+            'description': repo.get('description'),
+            'languages': languages,
+            'latest_commit': commit_msg,
+            'readme': readme
+        })
 
+    return {
+        'username': username,
+        'name': details.get('name'),
+        'followers': details.get('followers'),
+        'following': details.get('following'),
+        'public_repos': details.get('public_repos'),
+        'repos': user_repos
+    }
+
+def _unique_usernames(users):
+    seen_usernames = set()
+    usernames = []
     for user in users:
         username = user['login']
-        print(f'🔍 Collecting data for {username}...')
-        try:
-            details = get_user_details(username)
-            repos = get_user_repos(username)
-        except Exception as e:
-            print(f"❌ Error fetching data for {username}: {e}")
-            continue
-
-        user_repos = []
-        for repo in repos[:3]:  # Limit to 3 repos per user to avoid rate limits
-            repo_name = repo['name']
-            description = repo.get('description')
-            commit_msg = get_latest_commit(username, repo_name)
-            languages = get_languages(username, repo_name)
-            readme = get_readme(username, repo_name)
-
-            user_repos.append({
-                'repo_name': repo_name,
-                'description': description,
-                'languages': languages,
-                'latest_commit': commit_msg,
-                'readme': readme
-            })
-            time.sleep(1)  # To respect API rate limits
-
-        profiles.append({
-            'username': username,
-            'name': details.get('name'),
-            'followers': details.get('followers'),
-            'following': details.get('following'),
-            'public_repos': details.get('public_repos'),
-            'repos': user_repos
-        })
-        time.sleep(1)
+        if username not in seen_usernames:
+            seen_usernames.add(username)
+            usernames.append(username)
+    return usernames
 
+# Collect complete profile data; on_profile is called as soon as each profile is ready
+def collect_data(users, on_profile=None):
+    profiles = []
+    for username in _unique_usernames(users):
+        profile = collect_user(username)
+        if profile is not None:
+            profiles.append(profile)
+            if on_profile:
+                on_profile(profile)
     return profiles
 
-# Main execution
-if __name__ == '__main__':
-    try:
-        users = search_users_by_location('Pakistan', per_page=30)
-        results = collect_data(users)
-
-        # Save to JSON
-        with open('github_profiles_pakistan.json', 'w', encoding='utf-8') as f_json:
-            json.dump(results, f_json, ensure_ascii=False, indent=4)
-        print("✅ Data saved to 'github_profiles_pakistan.json'")
-
-        # Save to CSV
-        with open('github_profiles_pakistan.csv', 'w', newline='', encoding='utf-8') as f_csv:
-            writer = csv.writer(f_csv)
-            writer.writerow(['Username', 'Name', 'Followers', 'Following', 'Public Repos',
-                             'Repo Name', 'Description', 'Languages', 'Latest Commit', 'README'])
-
-            for profile in results:
-                for repo in profile['repos']:
-                    writer.writerow([
-                        profile['username'],
-                        profile.get('name', ''),
-                        profile.get('followers', ''),
-                        profile.get('following', ''),
-                        profile.get('public_repos', ''),
-                        repo.get('repo_name', ''),
-                        repo.get('description', ''),
-                        ', '.join(repo.get('languages', [])),
-                        repo.get('latest_commit', ''),
-                        (repo['readme'][:100] + '...') if repo['readme'] else 'No README'
-                    ])
-        print("✅ Data saved to 'github_profiles_pakistan.csv'")
-
-    except Exception as e:
-        print(f"❌ Fatal error: {e}")
-
-import requests
-import base64
-import time
-import json
-import csv
-
-# GitHub authentication
-GITHUB_TOKEN = ''  # Replace with your token
-HEADERS = {
-    'Authorization': f'token {GITHUB_TOKEN}',
-    'Accept': 'application/vnd.github+json'
+# One GraphQL page: each user is an aliased field, with their 3 most recently updated
+# repos, languages by size, default-branch head commit and README blob inlined
+README_PATHS = ('README.md', 'README', 'readme.md', 'README.rst', 'README.txt')
+
+PROFILE_FRAGMENT = """
+fragment ProfileFields on User {
+  login
+  name
+  followers { totalCount }
+  following { totalCount }
+  repositories(privacy: PUBLIC, ownerAffiliations: OWNER) { totalCount }
+  recent: repositories(first: 3, ownerAffiliations: OWNER, orderBy: {field: UPDATED_AT, direction: DESC}) {
+    nodes {
+      name
+      description
+      languages(first: 100, orderBy: {field: SIZE, direction: DESC}) { nodes { name } }
+      defaultBranchRef { target { ... on Commit { message } } }
+%s
+    }
+  }
 }
-
-# Search GitHub users by location with pagination
-def search_users_by_location(location='Pakistan', per_page=30, page=1):
-    url = f'https://api.github.com/search/users?q=location:{location}&per_page={per_page}&page={page}'
-    response = requests.get(url, headers=HEADERS)
+""" % '\n'.join(f'      readme{i}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+               for i, path in enumerate(README_PATHS))
+
+def profiles_query(usernames):
+    fields = ' '.join(f'u{i}: user(login: {json.dumps(username)}) {{ ...ProfileFields }}'
+                      for i, username in enumerate(usernames))
+    return f'query {{ {fields} }}' + PROFILE_FRAGMENT
+
+def github_graphql(query):
+    LIMITERS['graphql'].acquire()
+    _count_request('graphql')
+    response = SESSION.post(GRAPHQL_URL, json={'query': query}, timeout=60)
+    LIMITERS['graphql'].update(response.headers)
     response.raise_for_status()
-    return response.json().get('items', [])
-
-# Get basic user profile
-def get_user_details(username):
-    url = f'https://api.github.com/users/{username}'
-    response = requests.get(url, headers=HEADERS)
-    response.raise_for_status()
-    return response.json()
-
-# Get user repositories
-def get_user_repos(username):
-    url = f'https://api.github.com/users/{username}/repos?per_page=100&sort=updated'
-    response = requests.get(url, headers=HEADERS)
-    response.raise_for_status()
-    return response.json()
-
-# Get the latest commit message from a repository
-def get_latest_commit(username, repo_name):
-    url = f'https://api.github.com/repos/{username}/{repo_name}/commits?per_page=1'
-    response = requests.get(url, headers=HEADERS)
-    if response.status_code == 200:
-        commits = response.json()
-        if isinstance(commits, list) and commits:
-            return commits[0]['commit']['message']
-    return None
-
-# Get programming languages used in a repository
-def get_languages(username, repo_name):
-    url = f'https://api.github.com/repos/{username}/{repo_name}/languages'
-    response = requests.get(url, headers=HEADERS)
-    if response.status_code == 200:
-        return list(response.json().keys())
-    return []
-
-# Get README content for a repository
-def get_readme(username, repo_name):
-    url = f'https://api.github.com/repos/{username}/{repo_name}/readme'
-    response = requests.get(url, headers=HEADERS)
-    if response.status_code == 200:
-        content = response.json().get('content')
-        if content:
-            try:
-                return base64.b64decode(content).decode('utf-8', errors='ignore')
-            except Exception:
-                return "Error decoding README"
-    return None
-
-# Collect complete profile data
-def collect_data(users):
+    body = response.json()
+    for error in body.get('errors') or []:
+        print(f"⚠️ GraphQL: {error.get('message')}")
+    return body.get('data') or {}
+
+# Map a GraphQL user node to the same dict collect_user builds from REST
+def profile_from_graphql(username, node):
+    user_repos = []
+    for repo in node['recent']['nodes']:
+        branch = repo.get('defaultBranchRef') or {}
+        readme = next((repo[f'readme{i}']['text'] for i in range(len(README_PATHS))
+                       if repo.get(f'readme{i}') and repo[f'readme{i}'].get('text') is not None), None)
+        user_repos.append({
+            'repo_name': repo['name'],
+            'description': repo.get('description'),
+            'languages': [lang['name'] for lang in repo['languages']['nodes']],
+            'latest_commit': (branch.get('target') or {}).get('message'),
+            'readme': readme
+        })
+    return {
+        'username': username,
+        'name': node.get('name'),
+        'followers': node['followers']['totalCount'],
+        'following': node['following']['totalCount'],
+        'public_repos': node['repositories']['totalCount'],
+        'repos': user_repos
+    }
+
+# Same profile structure as collect_data, using one batched GraphQL query per page of users
+def collect_data_graphql(users, page_size=10, on_profile=None):
+    usernames = _unique_usernames(users)
     profiles = []
-    seen_usernames = set()
-
-    for user in users:
-        username = user['login']
-        if username in seen_usernames:
-            continue
-        seen_usernames.add(username)
-
-        print(f'🔍 Collecting data for {username}...')
+    for start in range(0, len(usernames), page_size):
+        page = usernames[start:start + page_size]
+        print(f'🔍 Collecting data for {", ".join(page)}...')
         try:
-            details = get_user_details(username)
-            repos = get_user_repos(username)
+            data = github_graphql(profiles_query(page))
         except Exception as e:
-            print(f"❌ Error fetching data for {username}: {e}")
+            print(f"❌ Error fetching data for page starting at {page[0]}: {e}")
             continue
-
-        user_repos = []
-        for repo in repos[:3]:  # Limit to 3 repos per user to avoid rate limits
-            repo_name = repo['name']
-            description = repo.get('description')
-            commit_msg = get_latest_commit(username, repo_name)
-            languages = get_languages(username, repo_name)
-            readme = get_readme(username, repo_name)
-
-            user_repos.append({
-                'repo_name': repo_name,
-                'description': description,
-                'languages': languages,
-                'latest_commit': commit_msg,
-                'readme': readme
-            })
-            time.sleep(1)  # To respect API rate limits
-
-        profiles.append({
-            'username': username,
-            'name': details.get('name'),
-            'followers': details.get('followers'),
-            'following': details.get('following'),
-            'public_repos': details.get('public_repos'),
-            'repos': user_repos
-        })
-        time.sleep(1)
-
+        for i, username in enumerate(page):
+            node = data.get(f'u{i}')
+            if node is None:
+                print(f"❌ Error fetching data for {username}: not returned")
+                continue
+            profile = profile_from_graphql(username, node)
+            profiles.append(profile)
+            if on_profile:
+                on_profile(profile)
     return profiles
 
-if __name__ == '__main__':
-    try:
-        # Load existing usernames
-        existing_usernames = set()
-        existing_data = []
-        try:
-            with open('github_profiles_pakistan.json', 'r', encoding='utf-8') as f_json:
-                existing_data = json.load(f_json)
-                existing_usernames = {user['username'] for user in existing_data}
-            print(f"📁 Loaded {len(existing_usernames)} existing users.")
-        except FileNotFoundError:
-            print("📂 No existing data found. Starting fresh.")
-
-        all_users = []
-        total_pages = 5  # You can adjust this to fetch more users
-
-        for page in range(1, total_pages + 1):
-            print(f'📄 Fetching users from page {page}...')
-            page_users = search_users_by_location('Pakistan', per_page=30, page=page)
-            for user in page_users:
-                if user['login'] not in existing_usernames:
-                    all_users.append(user)
-            time.sleep(2)
-
-        if not all_users:
-            print("✅ No new users found.")
-            exit()
-
-        print(f"🆕 {len(all_users)} new users found.")
-
-        new_results = collect_data(all_users)
-
-        # Append to JSON
-        with open('github_profiles_pakistan.json', 'w', encoding='utf-8') as f_json:
-            updated_data = existing_data + new_results
-            json.dump(updated_data, f_json, ensure_ascii=False, indent=4)
-        print("✅ JSON file updated with new users.")
-
-        # Append to CSV
-        with open('github_profiles_pakistan.csv', 'a', newline='', encoding='utf-8') as f_csv:
+# Requests the REST collector would need for the same profiles: details + repos + 3 per repo
+def rest_request_estimate(profiles):
+    return sum(2 + 3 * len(profile['repos']) for profile in profiles)
+
+# Same output as collect_data, but users and their per-repo calls are fetched concurrently
+def collect_data_concurrent(users, max_workers=MAX_WORKERS, on_profile=None):
+    usernames = _unique_usernames(users)
+
+    def collect(username):
+        profile = collect_user(username, repo_pool)
+        if profile is not None and on_profile:
+            on_profile(profile)
+        return profile
+
+    # Repo calls get their own pool so user workers never wait on a slot they hold
+    with ThreadPoolExecutor(max_workers=max_workers * 3) as repo_pool, \
+            ThreadPoolExecutor(max_workers=max_workers) as user_pool:
+        profiles = list(user_pool.map(collect, usernames))
+    return [profile for profile in profiles if profile is not None]
+
+# Durable, append-only profile store. Every fetch is a new row committed on its own, keyed by
+# username with a fetched_at timestamp, so a crash loses at most the users still in flight.
+# `compact` drops superseded fetches; the CSV is always exported from the store.
+STORE_PATH = 'github_profiles_pakistan.sqlite'
+CSV_COLUMNS = ['Username', 'Name', 'Followers', 'Following', 'Public Repos',
+               'Repo Name', 'Description', 'Languages', 'Latest Commit', 'README']
+
+class ProfileStore:
+    def __init__(self, path=STORE_PATH):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('CREATE TABLE IF NOT EXISTS profiles ('
+                          'id INTEGER PRIMARY KEY AUTOINCREMENT, username TEXT NOT NULL, '
+                          'fetched_at REAL NOT NULL, data TEXT NOT NULL)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS profiles_username ON profiles (username, id)')
+        self.conn.commit()
+        # In-memory set for O(1) "already seen" checks
+        self.seen = {row[0] for row in self.conn.execute('SELECT DISTINCT username FROM profiles')}
+
+    def __len__(self):
+        return len(self.seen)
+
+    def has(self, username):
+        return username in self.seen
+
+    def add(self, profile, fetched_at=None):
+        with self.lock, self.conn:
+            self.conn.execute('INSERT INTO profiles (username, fetched_at, data) VALUES (?, ?, ?)',
+                              (profile['username'], fetched_at or time.time(),
+                               json.dumps(profile, ensure_ascii=False)))
+            self.seen.add(profile['username'])
+
+    # Latest fetch of every user, in the order users were first stored
+    def latest(self):
+        rows = self.conn.execute(
+            'SELECT p.data FROM profiles p '
+            'JOIN (SELECT username, MIN(id) AS first_id, MAX(id) AS last_id FROM profiles GROUP BY username) g '
+            'ON p.id = g.last_id ORDER BY g.first_id')
+        for (data,) in rows:
+            yield json.loads(data)
+
+    def compact(self):
+        with self.lock:
+            with self.conn:
+                removed = self.conn.execute(
+                    'DELETE FROM profiles WHERE id NOT IN (SELECT MAX(id) FROM profiles GROUP BY username)').rowcount
+            self.conn.execute('VACUUM')
+        return removed
+
+    def import_json(self, path):
+        with open(path, 'r', encoding='utf-8') as f_json:
+            profiles = json.load(f_json)
+        fetched_at = os.path.getmtime(path)
+        with self.lock, self.conn:
+            for profile in profiles:
+                if profile['username'] not in self.seen:
+                    self.conn.execute('INSERT INTO profiles (username, fetched_at, data) VALUES (?, ?, ?)',
+                                      (profile['username'], fetched_at, json.dumps(profile, ensure_ascii=False)))
+                    self.seen.add(profile['username'])
+        return len(profiles)
+
+    def export_csv(self, path):
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', newline='', encoding='utf-8') as f_csv:
             writer = csv.writer(f_csv)
-            for profile in new_results:
+            writer.writerow(CSV_COLUMNS)
+            for profile in self.latest():
                 for repo in profile['repos']:
                     writer.writerow([
                         profile['username'],
@@ -319,17 +495,62 @@ if __name__ == '__main__':
                         repo.get('latest_commit', ''),
                         (repo['readme'][:100] + '...') if repo['readme'] else 'No README'
                     ])
-        print("✅ CSV file updated with new users.")
-
-    except Exception as e:
-        print(f"❌ Fatal error: {e}")
+        os.replace(tmp_path, path)
 
-df.info()
-
-import pandas as pd
-import re
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Collect GitHub profiles into the profile store.')
+    parser.add_argument('command', nargs='?', default='collect', choices=['collect', 'compact', 'export', 'import-json'])
+    parser.add_argument('--store', default=STORE_PATH)
+    parser.add_argument('--json', default='github_profiles_pakistan.json', help='Legacy JSON file to import')
+    parser.add_argument('--csv', default='github_profiles_pakistan.csv')
+    parser.add_argument('--pages', type=int, default=5, help='Search result pages to fetch')
+    args = parser.parse_args()
 
-# Load CSV
-df = pd.read_csv("/content/github_profiles_pakistan.csv")
+    try:
+        store = ProfileStore(args.store)
+
+        if args.command == 'compact':
+            print(f"🧹 Removed {store.compact()} superseded fetches.")
+        elif args.command == 'export':
+            store.export_csv(args.csv)
+            print(f"✅ Exported {len(store)} users to '{args.csv}'")
+        elif args.command == 'import-json':
+            print(f"📥 Read {store.import_json(args.json)} profiles from '{args.json}'")
+        else:
+            if not len(store) and os.path.exists(args.json):
+                store.import_json(args.json)
+            print(f"📁 Loaded {len(store)} existing users.")
+
+            all_users = []
+            for page in range(1, args.pages + 1):
+                print(f'📄 Fetching users from page {page}...')
+                page_users = search_users_by_location('Pakistan', per_page=30, page=page)
+                for user in page_users:
+                    if not store.has(user['login']):
+                        all_users.append(user)
+
+            if not all_users:
+                print("✅ No new users found.")
+                exit()
+
+            print(f"🆕 {len(all_users)} new users found.")
+
+            # Each profile is committed to the store the moment it is collected
+            start = time.time()
+            fetch_mode = os.environ.get('GITHUB_FETCH_MODE', 'rest')
+            if fetch_mode == 'graphql':
+                new_results = collect_data_graphql(all_users, on_profile=store.add)
+            else:
+                new_results = collect_data_concurrent(all_users, on_profile=store.add)
+            print(f"⏱️ Collected {len(new_results)} profiles in {time.time() - start:.1f}s")
+            if fetch_mode == 'graphql':
+                rest_calls = rest_request_estimate(new_results)
+                print(f"📉 {REQUEST_COUNTS['graphql']} GraphQL requests instead of ~{rest_calls} REST calls "
+                      f"({1 - REQUEST_COUNTS['graphql'] / max(rest_calls, 1):.0%} fewer)")
+            print(HTTP_CACHE.summary())
+
+            store.export_csv(args.csv)
+            print(f"✅ CSV exported from the store ({len(store)} users).")
 
-df.info()
\ No newline at end of file
+    except Exception as e:
+        print(f"❌ Fatal error: {e}")